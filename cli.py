@@ -1,8 +1,6 @@
 import sys
 import argparse
 import logging
-from src.core.reconstruction import ReconstructionManager
-from src.core.obj2gml import Obj2GMLManager
 
 # Configure logging
 logging.basicConfig(
@@ -37,7 +35,9 @@ def main():
 
     args = parser.parse_args()
 
+    # Each subcommand imports only its own pipeline
     if args.command == "reconstruct":
+        from src.core.reconstruction import ReconstructionManager
         manager = ReconstructionManager()
         advanced_params = {
             "r_line_epsilon": args.r_line_epsilon,
@@ -52,6 +52,7 @@ def main():
         sys.exit(0 if success else 1)
 
     elif args.command == "obj2gml":
+        from src.core.obj2gml import Obj2GMLManager
         manager = Obj2GMLManager()
         success = manager.run_conversion(args.input_dir)
         sys.exit(0 if success else 1)
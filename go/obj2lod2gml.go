@@ -189,28 +189,44 @@ type Vector3D struct {
 
 // Main function
 func main() {
+	serveOrRun("obj2lod2gml", run)
+}
+
+// run converts every OBJ file of -input into a CityGML file in -output.
+func run(args []string) int {
 	// Parse command-line arguments
-	inputDir := flag.String("input", "", "Directory containing OBJ files")
-	outputDir := flag.String("output", "", "Directory for output CityGML files")
-	epsgCode := flag.String("epsg", "32748", "EPSG code for the coordinate reference system")
-	flag.Parse()
+	flags := flag.NewFlagSet("obj2lod2gml", flag.ContinueOnError)
+	inputDir := flags.String("input", "", "Directory containing OBJ files")
+	outputDir := flags.String("output", "", "Directory for output CityGML files")
+	epsgCode := flags.String("epsg", "32748", "EPSG code for the coordinate reference system")
+	listFile := flags.String("list", "", "File listing the OBJ files to convert, one per line (instead of every OBJ in -input)")
+	if err := flags.Parse(args); err != nil {
+		return parseErrorCode(err)
+	}
 
-	if *inputDir == "" || *outputDir == "" {
+	if (*inputDir == "" && *listFile == "") || *outputDir == "" {
 		fmt.Println("Usage: obj2citygml -input <input_directory> -output <output_directory> [-epsg <epsg_code>]")
-		return
+		fmt.Println("       obj2citygml -list <file_list.txt> -output <output_directory> [-epsg <epsg_code>]")
+		return 0
 	}
 
 	// Create output directory if it doesn't exist
 	if err := os.MkdirAll(*outputDir, 0755); err != nil {
 		fmt.Printf("Error creating output directory: %v\n", err)
-		return
+		return 0
 	}
 
-	// Find all OBJ files in the input directory
-	objFiles, err := filepath.Glob(filepath.Join(*inputDir, "*.obj"))
+	// Find all OBJ files in the input directory, or take them from the list (one shard of a directory)
+	var objFiles []string
+	var err error
+	if *listFile != "" {
+		objFiles, err = readFileList(*listFile)
+	} else {
+		objFiles, err = filepath.Glob(filepath.Join(*inputDir, "*.obj"))
+	}
 	if err != nil {
 		fmt.Printf("Error finding OBJ files: %v\n", err)
-		return
+		return 0
 	}
 
 	fmt.Printf("Found %d OBJ files to process\n", len(objFiles))
@@ -237,6 +253,25 @@ func main() {
 	if len(errorFiles) > 0 {
 		fmt.Printf("Failed to convert %d files: %v\n", len(errorFiles), errorFiles)
 	}
+	return 0
+}
+
+// Read the non-empty lines of a file list
+func readFileList(filePath string) ([]string, error) {
+	file, err := os.Open(filePath)
+	if err != nil {
+		return nil, err
+	}
+	defer file.Close()
+
+	var files []string
+	scanner := bufio.NewScanner(file)
+	for scanner.Scan() {
+		if line := strings.TrimSpace(scanner.Text()); line != "" {
+			files = append(files, line)
+		}
+	}
+	return files, scanner.Err()
 }
 
 // Parse MTL file to extract materials
@@ -41,28 +41,33 @@ type Tiles struct {
 }
 
 func main() {
+	serveOrRun("objseparator", run)
+}
+
+// run splits one OBJ into per-building OBJ files using the GeoJSON footprints.
+func run(args []string) int {
 	// Define command-line flags
 	var cx, cy float64
 
 	// Create a new FlagSet to handle arguments
-	flagSet := flag.NewFlagSet("objseparator", flag.ExitOnError)
+	flagSet := flag.NewFlagSet("objseparator", flag.ContinueOnError)
 
 	// Define flags
 	flagSet.Float64Var(&cx, "cx", 692827.46065, "X coordinate offset")
 	flagSet.Float64Var(&cy, "cy", 9326588.60235, "Y coordinate offset")
 
 	// Parse flags
-	if len(os.Args) < 4 {
+	if len(args) < 3 {
 		fmt.Println("Usage: go run objseparator.go [options] <obj_file> <geojson_file> <output_dir>")
 		fmt.Println("Options:")
 		flagSet.PrintDefaults()
-		os.Exit(1)
+		return 1
 	}
 
 	// Find where the actual file arguments start
-	argStart := 1
-	for i := 1; i < len(os.Args); i++ {
-		if strings.HasPrefix(os.Args[i], "-") {
+	argStart := 0
+	for i := 0; i < len(args); i++ {
+		if strings.HasPrefix(args[i], "-") {
 			continue
 		}
 		argStart = i
@@ -70,17 +75,17 @@ func main() {
 	}
 
 	// Parse flags from args before the file paths
-	if err := flagSet.Parse(os.Args[1:argStart]); err != nil {
+	if err := flagSet.Parse(args[:argStart]); err != nil {
 		fmt.Println("Error parsing flags:", err)
-		os.Exit(1)
+		return 1
 	}
 
 	// Get file paths from remaining arguments
-	remainingArgs := os.Args[argStart:]
+	remainingArgs := args[argStart:]
 	if len(remainingArgs) < 3 {
 		fmt.Println("Missing required arguments")
 		fmt.Println("Usage: go run objseparator.go [options] <obj_file> <geojson_file> <output_dir>")
-		os.Exit(1)
+		return 1
 	}
 
 	objFilePath := remainingArgs[0]
@@ -102,7 +107,7 @@ func main() {
 	err := json.Unmarshal(geoJSONString, &geojson)
 	if err != nil {
 		fmt.Println("Error parsing GeoJSON:", err)
-		os.Exit(1)
+		return 1
 	}
 
 	var v, vn, Mesh = ReadMesh(data)
@@ -126,6 +131,7 @@ func main() {
 
 	WritePointsToCSV(filteredCent, filteredIndex, objFilePath+".csv", cx, cy)
 	WriteToObj(objFilePath, outputDir, filteredIndex, filteredMesh, v, vn, filteredCent, cx, cy)
+	return 0
 }
 
 // FilterOutliers removes objects with index 12030 (outliers)
@@ -617,17 +623,17 @@ func ReadFile(filePath string) []byte {
 	stat, errStat := os.Stat(filePath)
 	defer file.Close()
 	if errFile != nil {
-		log.Fatal(errFile)
+		log.Panic(errFile)
 	}
 	if errStat != nil {
-		log.Fatal(errStat)
+		log.Panic(errStat)
 	}
 
 	fileLength := stat.Size()
 	bytesBuffer := make([]byte, fileLength)
 	bin, err := file.Read(bytesBuffer)
 	if err != nil {
-		log.Fatal(err)
+		log.Panic(err)
 	}
 	var data []byte = bytesBuffer[:bin]
 	return data
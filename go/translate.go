@@ -12,16 +12,24 @@ import (
 )
 
 func main() {
+	serveOrRun("translate", run)
+}
+
+// run translates the OBJ files selected by the command-line style args.
+func run(args []string) int {
 	// Define command-line flags
-	inputDirPtr := flag.String("input", "", "Input directory or file path (required)")
-	translationXPtr := flag.Float64("tx", 0.0, "X translation value")
-	translationYPtr := flag.Float64("ty", 0.0, "Y translation value")
-	translationZPtr := flag.Float64("tz", 0.0, "Z translation value")
-	outputDirPtr := flag.String("output", "", "Output directory (optional: default is inputDir_translated)")
-	workersPtr := flag.Int("workers", 4, "Number of concurrent workers")
+	flags := flag.NewFlagSet("translate", flag.ContinueOnError)
+	inputDirPtr := flags.String("input", "", "Input directory or file path (required)")
+	translationXPtr := flags.Float64("tx", 0.0, "X translation value")
+	translationYPtr := flags.Float64("ty", 0.0, "Y translation value")
+	translationZPtr := flags.Float64("tz", 0.0, "Z translation value")
+	outputDirPtr := flags.String("output", "", "Output directory (optional: default is inputDir_translated)")
+	workersPtr := flags.Int("workers", 4, "Number of concurrent workers")
 
 	// Parse command-line arguments
-	flag.Parse()
+	if err := flags.Parse(args); err != nil {
+		return parseErrorCode(err)
+	}
 
 	// Validate required parameters
 	if *inputDirPtr == "" {
@@ -29,8 +37,8 @@ func main() {
 		fmt.Println("Usage:")
 		fmt.Println("  go run translate.go -input=input/obj/dir -output=output/dir -tx=412345.123 -ty=9123456.123 -tz=0")
 		fmt.Println("Options:")
-		flag.PrintDefaults()
-		return
+		flags.PrintDefaults()
+		return 0
 	}
 
 	// Configuration parameters
@@ -58,7 +66,7 @@ func main() {
 	err := os.MkdirAll(outputDir, 0755)
 	if err != nil {
 		fmt.Printf("Error creating output directory: %v\n", err)
-		return
+		return 0
 	}
 
 	// Find all OBJ files to process
@@ -67,7 +75,7 @@ func main() {
 	fileInfo, err := os.Stat(inputDir)
 	if err != nil {
 		fmt.Printf("Error accessing input path: %v\n", err)
-		return
+		return 0
 	}
 
 	if fileInfo.IsDir() {
@@ -75,20 +83,20 @@ func main() {
 		files, err = filepath.Glob(filepath.Join(inputDir, "*.obj"))
 		if err != nil {
 			fmt.Printf("Error finding OBJ files: %v\n", err)
-			return
+			return 0
 		}
 	} else if strings.ToLower(filepath.Ext(inputDir)) == ".obj" {
 		// Process single OBJ file
 		files = []string{inputDir}
 	} else {
 		fmt.Println("Input must be an OBJ file or a directory containing OBJ files")
-		return
+		return 0
 	}
 
 	totalFiles := len(files)
 	if totalFiles == 0 {
 		fmt.Println("No OBJ files found to process")
-		return
+		return 0
 	}
 
 	fmt.Printf("Found %d OBJ files to process\n", totalFiles)
@@ -118,7 +126,12 @@ func main() {
 			fileName := filepath.Base(filePath)
 			outputFile := filepath.Join(outputDir, fileName)
 
-			err := translateOBJFile(filePath, outputFile, translationX, translationY, translationZ)
+			var err error
+			func() {
+				// A panic here would not reach the worker's recover (see worker.go)
+				defer recoverInto(&err)
+				err = translateOBJFile(filePath, outputFile, translationX, translationY, translationZ)
+			}()
 			if err != nil {
 				fmt.Printf("Error processing %s: %v\n", fileName, err)
 				errorFiles <- fileName
@@ -154,6 +167,7 @@ func main() {
 	if len(failedFiles) > 0 {
 		fmt.Printf("Failed to translate %d files: %v\n", len(failedFiles), failedFiles)
 	}
+	return 0
 }
 
 // translateOBJFile reads an OBJ file, translates its vertices, and writes to output
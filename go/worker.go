@@ -0,0 +1,181 @@
+package main
+
+// Shared entry point of the Go tools (objseparator, translate, obj2lod2gml).
+// Build a tool together with this file:
+//
+//	go build -o translate translate.go worker.go
+//
+// "tool <args>" runs the tool once, as before. "tool -serve" keeps the process alive
+// and answers line-delimited JSON requests on stdin, one JSON response per line on
+// stdout, so the Python side can keep warm workers instead of forking per step:
+//
+//	-> {"ready": true, "tool": "translate", "pid": 1234}
+//	<- {"id": 1, "args": ["-input=in", "-output=out", "-tx=1", "-ty=2"]}
+//	-> {"id": 1, "code": 0, "output": "Found 3 OBJ files to process\n...", "seconds": 0.12}
+//
+// Requests are handled one at a time. Everything the tool prints during a request is
+// returned inline in "output"; results are the files the tool writes, as in CLI mode.
+// os.Stdout is pointed at a capture pipe once at start-up and never swapped back, and
+// responses go to the original stdout, so nothing a tool prints can corrupt the
+// protocol. Goroutines started by a tool must `defer recoverInto(&err)`: a panic there
+// is outside handleRequest's recover and would take the whole worker down.
+
+import (
+	"bufio"
+	"bytes"
+	"encoding/json"
+	"errors"
+	"flag"
+	"fmt"
+	"os"
+	"sync"
+	"time"
+)
+
+type workerRequest struct {
+	ID   int64    `json:"id"`
+	Args []string `json:"args"`
+}
+
+type workerResponse struct {
+	ID      int64   `json:"id"`
+	Code    int     `json:"code"`
+	Output  string  `json:"output"`
+	Error   string  `json:"error,omitempty"`
+	Seconds float64 `json:"seconds"`
+}
+
+// serveOrRun is the main() of every tool.
+func serveOrRun(tool string, run func(args []string) int) {
+	if len(os.Args) > 1 && os.Args[1] == "-serve" {
+		os.Exit(serve(tool, run))
+	}
+	os.Exit(runOnce(run, os.Args[1:]))
+}
+
+// parseErrorCode mirrors flag.ExitOnError: 0 after -h, 2 for bad flags.
+func parseErrorCode(err error) int {
+	if errors.Is(err, flag.ErrHelp) {
+		return 0
+	}
+	return 2
+}
+
+// recoverInto turns a panic of the calling goroutine into an error stored in *err.
+func recoverInto(err *error) {
+	if p := recover(); p != nil {
+		*err = fmt.Errorf("panic: %v", p)
+	}
+}
+
+// runOnce turns a panic (fatal error inside the tool) into exit code 1.
+func runOnce(run func(args []string) int, args []string) (code int) {
+	defer func() {
+		if p := recover(); p != nil {
+			fmt.Fprintln(os.Stderr, "fatal:", p)
+			code = 1
+		}
+	}()
+	return run(args)
+}
+
+func serve(tool string, run func(args []string) int) int {
+	responses := json.NewEncoder(os.Stdout)
+	capture, err := captureStdout()
+	if err != nil {
+		fmt.Fprintln(os.Stderr, "worker:", err)
+		return 1
+	}
+	responses.Encode(map[string]interface{}{"ready": true, "tool": tool, "pid": os.Getpid()})
+
+	requests := bufio.NewScanner(os.Stdin)
+	requests.Buffer(make([]byte, 1<<20), 64<<20)
+	for requests.Scan() {
+		line := bytes.TrimSpace(requests.Bytes())
+		if len(line) == 0 {
+			continue
+		}
+		var req workerRequest
+		if err := json.Unmarshal(line, &req); err != nil {
+			responses.Encode(workerResponse{ID: -1, Code: 2, Error: "invalid request: " + err.Error()})
+			continue
+		}
+		if err := responses.Encode(handleRequest(req, run, capture)); err != nil {
+			return 1
+		}
+	}
+	return 0
+}
+
+// flushMark is written to the captured stdout after a request. Once the reader has
+// reached it, everything printed before it is in the buffer.
+var flushMark = []byte("\x00worker-flush\x00\n")
+
+// stdoutCapture collects everything written to os.Stdout.
+type stdoutCapture struct {
+	writer  *os.File
+	mu      sync.Mutex
+	buf     bytes.Buffer
+	flushed chan struct{}
+}
+
+// captureStdout points os.Stdout at a pipe for the rest of the process.
+func captureStdout() (*stdoutCapture, error) {
+	reader, writer, err := os.Pipe()
+	if err != nil {
+		return nil, err
+	}
+	c := &stdoutCapture{writer: writer, flushed: make(chan struct{})}
+	os.Stdout = writer
+	go c.read(reader)
+	return c, nil
+}
+
+func (c *stdoutCapture) read(reader *os.File) {
+	lines := bufio.NewReader(reader)
+	for {
+		line, err := lines.ReadBytes('\n')
+		mark := bytes.HasSuffix(line, flushMark)
+		if mark {
+			line = line[:len(line)-len(flushMark)]
+		}
+		c.mu.Lock()
+		c.buf.Write(line)
+		c.mu.Unlock()
+		if mark {
+			c.flushed <- struct{}{}
+		}
+		if err != nil {
+			return
+		}
+	}
+}
+
+// take waits until everything printed so far has been read, then returns and clears it.
+func (c *stdoutCapture) take() string {
+	c.writer.Write(flushMark)
+	<-c.flushed
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	output := c.buf.String()
+	c.buf.Reset()
+	return output
+}
+
+// handleRequest runs one request and returns what the tool printed to stdout with it.
+func handleRequest(req workerRequest, run func(args []string) int, capture *stdoutCapture) workerResponse {
+	resp := workerResponse{ID: req.ID}
+	start := time.Now()
+	func() {
+		defer func() {
+			if p := recover(); p != nil {
+				resp.Code = 1
+				resp.Error = fmt.Sprint(p)
+			}
+		}()
+		resp.Code = run(req.Args)
+	}()
+	resp.Output = capture.take()
+	resp.Seconds = time.Since(start).Seconds()
+	return resp
+}
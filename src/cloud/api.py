@@ -8,10 +8,9 @@ from typing import List, Optional
 from fastapi import FastAPI, UploadFile, File, BackgroundTasks, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from google.cloud import storage
 
-from src.core.reconstruction import ReconstructionManager
-from src.core.obj2gml import Obj2GMLManager
+# google.cloud and the processing pipelines are imported inside the functions that
+# use them, so a cold start only pays for FastAPI before serving /health.
 
 # --- Configuration ---
 app = FastAPI(
@@ -43,6 +42,7 @@ class JobStatus(BaseModel):
 # --- Helper Functions ---
 
 def get_gcs_client():
+    from google.cloud import storage
     return storage.Client()
 
 def smart_detect_files(extract_dir: str, mode: str):
@@ -127,6 +127,7 @@ def process_reconstruction_job(job_id: str, zip_path: str):
         
         # 3. Run Reconstruction
         jobs_db[job_id]["message"] = "Running 3D Reconstruction..."
+        from src.core.reconstruction import ReconstructionManager
         manager = ReconstructionManager()
         # Default advanced params for now
         success = manager.run_reconstruction(
@@ -174,6 +175,7 @@ def process_obj2gml_job(job_id: str, zip_path: str):
             zip_ref.extractall(extract_dir)
 
         jobs_db[job_id]["message"] = "Running OBJ to GML Conversion..."
+        from src.core.obj2gml import Obj2GMLManager
         manager = Obj2GMLManager()
         success = manager.run_conversion(extract_dir)
 
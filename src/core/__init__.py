@@ -0,0 +1,25 @@
+"""
+Processing core of DREAM3DCITY.
+
+The managers below are resolved on first attribute access (PEP 562), so importing
+`src.core` does not load any pipeline or its third-party dependencies.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "ReconstructionManager": ".reconstruction",
+    "Obj2GMLManager": ".obj2gml",
+    "RunObj2GML": ".obj2gml_workflow",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
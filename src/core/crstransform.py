@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+import numpy as np
+from pyproj import Transformer
+
+WGS84 = "EPSG:4326"
+
+def normalize_crs(crs):
+    """Accept 32748, "32748" or "EPSG:32748" (any authority string is passed through)."""
+    if isinstance(crs, (int, np.integer)) or (isinstance(crs, str) and crs.isdigit()):
+        return f"EPSG:{int(crs)}"
+    return str(crs)
+
+@lru_cache(maxsize=32)
+def _cached_transformer(source, target):
+    return Transformer.from_crs(source, target, always_xy=True)
+
+def get_transformer(source, target):
+    """
+    Return a pyproj Transformer from `source` to `target`, axis order x/y (lon/lat).
+
+    Building a Transformer means a PROJ database lookup, so instances are cached per
+    (source, target) pair and reused by every later call.
+    """
+    return _cached_transformer(normalize_crs(source), normalize_crs(target))
+
+def transform_points(points, source, target):
+    """
+    Transform an (N, 2) or (N, 3) array of x/y[/z] coordinates in one pyproj call.
+
+    Geographic coordinates are given as lon, lat. Returns an array of the same shape.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    single = points.ndim == 1
+    points = np.atleast_2d(points)
+
+    transformer = get_transformer(source, target)
+    if points.shape[1] >= 3:
+        x, y, z = transformer.transform(points[:, 0], points[:, 1], points[:, 2])
+        result = np.column_stack((x, y, z, points[:, 3:]))
+    else:
+        x, y = transformer.transform(points[:, 0], points[:, 1])
+        result = np.column_stack((x, y))
+    return result[0] if single else result
@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import platform
+import subprocess
+from functools import lru_cache
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+GO_DIR = os.path.join(ROOT, "go")
+TOOLS = ("objseparator", "translate", "obj2lod2gml")
+SHARED_SOURCES = ("worker.go",)  # CLI / -serve entry point compiled into every tool
+MANIFEST = "manifest.json"
+
+def default_cache_dir():
+    """$DREAM3D_GO_CACHE, else <XDG cache>/dream3dcity/go-tools."""
+    configured = os.getenv("DREAM3D_GO_CACHE")
+    if configured:
+        return configured
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "dream3dcity", "go-tools")
+
+@lru_cache(maxsize=None)
+def go_version(go="go"):
+    """Version string of the Go toolchain (e.g. "go1.21.6"), or None when Go is not installed."""
+    try:
+        result = subprocess.run([go, "env", "GOVERSION"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+def source_paths(name, go_dir=GO_DIR):
+    """Go files compiled into tool `name`: go/<name>.go plus the shared entry point."""
+    return [os.path.join(go_dir, f"{name}.go")] + [os.path.join(go_dir, s) for s in SHARED_SOURCES]
+
+def build_key(sources, version):
+    """Cache key of a tool: its sources, the Go version and the target platform."""
+    digest = hashlib.sha256()
+    for source in sources:
+        with open(source, "rb") as f:
+            digest.update(f.read())
+    digest.update(f"\0{version}\0{sys.platform}\0{platform.machine()}".encode())
+    return digest.hexdigest()[:16]
+
+def binary_path(name, key, cache_dir):
+    suffix = ".exe" if os.name == "nt" else ""
+    return os.path.join(cache_dir, f"{name}-{key}{suffix}")
+
+def read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _record(cache_dir, name, entry):
+    """Add one tool to the manifest (write to a temp file, then atomically replace)."""
+    manifest = read_manifest(cache_dir)
+    manifest[name] = entry
+    path = os.path.join(cache_dir, MANIFEST)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp, path)
+
+def build_tool(name, go_dir=GO_DIR, cache_dir=None, go="go"):
+    """
+    Compile go/<name>.go (with the shared sources) into the cache unless a binary for the same key exists.
+
+    The binary is named after its key (source hash + Go version + platform), so an
+    edited source or a new toolchain gets a fresh build while older binaries stay
+    valid for whoever still uses them. Builds go to a temporary name and are moved
+    into place atomically, so concurrent first uses are safe.
+    Returns the binary path.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    version = go_version(go)
+    if version is None:
+        raise RuntimeError("Go toolchain not found in PATH")
+
+    sources = source_paths(name, go_dir)
+    key = build_key(sources, version)
+    binary = binary_path(name, key, cache_dir)
+    if os.path.exists(binary):
+        return binary
+
+    os.makedirs(cache_dir, exist_ok=True)
+    temp = f"{binary}.{os.getpid()}.tmp"
+    start = time.time()
+    result = subprocess.run([go, "build", "-o", temp, *sources], capture_output=True, text=True)
+    if result.returncode != 0:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise RuntimeError(f"go build {' '.join(sources)} failed:\n{result.stderr}")
+    os.replace(temp, binary)
+
+    _record(cache_dir, name, {
+        "binary": binary,
+        "sources": sources,
+        "key": key,
+        "go_version": version,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "build_seconds": round(time.time() - start, 2),
+    })
+    return binary
+
+def resolve_tool(name, go_dir=GO_DIR, cache_dir=None, go="go", log=print):
+    """
+    Return the command prefix that runs Go tool `name`.
+
+    In order of preference: the prebuilt go/<name>.exe on Windows, the cached binary
+    for the current source and Go version (built on first use), and `go run` as the
+    last resort when Go cannot build it.
+    """
+    if os.name == "nt":
+        exe_path = os.path.join(go_dir, f"{name}.exe")
+        if os.path.exists(exe_path):
+            return [exe_path]
+
+    try:
+        return [build_tool(name, go_dir, cache_dir, go)]
+    except (OSError, RuntimeError) as e:
+        log(f"⚠️  Using 'go run' for {name}: {e}")
+        return [go, "run", *source_paths(name, go_dir)]
+
+@lru_cache(maxsize=None)
+def _tool_flags(command):
+    try:
+        result = subprocess.run([*command, "-h"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except OSError:
+        return frozenset()
+    return frozenset(re.findall(r"^\s+-(\w+)", result.stdout, re.MULTILINE))
+
+def tool_flags(command):
+    """
+    Flags a Go tool accepts, read from its -h usage (e.g. {"input", "output", "list"}).
+
+    Used to spot an older prebuilt go/<name>.exe that predates a flag such as -list.
+    """
+    return _tool_flags(tuple(command))
+
+def build_all(tools=TOOLS, go_dir=GO_DIR, cache_dir=None, go="go"):
+    """Build every tool into the cache (e.g. at image build time) and return {name: binary}."""
+    return {name: build_tool(name, go_dir, cache_dir, go) for name in tools}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and list the cached Go tool binaries.")
+    parser.add_argument("command", choices=("build", "list"))
+    parser.add_argument("tools", nargs="*", default=list(TOOLS))
+    parser.add_argument("--cache-dir", default=None, help="defaults to $DREAM3D_GO_CACHE or ~/.cache/dream3dcity/go-tools")
+    parser.add_argument("--go-dir", default=GO_DIR)
+    args = parser.parse_args(argv)
+    cache_dir = args.cache_dir or default_cache_dir()
+
+    if args.command == "build":
+        for name, binary in build_all(args.tools, args.go_dir, cache_dir).items():
+            print(f"✅ {name}: {binary}")
+        return 0
+
+    manifest = read_manifest(cache_dir)
+    if not manifest:
+        print(f"No tools built in {cache_dir}")
+    for name, entry in sorted(manifest.items()):
+        print(f"{name}: {entry['binary']} ({entry['go_version']}, key {entry['key']}, built {entry['built_at']})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import json
+import queue
+import itertools
+import subprocess
+
+from .gotools import resolve_tool
+
+class GoWorkerError(RuntimeError):
+    pass
+
+class GoWorker:
+    """
+    One long-lived `<tool> -serve` process (see go/worker.go).
+
+    Requests and responses are single JSON lines on the worker's stdin/stdout:
+    {"id", "args"} in, {"id", "code", "output", "error", "seconds"} out. The tool
+    writes its results to the paths given in args, exactly as in CLI mode; whatever
+    it prints comes back inline in "output". There is no msgpack framing: messages
+    only carry arguments, paths and log text, and Go has no msgpack in its standard
+    library (the tools build from plain files without a go.mod).
+    """
+
+    def __init__(self, command):
+        self.command = list(command)
+        self.process = None
+        self.pid = None
+        self._ids = itertools.count(1)
+        self.start()
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [*self.command, "-serve"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8", bufsize=1,
+        )
+        line = self.process.stdout.readline()
+        try:
+            hello = json.loads(line)
+        except ValueError:
+            hello = {}
+        if not isinstance(hello, dict) or not hello.get("ready"):
+            self.close()
+            raise GoWorkerError(f"{self.command[0]} does not support -serve (got {line.strip()[:200]!r})")
+        self.pid = hello.get("pid")
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def call(self, args):
+        """Run the tool once with command-line style `args` and return the response dict."""
+        if not self.alive:
+            raise GoWorkerError(f"{self.command[0]} worker is not running")
+        request_id = next(self._ids)
+        try:
+            self.process.stdin.write(json.dumps({"id": request_id, "args": [str(a) for a in args]}) + "\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except OSError as e:
+            raise GoWorkerError(f"{self.command[0]} worker pipe failed: {e}")
+        if not line:
+            raise GoWorkerError(f"{self.command[0]} worker exited with code {self.process.poll()}")
+
+        response = json.loads(line)
+        if response.get("id") != request_id:
+            raise GoWorkerError(f"{self.command[0]} worker answered request {response.get('id')}, expected {request_id}")
+        return response
+
+    def close(self, timeout=5):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+class GoWorkerPool:
+    """
+    `size` warm workers of one Go tool.
+
+    call() borrows an idle worker (blocking while all are busy), so up to `size`
+    requests from different threads run concurrently. A worker that dies during a
+    request is restarted and the request is retried once; the tools rewrite their
+    outputs, so a retry is safe.
+    """
+
+    def __init__(self, tool, size=1, command=None, log=print):
+        self.tool = tool
+        self.command = command or resolve_tool(tool, log=log)
+        self.workers = []
+        self._idle = queue.Queue()
+        try:
+            for _ in range(max(1, size)):
+                worker = GoWorker(self.command)
+                self.workers.append(worker)
+                self._idle.put(worker)
+        except (OSError, GoWorkerError):
+            self.close()
+            raise
+
+    def call(self, *args):
+        worker = self._idle.get()
+        try:
+            try:
+                return worker.call(args)
+            except GoWorkerError:
+                worker.close()
+                worker.start()
+                return worker.call(args)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def start_pools(tools, size=1, log=print, sizes=None):
+    """
+    Start one GoWorkerPool per tool, of `size` workers unless `sizes` ({tool: size})
+    says otherwise. Returns {tool: pool}, or None when any tool cannot serve (e.g. an
+    older prebuilt .exe without -serve), so callers fall back to one process per call.
+    """
+    sizes = sizes or {}
+    pools = {}
+    try:
+        for tool in tools:
+            pools[tool] = GoWorkerPool(tool, sizes.get(tool, size), log=log)
+    except (OSError, GoWorkerError) as e:
+        log(f"⚠️  Go worker mode unavailable, running one process per step: {e}")
+        for pool in pools.values():
+            pool.close()
+        return None
+    return pools
@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import glob
+import time
+import heapq
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from .gotools import resolve_tool, tool_flags
+
+ERROR_LINE = re.compile(r"^Error processing (.+?): ", re.MULTILINE)
+
+def balanced_shards(paths, shards):
+    """
+    Split `paths` into at most `shards` lists of roughly equal total file size.
+
+    Largest file first, each into the currently lightest shard (LPT scheduling), so
+    one big building does not end up next to a pile of other big ones. Files keep
+    their sorted order inside a shard.
+    """
+    shards = max(1, min(shards, len(paths)))
+    heap = [(0, i) for i in range(shards)]
+    groups = [[] for _ in range(shards)]
+    for size, path in sorted(((os.path.getsize(p), p) for p in paths), reverse=True):
+        total, i = heapq.heappop(heap)
+        groups[i].append(path)
+        heapq.heappush(heap, (total + size, i))
+    return [sorted(g) for g in groups if g]
+
+def expected_output(obj_path, output_dir):
+    stem = os.path.splitext(os.path.basename(obj_path))[0]
+    return os.path.join(output_dir, f"{stem}.gml")
+
+def failed_files(group, output_dir, code, output):
+    """
+    OBJs of `group` that obj2lod2gml did not convert: all of them after a non-zero exit
+    (crash or bad arguments, outputs cannot be trusted), else those it reported with an
+    "Error processing <file>:" line (it may leave a partial .gml behind) or without output.
+    """
+    if code != 0:
+        return list(group)
+    errors = set(ERROR_LINE.findall(output or ""))
+    return [p for p in group
+            if os.path.basename(p) in errors or not os.path.exists(expected_output(p, output_dir))]
+
+def _run_shard(args, epsg, pool, command):
+    if epsg:
+        args.append(f"-epsg={epsg}")
+    if pool is not None:
+        response = pool.call(*args)
+        return response["code"], response.get("output", ""), response.get("error", "")
+    result = subprocess.run([*command, *args], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return result.returncode, result.stdout, ""
+
+def _result(index, group, start, code, output, error, output_dir):
+    return {
+        "shard": index,
+        "files": len(group),
+        "bytes": sum(os.path.getsize(p) for p in group),
+        "code": code,
+        "seconds": time.time() - start,
+        "failed": failed_files(group, output_dir, code, output),
+        "output": output,
+        "error": error,
+    }
+
+def convert_sharded(input_dir, output_dir, shards=None, epsg=None, pool=None, log=print):
+    """
+    Convert every OBJ of `input_dir` to CityGML with `shards` concurrent obj2lod2gml runs.
+
+    The files are split by size (balanced_shards) and each shard is handed to one
+    obj2lod2gml run through a file list (-list). Runs go to the warm workers of
+    `pool` (a GoWorkerPool of obj2lod2gml, see goworker.py) when given, else one
+    process each. A shard that fails (crash, non-zero exit, reported errors, missing
+    outputs) is reported and does not stop the others. An older prebuilt obj2lod2gml
+    without -list (see gotools.tool_flags) converts the whole directory in one -input
+    run instead.
+    Returns one dict per shard: files, bytes, code, seconds, failed (OBJs not
+    converted, see failed_files), output and error.
+    """
+    files = sorted(glob.glob(os.path.join(input_dir, "*.obj")))
+    if not files:
+        log(f"No OBJ files found in {input_dir}")
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+    groups = balanced_shards(files, shards or os.cpu_count() or 1)
+    command = None if pool is not None else resolve_tool("obj2lod2gml", log=log)
+    if command is not None and "list" not in tool_flags(command):
+        log(f"⚠️  {command[0]} has no -list option (stale prebuilt?), converting {input_dir} in one run")
+        start = time.time()
+        try:
+            code, output, error = _run_shard(["-input", input_dir, "-output", output_dir], epsg, None, command)
+        except Exception as e:
+            code, output, error = -1, "", str(e)
+        results = [_result(0, files, start, code, output, error, output_dir)]
+        _log_results(results, log)
+        return results
+
+    with tempfile.TemporaryDirectory(prefix="obj2lod2gml-shards-") as list_dir:
+        def run(index, group):
+            list_path = os.path.join(list_dir, f"shard-{index}.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("".join(f"{os.path.abspath(p)}\n" for p in group))
+
+            start = time.time()
+            try:
+                code, output, error = _run_shard(["-list", list_path, "-output", output_dir], epsg, pool, command)
+            except Exception as e:
+                code, output, error = -1, "", str(e)
+            return _result(index, group, start, code, output, error, output_dir)
+
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            results = list(executor.map(run, range(len(groups)), groups))
+
+    _log_results(results, log)
+    return results
+
+def _log_results(results, log):
+    for r in results:
+        status = "✅" if r["code"] == 0 and not r["failed"] else "❌"
+        log(f"{status} Shard {r['shard'] + 1}/{len(results)}: {r['files'] - len(r['failed'])}/{r['files']} files, "
+            f"{r['bytes'] / 1e6:.1f} MB, {r['seconds']:.2f} s, exit code {r['code']}")
+        if r["error"]:
+            log(f"   error: {r['error']}")
+        if r["failed"]:
+            names = ", ".join(os.path.basename(p) for p in r["failed"][:10])
+            more = f" and {len(r['failed']) - 10} more" if len(r["failed"]) > 10 else ""
+            log(f"   not converted: {names}{more}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a directory of building OBJs to CityGML LOD2 with obj2lod2gml, sharded across processes.")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1, help="concurrent obj2lod2gml runs (default: CPU count)")
+    parser.add_argument("--epsg", default=None, help="EPSG code passed to obj2lod2gml (default: its own, 32748)")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    results = convert_sharded(args.input_dir, args.output_dir, args.shards, args.epsg)
+    converted = sum(r["files"] - len(r["failed"]) for r in results)
+    total = sum(r["files"] for r in results)
+    print(f"Successfully converted {converted} from {total} OBJ files in {time.time() - start:.2f} s")
+    return 0 if converted == total else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+import numpy as np
+
+CITYJSON_VERSION = "2.0"
+DEFAULT_SCALE = 0.001
+VERTEX_CHUNK = 1_000_000
+
+# Nesting depth of "boundaries" and of "semantics.values" per geometry type (CityJSON 2.0)
+BOUNDARY_DEPTH = {
+    "MultiPoint": 1,
+    "MultiLineString": 2,
+    "MultiSurface": 3,
+    "CompositeSurface": 3,
+    "Solid": 4,
+    "MultiSolid": 5,
+    "CompositeSolid": 5,
+}
+SEMANTICS_DEPTH = {
+    "MultiSurface": 1,
+    "CompositeSurface": 1,
+    "Solid": 2,
+    "MultiSolid": 3,
+    "CompositeSolid": 3,
+}
+CITYOBJECT_TYPES = {
+    "Bridge", "BridgePart", "BridgeInstallation", "BridgeConstructiveElement", "BridgeRoom",
+    "BridgeFurniture", "Building", "BuildingPart", "BuildingInstallation",
+    "BuildingConstructiveElement", "BuildingFurniture", "BuildingStorey", "BuildingRoom",
+    "BuildingUnit", "CityFurniture", "CityObjectGroup", "GenericCityObject", "LandUse",
+    "OtherConstruction", "PlantCover", "SolitaryVegetationObject", "TINRelief",
+    "TransportSquare", "Railway", "Road", "Tunnel", "TunnelPart", "TunnelInstallation",
+    "TunnelConstructiveElement", "TunnelHollowSpace", "TunnelFurniture", "WaterBody", "Waterway",
+}
+REFERENCE_SYSTEM_PATTERN = re.compile(r"^https?://www\.opengis\.net/def/crs/\w+/\d+(\.\d+)*/\w+$")
+# Official CityJSON 2.0 JSON schema (cityjson.schema.json and the files it references)
+SCHEMA_URL = "https://3d.bk.tudelft.nl/schemas/cityjson/2.0.1/"
+
+def reference_system_url(epsg):
+    return f"https://www.opengis.net/def/crs/EPSG/0/{epsg}"
+
+def normalize_reference_system(reference_system):
+    """Convert a v1.x 'urn:ogc:def:crs:EPSG::32748' reference into the v2.0 URL form."""
+    if reference_system is None:
+        return None
+    match = re.match(r"^urn:ogc:def:crs:(\w+):[\d.]*:(\w+)$", str(reference_system))
+    if match:
+        return f"https://www.opengis.net/def/crs/{match.group(1)}/0/{match.group(2)}"
+    return reference_system
+
+def remap_indices(nested, lookup):
+    """
+    Map every integer in a nested boundaries structure through `lookup`.
+
+    The integers are gathered into one array and remapped with a single NumPy
+    indexing operation; the nesting is then rebuilt around the new values.
+    """
+    flat = np.fromiter(_flatten(nested), dtype=np.int64)
+    if len(flat) == 0:
+        return nested
+    values = iter(np.asarray(lookup)[flat].tolist())
+
+    def rebuild(value):
+        if isinstance(value, list):
+            return [rebuild(item) for item in value]
+        return next(values)
+
+    return rebuild(nested)
+
+class CityJSONStreamWriter:
+    """
+    Write a CityJSON v2.0 file incrementally.
+
+    CityObjects are written to the output as soon as they are added. Vertices are
+    quantized to integers with the file's `transform` and spooled to a binary scratch
+    file, then streamed into the "vertices" array on close. The geographical extent is
+    tracked while vertices are added, so the document never has to be held in memory.
+
+    Usage:
+        with CityJSONStreamWriter(path, epsg) as writer:
+            offset = writer.add_vertices(vertices)
+            writer.add_city_object(building_id, city_object)
+    """
+
+    def __init__(self, output_path, epsg=None, scale=DEFAULT_SCALE, translate=None, metadata=None):
+        self.output_path = output_path
+        self.epsg = epsg
+        self.scale = np.array([scale] * 3 if np.isscalar(scale) else scale, dtype=np.float64)
+        self.translate = None if translate is None else np.asarray(translate, dtype=np.float64)
+        self.metadata = dict(metadata or {})
+        self.vertex_count = 0
+        self.object_count = 0
+        self._qmin = None
+        self._qmax = None
+        self._file = None
+        self._spool = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+        self._file = open(self.output_path, "w", encoding="utf-8")
+        self._spool = tempfile.TemporaryFile()
+        self._file.write(f'{{"type":"CityJSON","version":"{CITYJSON_VERSION}","CityObjects":{{')
+
+    def quantize(self, vertices):
+        """Convert real-world coordinates to the integer grid of this file's transform."""
+        vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        if self.translate is None:
+            self.translate = vertices.min(axis=0) if len(vertices) else np.zeros(3)
+        return np.rint((vertices - self.translate) / self.scale).astype(np.int64)
+
+    def add_vertices(self, vertices):
+        """Append real-world vertices and return the index of the first one."""
+        return self.add_quantized_vertices(self.quantize(vertices))
+
+    def add_quantized_vertices(self, quantized):
+        """Append vertices already on this file's integer grid and return the index of the first one."""
+        quantized = np.ascontiguousarray(quantized, dtype=np.int64).reshape(-1, 3)
+        offset = self.vertex_count
+        if len(quantized) == 0:
+            return offset
+
+        qmin = quantized.min(axis=0)
+        qmax = quantized.max(axis=0)
+        self._qmin = qmin if self._qmin is None else np.minimum(self._qmin, qmin)
+        self._qmax = qmax if self._qmax is None else np.maximum(self._qmax, qmax)
+
+        self._spool.write(quantized.tobytes())
+        self.vertex_count += len(quantized)
+        return offset
+
+    def add_city_object(self, object_id, city_object):
+        """Write one CityObject whose boundaries already index into this file's vertices."""
+        if self.object_count:
+            self._file.write(",")
+        self._file.write(json.dumps(str(object_id)))
+        self._file.write(":")
+        self._file.write(json.dumps(city_object, separators=(",", ":")))
+        self.object_count += 1
+
+    def geographical_extent(self):
+        if self._qmin is None:
+            return [0, 0, 0, 0, 0, 0]
+        low = self._qmin * self.scale + self.translate
+        high = self._qmax * self.scale + self.translate
+        return [float(v) for v in (*low, *high)]
+
+    def close(self):
+        if self._file is None:
+            return
+        translate = self.translate if self.translate is not None else np.zeros(3)
+
+        self._file.write("},")
+        transform = {"scale": self.scale.tolist(), "translate": translate.tolist()}
+        self._file.write(f'"transform":{json.dumps(transform, separators=(",", ":"))},')
+
+        self._file.write('"vertices":[')
+        self._spool.seek(0)
+        written = 0
+        while written < self.vertex_count:
+            count = min(VERTEX_CHUNK, self.vertex_count - written)
+            chunk = np.frombuffer(self._spool.read(count * 24), dtype=np.int64)
+            text = ("[%d,%d,%d]," * count) % tuple(chunk.tolist())
+            written += count
+            self._file.write(text if written < self.vertex_count else text[:-1])
+        self._file.write("],")
+
+        metadata = dict(self.metadata)
+        if self.epsg is not None:
+            metadata.setdefault("referenceSystem", reference_system_url(self.epsg))
+        metadata["geographicalExtent"] = self.geographical_extent()
+        self._file.write(f'"metadata":{json.dumps(metadata, separators=(",", ":"))}}}\n')
+
+        self._file.close()
+        self._spool.close()
+        self._file = None
+        self._spool = None
+
+    def abort(self):
+        """Close the scratch file and remove the partially written output."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if os.path.exists(self.output_path):
+                os.remove(self.output_path)
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+def _depth(value):
+    depth = 0
+    while isinstance(value, list):
+        if not value:
+            return depth + 1
+        value = value[0]
+        depth += 1
+    return depth
+
+def _flatten(value):
+    if isinstance(value, list):
+        for item in value:
+            yield from _flatten(item)
+    else:
+        yield value
+
+def load_schema_validator(location=SCHEMA_URL):
+    """
+    Build a jsonschema validator for the official CityJSON schema.
+
+    `location` is the URL or local directory holding cityjson.schema.json; the schema
+    files it references (cityobjects, geomprimitives, appearance, ...) are read from the
+    same place when the validator first needs them. Requires jsonschema >= 4.18.
+    """
+    import jsonschema
+    from referencing import Registry, Resource
+    from referencing.jsonschema import DRAFT7
+
+    def read(name):
+        if re.match(r"^https?://", location):
+            from urllib.request import urlopen
+            with urlopen(f"{location.rstrip('/')}/{name}", timeout=30) as response:
+                return json.load(response)
+        with open(os.path.join(location, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def retrieve(uri):
+        return Resource.from_contents(read(uri.rsplit("/", 1)[-1]), default_specification=DRAFT7)
+
+    schema = read("cityjson.schema.json")
+    validator_class = jsonschema.validators.validator_for(schema, default=jsonschema.Draft7Validator)
+    return validator_class(schema, registry=Registry(retrieve=retrieve))
+
+def validate_cityjson(document, validator=None):
+    """
+    Check a CityJSON 2.0 document for conformance and return a list of error messages.
+
+    This checks the rules of the 2.0 specification that the writers in this package
+    depend on: root members, transform, integer vertices, CityObject and geometry types,
+    boundary nesting, vertex index bounds and semantics shape. Index bounds and semantics
+    shape are not expressible in the JSON schema, so they are checked here either way.
+    With a `validator` from load_schema_validator the document is also validated against
+    the official schema.
+    """
+    errors = []
+
+    if validator is not None:
+        errors.extend(f"schema: {e.message}" for e in validator.iter_errors(document))
+
+    if document.get("type") != "CityJSON":
+        errors.append('root: "type" must be "CityJSON"')
+    if document.get("version") != CITYJSON_VERSION:
+        errors.append(f'root: "version" must be "{CITYJSON_VERSION}", got {document.get("version")!r}')
+    for member in ("CityObjects", "vertices", "transform"):
+        if member not in document:
+            errors.append(f'root: missing "{member}"')
+    if errors and any(e.startswith("root: missing") for e in errors):
+        return errors
+
+    transform = document["transform"]
+    for key in ("scale", "translate"):
+        values = transform.get(key)
+        if not (isinstance(values, list) and len(values) == 3 and all(isinstance(v, (int, float)) for v in values)):
+            errors.append(f'transform: "{key}" must be an array of 3 numbers')
+
+    vertices = document["vertices"]
+    try:
+        vertex_array = np.array(vertices, dtype=object).reshape(-1, 3) if vertices else np.empty((0, 3))
+        if vertices and not all(isinstance(v, int) and not isinstance(v, bool) for v in vertex_array.ravel()):
+            errors.append("vertices: all coordinates must be integers (quantized with transform)")
+    except ValueError:
+        errors.append("vertices: every vertex must have exactly 3 coordinates")
+    n_vertices = len(vertices)
+
+    metadata = document.get("metadata", {})
+    reference_system = metadata.get("referenceSystem")
+    if reference_system is not None and not REFERENCE_SYSTEM_PATTERN.match(str(reference_system)):
+        errors.append(f"metadata: invalid referenceSystem {reference_system!r}")
+    extent = metadata.get("geographicalExtent")
+    if extent is not None and len(extent) != 6:
+        errors.append("metadata: geographicalExtent must have 6 values")
+
+    city_objects = document["CityObjects"]
+    for object_id, city_object in city_objects.items():
+        where = f"CityObjects[{object_id!r}]"
+        object_type = city_object.get("type")
+        if object_type not in CITYOBJECT_TYPES and not str(object_type).startswith("+"):
+            errors.append(f"{where}: unknown type {object_type!r}")
+        for relation in ("children", "parents"):
+            for other in city_object.get(relation, []):
+                if other not in city_objects:
+                    errors.append(f"{where}: {relation} references missing object {other!r}")
+
+        for g, geometry in enumerate(city_object.get("geometry", [])):
+            gwhere = f"{where}.geometry[{g}]"
+            geometry_type = geometry.get("type")
+            if geometry_type == "GeometryInstance":
+                continue
+            if geometry_type not in BOUNDARY_DEPTH:
+                errors.append(f"{gwhere}: unknown geometry type {geometry_type!r}")
+                continue
+            if not isinstance(geometry.get("lod"), str):
+                errors.append(f'{gwhere}: "lod" must be a string')
+
+            boundaries = geometry.get("boundaries", [])
+            if boundaries and _depth(boundaries) != BOUNDARY_DEPTH[geometry_type]:
+                errors.append(f"{gwhere}: boundaries nesting does not match {geometry_type}")
+                continue
+            indices = np.fromiter(_flatten(boundaries), dtype=np.int64)
+            if len(indices) and (indices.min() < 0 or indices.max() >= n_vertices):
+                errors.append(f"{gwhere}: boundary index out of range (0..{n_vertices - 1})")
+
+            semantics = geometry.get("semantics")
+            if semantics is not None and geometry_type in SEMANTICS_DEPTH:
+                surfaces = semantics.get("surfaces", [])
+                values = semantics.get("values", [])
+                expected = boundaries
+                for _ in range(SEMANTICS_DEPTH[geometry_type] - 1):
+                    if len(values) != len(expected):
+                        break
+                    values = [v for sub in values for v in (sub or [])]
+                    expected = [e for sub in expected for e in sub]
+                if len(values) != len(expected):
+                    errors.append(f"{gwhere}: semantics values do not match the boundaries")
+                elif any(v is not None and not (0 <= v < len(surfaces)) for v in values):
+                    errors.append(f"{gwhere}: semantics value out of range")
+
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate CityJSON 2.0 files")
+    parser.add_argument("files", nargs="+", help="CityJSON files to validate")
+    parser.add_argument("--schema", nargs="?", const=SCHEMA_URL,
+                        help=f"Also validate against the official schema, from this directory or URL (default: {SCHEMA_URL}; requires jsonschema)")
+    args = parser.parse_args()
+
+    validator = load_schema_validator(args.schema) if args.schema else None
+
+    failed = 0
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            errors = validate_cityjson(json.load(f), validator)
+        if errors:
+            failed += 1
+            print(f"❌ {path}: {len(errors)} error(s)")
+            for error in errors[:50]:
+                print(f"   - {error}")
+        else:
+            print(f"✅ {path}: valid CityJSON {CITYJSON_VERSION}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
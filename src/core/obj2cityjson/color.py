@@ -1,5 +1,10 @@
 import os
 import numpy as np
+from multiprocessing import Pool, cpu_count
+
+from .objio import format_vertices, format_faces, flatten_faces
+
+CATEGORIES = ("ground", "wall", "roof")
 
 def read_obj(path):
     vertices = []
@@ -14,22 +19,33 @@ def read_obj(path):
                 faces.append([int(p.split('/')[0]) - 1 for p in parts[1:]])
     return np.array(vertices), faces
 
-def compute_face_normal(v0, v1, v2):
-    a = v1 - v0
-    b = v2 - v0
-    normal = np.cross(a, b)
-    norm = np.linalg.norm(normal)
-    return normal / norm if norm != 0 else normal
-
-def get_face_category(vertices, face, z_min):
-    v = np.array([vertices[i] for i in face])
-    normal = compute_face_normal(v[0], v[1], v[2])
-    
-    if np.allclose(v[:, 2], z_min, atol=1e-5):
-        return "ground"
-    if abs(normal[2]) < 1e-3:
-        return "wall"
-    return "roof"
+def categorize_faces(vertices, flat_indices, face_sizes, z_min):
+    """
+    Categorize every face of a mesh as ground, wall or roof with array operations.
+
+    Faces are given as a flat index array plus per-face sizes. Returns an array of
+    indices into CATEGORIES (0 ground, 1 wall, 2 roof).
+    """
+    starts = np.cumsum(face_sizes) - face_sizes
+    last = starts + face_sizes - 1
+
+    # Ground: every vertex of the face lies at z_min (same tolerance as np.allclose)
+    at_ground = np.abs(vertices[flat_indices, 2] - z_min) <= 1e-5 + 1e-5 * abs(z_min)
+    ground = np.logical_and.reduceat(at_ground, starts)
+
+    # Normal from the first three vertices of each face
+    v0 = vertices[flat_indices[starts]]
+    a = vertices[flat_indices[np.minimum(starts + 1, last)]] - v0
+    b = vertices[flat_indices[np.minimum(starts + 2, last)]] - v0
+    nx = a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1]
+    ny = a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2]
+    nz = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    norm = np.sqrt(nx * nx + ny * ny + nz * nz)
+    nz = np.divide(nz, norm, out=np.zeros_like(norm), where=norm != 0)
+
+    categories = np.where(np.abs(nz) < 1e-3, 1, 2)
+    categories[ground] = 0
+    return categories
 
 def write_mtl(path, colors):
     with open(path, "w") as f:
@@ -37,21 +53,22 @@ def write_mtl(path, colors):
             f.write(f"newmtl {mat_name}\n")
             f.write(f"Kd {rgb[0]:.2f} {rgb[1]:.2f} {rgb[2]:.2f}\n\n")
 
-def write_obj(path, vertices, categorized_faces, mtl_filename):
+def write_categorized_obj(path, vertices, flat_indices, face_sizes, categories, mtl_filename):
+    """Write a mesh as OBJ with one usemtl block per category, faces as categorized by categorize_faces."""
+    face_ids = np.repeat(np.arange(len(face_sizes)), face_sizes)
+    parts = [f"mtllib {mtl_filename}\n", format_vertices(vertices, precision=None)]
+    for code, material in enumerate(CATEGORIES):
+        selected = categories == code
+        parts.append(f"usemtl {material}\n")
+        parts.append(format_faces(flat_indices[selected[face_ids]], face_sizes[selected], offset=1))
     with open(path, "w") as f:
-        f.write(f"mtllib {mtl_filename}\n")
-        for v in vertices:
-            f.write(f"v {v[0]} {v[1]} {v[2]}\n")
-        for material, faces in categorized_faces.items():
-            f.write(f"usemtl {material}\n")
-            for face in faces:
-                f.write("f " + " ".join(str(i + 1) for i in face) + "\n")
+        f.write("".join(parts))
 
 def process_obj_file(obj_path, output_folder, colors, index):
     # base = os.path.splitext(os.path.basename(obj_path))[0]
 
     if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
+        os.makedirs(output_folder, exist_ok=True)
 
     base_number = str(index)
     output_obj_path = os.path.join(output_folder, f"{base_number}.obj")
@@ -59,25 +76,27 @@ def process_obj_file(obj_path, output_folder, colors, index):
     mtl_path = os.path.join(output_folder, mtl_filename)
 
     vertices, faces = read_obj(obj_path)
+    flat_indices, face_sizes = flatten_faces(faces)
     z_min = np.min(vertices[:, 2])
-    categorized_faces = {"ground": [], "wall": [], "roof": []}
-
-    for face in faces:
-        category = get_face_category(vertices, face, z_min)
-        categorized_faces[category].append(face)
+    categories = categorize_faces(vertices, flat_indices, face_sizes, z_min)
 
     write_mtl(mtl_path, colors)
-    write_obj(output_obj_path, vertices, categorized_faces, mtl_filename)
+    write_categorized_obj(output_obj_path, vertices, flat_indices, face_sizes, categories, mtl_filename)
     print(f"Processed: {obj_path} -> {output_obj_path}")
 
+def process_obj_file_worker(args):
+    process_obj_file(*args)
+
 def coloring_obj(input_folder, output_folder, colors):
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    index = 1
+    obj_files = [f for f in sorted(os.listdir(input_folder)) if f.lower().endswith(".obj")]
+    tasks = [
+        (os.path.join(input_folder, filename), output_folder, colors, index)
+        for index, filename in enumerate(obj_files, start=1)
+    ]
 
-    for filename in sorted(os.listdir(input_folder)):
-        if filename.lower().endswith(".obj"):
-            obj_file_path = os.path.join(input_folder, filename)
-            process_obj_file(obj_file_path, output_folder, colors, index)
-            index += 1
\ No newline at end of file
+    with Pool(processes=max(1, cpu_count() - 1)) as pool:
+        for _ in pool.imap_unordered(process_obj_file_worker, tasks, chunksize=16):
+            pass
\ No newline at end of file
@@ -0,0 +1,6 @@
+import shapely
+
+# Shapely 2 has the vectorized geometry API (shapely.points, get_coordinates, STRtree
+# queries with a predicate, ...); on 1.8 callers take their fallback paths.
+# Kept apart from the heavy modules so GUI code can check it without importing them.
+SHAPELY_2 = shapely.__version__.startswith("2.")
@@ -0,0 +1,248 @@
+import json
+import mmap
+import numpy as np
+
+from .cityjsonio import DEFAULT_SCALE, CityJSONStreamWriter, normalize_reference_system, remap_indices
+
+CONFLICT_MODES = ("rename", "keep_first", "replace")
+
+def read_transform(document):
+    transform = document.get("transform")
+    if transform is None:
+        return None, None
+    return np.asarray(transform["scale"], dtype=np.float64), np.asarray(transform["translate"], dtype=np.float64)
+
+def read_file_transform(path, window=4096):
+    """
+    Return the transform (scale, translate) of a CityJSON file without parsing the document.
+
+    The file is searched for its "transform" member through mmap and only that small
+    object is decoded, so a large model costs one byte scan instead of a json.load.
+    Returns (None, None) when the file has no transform.
+    """
+    key = b'"transform"'
+    decoder = json.JSONDecoder()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        pos = data.find(key)
+        while pos >= 0:
+            text = data[pos + len(key):pos + len(key) + window].decode("utf-8", "replace").lstrip()
+            if text.startswith(":"):
+                try:
+                    value, _ = decoder.raw_decode(text[1:].lstrip())
+                except ValueError:
+                    value = None
+                # An attribute that happens to be called "transform" does not look like this
+                if isinstance(value, dict) and "scale" in value and "translate" in value:
+                    return read_transform({"transform": value})
+            pos = data.find(key, pos + 1)
+    return None, None
+
+def read_metadata(document):
+    """Return the metadata of a CityJSON document without its extent, referenceSystem normalized."""
+    metadata = {k: v for k, v in document.get("metadata", {}).items() if k != "geographicalExtent"}
+    if "referenceSystem" in metadata:
+        metadata["referenceSystem"] = normalize_reference_system(metadata["referenceSystem"])
+    return metadata
+
+def real_vertices(document):
+    """Return the vertices of a CityJSON document in real-world coordinates."""
+    vertices = np.asarray(document.get("vertices", []), dtype=np.float64).reshape(-1, 3)
+    scale, translate = read_transform(document)
+    if scale is not None:
+        vertices = vertices * scale + translate
+    return vertices
+
+def row_keys(quantized):
+    """View each (x, y, z) int64 row as one fixed-size bytes key that sorts and hashes as a unit."""
+    quantized = np.ascontiguousarray(quantized, dtype=">i8")
+    return quantized.view("S24").ravel()
+
+class VertexRegistry:
+    """
+    Global vertex table for deduplication across files.
+
+    Keys of the unique quantized vertices are kept in sorted runs next to their output
+    index. A file's unseen vertices become a new run, which is merged into the previous
+    run for as long as that one is not larger. Run sizes therefore shrink geometrically,
+    a lookup is one searchsorted call per run (O(log total) runs), and every key is
+    merged O(log total) times instead of the whole table being shifted for each file.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def lookup(self, keys):
+        """Return the output index of every key in `keys`, -1 for keys not seen yet."""
+        ids = np.full(len(keys), -1, dtype=np.int64)
+        for run_keys, run_ids in self.runs:
+            todo = np.flatnonzero(ids < 0)
+            if len(todo) == 0:
+                break
+            pos = np.minimum(np.searchsorted(run_keys, keys[todo]), len(run_keys) - 1)
+            hit = run_keys[pos] == keys[todo]
+            ids[todo[hit]] = run_ids[pos[hit]]
+        return ids
+
+    def add_run(self, keys, ids):
+        """Store sorted `keys` with their output indices, merging runs that are not larger."""
+        while self.runs and len(self.runs[-1][0]) <= len(keys):
+            run_keys, run_ids = self.runs.pop()
+            keys = np.concatenate([run_keys, keys])
+            ids = np.concatenate([run_ids, ids])
+            order = np.argsort(keys, kind="stable")
+            keys, ids = keys[order], ids[order]
+        self.runs.append((keys, ids))
+
+    def register(self, quantized, writer):
+        """Map every row of `quantized` to an output vertex index, writing new vertices."""
+        if len(quantized) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        unique_keys, first, inverse = np.unique(row_keys(quantized), return_index=True, return_inverse=True)
+        unique_ids = self.lookup(unique_keys)
+
+        new = unique_ids < 0
+        if new.any():
+            start = writer.add_quantized_vertices(quantized[first[new]])
+            unique_ids[new] = np.arange(start, start + int(new.sum()), dtype=np.int64)
+            self.add_run(unique_keys[new], unique_ids[new])
+
+        return unique_ids[inverse.ravel()]
+
+def strip_appearance(city_object):
+    for geometry in city_object.get("geometry", []):
+        geometry.pop("material", None)
+        geometry.pop("texture", None)
+
+def unique_id(object_id, file_index, taken):
+    candidate = f"{object_id}_{file_index}"
+    n = 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{object_id}_{file_index}_{n}"
+    return candidate
+
+def read_document(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def merge_cityjson(input_paths, output_path, on_conflict="rename", scale=None, finest_scale=False, log=print):
+    """
+    Merge N CityJSON files into one CityJSON 2.0 file without cjio.
+
+    Files are read one at a time. Their vertices are re-quantized onto a shared
+    transform, deduplicated against all vertices already written, and every boundary
+    index is remapped with one NumPy lookup per file. CityObjects are streamed to the
+    output as soon as their file has been processed.
+
+    The output takes the transform and metadata of the first file, and the other files
+    are re-quantized onto that transform. `scale` overrides the scale; finest_scale=True
+    uses the smallest scale of all inputs (per axis) instead, so no input loses
+    precision, at the cost of scanning every file for its transform up front
+    (read_file_transform). Every file is parsed once.
+
+    on_conflict decides what happens when a CityObject ID already exists:
+        "rename"      keep both, the later object gets an "<id>_<file index>" suffix
+        "keep_first"  keep the object from the earliest file
+        "replace"     keep the object from the latest file
+    """
+    if on_conflict not in CONFLICT_MODES:
+        raise ValueError(f"on_conflict must be one of {CONFLICT_MODES}")
+    if not input_paths:
+        raise ValueError("No input files given")
+
+    # "replace" is "keep_first" over the files in reverse order, which keeps the merge streaming
+    ordered = list(enumerate(input_paths))
+    if on_conflict == "replace":
+        ordered.reverse()
+
+    # The first file's transform is needed before anything is written. When that file is
+    # also merged first its document is kept for the merge, else only the transform is read.
+    document = None
+    if ordered[0][0] == 0:
+        document = read_document(input_paths[0])
+        first_scale, translate = read_transform(document)
+    else:
+        first_scale, translate = read_file_transform(input_paths[0])
+    if scale is None and finest_scale:
+        scales = [first_scale]
+        for path in input_paths[1:]:
+            log(f"🔎 Reading the transform of {path}")
+            scales.append(read_file_transform(path)[0])
+        scales = [s for s in scales if s is not None]
+        scale = np.min(scales, axis=0) if scales else None
+    if scale is None:
+        scale = first_scale if first_scale is not None else DEFAULT_SCALE
+
+    written_ids = set()
+    registry = VertexRegistry()
+    stats = {"files": 0, "objects": 0, "renamed": 0, "skipped": 0, "input_vertices": 0}
+
+    reference = None
+    with CityJSONStreamWriter(output_path, scale=scale, translate=translate) as writer:
+        for file_index, path in ordered:
+            log(f"📄 Reading {path}")
+            if document is None:
+                document = read_document(path)
+            if file_index == 0:
+                # Metadata is written when the writer closes, so the first file can come last
+                writer.metadata = read_metadata(document)
+
+            ref = normalize_reference_system(document.get("metadata", {}).get("referenceSystem"))
+            if reference is None:
+                reference = ref
+            elif ref is not None and ref != reference:
+                log(f"⚠️  {path} uses a different referenceSystem ({ref}); coordinates are merged as-is")
+
+            if "appearance" in document or "geometry-templates" in document:
+                log(f"⚠️  {path}: appearance and geometry templates are not merged and were dropped")
+
+            quantized = writer.quantize(real_vertices(document))
+            stats["input_vertices"] += len(quantized)
+            lookup = registry.register(quantized, writer)
+            del quantized
+
+            city_objects = document.get("CityObjects", {})
+            renames = {}
+            for object_id in city_objects:
+                if object_id in written_ids:
+                    if on_conflict == "rename":
+                        renames[object_id] = unique_id(object_id, file_index, written_ids)
+                    else:
+                        renames[object_id] = None
+
+            geometries = [g for obj in city_objects.values() for g in obj.get("geometry", []) if "boundaries" in g]
+            remapped = remap_indices([g["boundaries"] for g in geometries], lookup)
+            for geometry, boundaries in zip(geometries, remapped):
+                geometry["boundaries"] = boundaries
+                if not isinstance(geometry.get("lod"), str) and "lod" in geometry:
+                    geometry["lod"] = str(geometry["lod"])
+
+            for object_id, city_object in city_objects.items():
+                new_id = renames.get(object_id, object_id)
+                if new_id is None:
+                    stats["skipped"] += 1
+                    continue
+                if new_id != object_id:
+                    stats["renamed"] += 1
+                for relation in ("children", "parents"):
+                    if relation in city_object:
+                        city_object[relation] = [
+                            renames.get(other, other) for other in city_object[relation]
+                            if renames.get(other, other) is not None
+                        ]
+                strip_appearance(city_object)
+                writer.add_city_object(new_id, city_object)
+                written_ids.add(new_id)
+                stats["objects"] += 1
+
+            stats["files"] += 1
+            del city_objects, geometries, remapped
+            document = None
+
+    log(
+        f"✅ Merged {stats['files']} files: {stats['objects']} CityObjects, "
+        f"{writer.vertex_count} vertices (from {stats['input_vertices']}), "
+        f"{stats['renamed']} renamed, {stats['skipped']} duplicates skipped"
+    )
+    return stats
@@ -1,111 +1,164 @@
-import os
+import numpy as np
 from pathlib import Path
-from collections import defaultdict
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+
+from .objio import CHUNK_LINES, format_faces, parse_face_lines, shift_face_lines
+
+PARALLEL_MIN_FILES = 8
+FACE_BATCH = 100_000
+
+def count_obj_elements(obj_file):
+    """First pass: count v/vt/vn lines and collect the materials an OBJ uses."""
+    counts = {"v": 0, "vt": 0, "vn": 0}
+    materials = set()
+    with open(obj_file, "r") as f:
+        for line in f:
+            if line.startswith("v "):
+                counts["v"] += 1
+            elif line.startswith("vt "):
+                counts["vt"] += 1
+            elif line.startswith("vn "):
+                counts["vn"] += 1
+            elif line.startswith("usemtl"):
+                materials.add(line.strip().split()[1])
+    return counts, materials
 
 def merge_obj_mtl(input_folder, output_obj, output_mtl):
+    """
+    Merge every OBJ/MTL pair in a folder into one OBJ and one MTL file.
+
+    Pass 1 counts the v/vt/vn lines of each OBJ so every file's index offsets are known
+    up front. Pass 2 streams each OBJ line by line into the output, renaming materials on
+    the way; runs of consecutive face lines (up to FACE_BATCH) are shifted together with
+    shift_face_lines, so memory does not grow with the merged size.
+    Materials are renamed to "<file stem>_<material>" to keep them unique.
+    """
     input_folder = Path(input_folder)
     obj_files = sorted(input_folder.glob("*.obj"))
     mtl_files = sorted(input_folder.glob("*.mtl"))
 
-    merged_obj = []
-    merged_mtl = []
+    # Pass 1: per-file offsets and used materials
+    offsets = []
     material_map = {}  # (original_material, source_file) -> unique_material_name
-    material_defs = {}  # unique_material_name -> lines
-
-    v_offset = 0
-    vt_offset = 0
-    vn_offset = 0
-
-    merged_obj.append(f"mtllib {Path(output_mtl).name}\n")
-
+    v_offset = vt_offset = vn_offset = 0
     for obj_file in obj_files:
-        base_name = obj_file.stem
-        with open(obj_file, "r") as f:
-            lines = f.readlines()
-
-        v_list, vt_list, vn_list = [], [], []
-        f_lines = []
-        current_material = None
-
-        merged_obj.append(f"o {base_name}\n")
-
-        for line in lines:
-            if line.startswith("v "):
-                v_list.append(line)
-            elif line.startswith("vt "):
-                vt_list.append(line)
-            elif line.startswith("vn "):
-                vn_list.append(line)
-            elif line.startswith("usemtl"):
-                original = line.strip().split()[1]
-                key = (original, base_name)
-                if key not in material_map:
-                    material_map[key] = f"{base_name}_{original}"
-                current_material = material_map[key]
-                f_lines.append(f"usemtl {current_material}\n")
-            elif line.startswith("f "):
-                new_face = []
-                for part in line.strip().split()[1:]:
-                    indices = part.split("/")
-                    vi = int(indices[0]) + v_offset
-                    vti = int(indices[1]) + vt_offset if len(indices) > 1 and indices[1] else ''
-                    vni = int(indices[2]) + vn_offset if len(indices) > 2 and indices[2] else ''
-                    new = f"{vi}"
-                    if vti != '' or vni != '':
-                        new += f"/{vti}"
-                    if vni != '':
-                        if vti == '':
-                            new += f"/"
-                        new += f"/{vni}"
-                    new_face.append(new)
-                f_lines.append("f " + " ".join(new_face) + "\n")
-            elif line.startswith("mtllib") or line.startswith("o "):
-                continue  # skip
-            else:
-                f_lines.append(line)
-
-        merged_obj.extend(v_list)
-        merged_obj.extend(vt_list)
-        merged_obj.extend(vn_list)
-        merged_obj.extend(f_lines)
-
-        v_offset += len(v_list)
-        vt_offset += len(vt_list)
-        vn_offset += len(vn_list)
-
-    # Merge all MTL files
-    for mtl_file in mtl_files:
-        source_name = mtl_file.stem
-        with open(mtl_file, "r") as f:
-            lines = f.readlines()
-
-        current_lines = []
-        original = None
-
-        for line in lines:
-            if line.startswith("newmtl "):
-                if original and current_lines:
-                    for (orig_name, src_file), new_name in material_map.items():
-                        if orig_name == original and src_file == source_name:
-                            material_defs[new_name] = list(current_lines)
-                original = line.strip().split()[1]
-                current_lines = [f"newmtl {source_name}_{original}\n"]
-            elif original:
-                current_lines.append(line)
-
-        # Final block
-        if original and current_lines:
-            for (orig_name, src_file), new_name in material_map.items():
-                if orig_name == original and src_file == source_name:
-                    material_defs[new_name] = list(current_lines)
-
-    for matname, matlines in material_defs.items():
-        merged_mtl.extend(matlines)
-
-    with open(output_obj, "w") as f:
-        f.writelines(merged_obj)
-
-    with open(output_mtl, "w") as f:
-        f.writelines(merged_mtl)
-
-    print(f"✅ Merge Done:\nOBJ: {output_obj}\nMTL: {output_mtl}")
\ No newline at end of file
+        counts, materials = count_obj_elements(obj_file)
+        offsets.append((v_offset, vt_offset, vn_offset))
+        v_offset += counts["v"]
+        vt_offset += counts["vt"]
+        vn_offset += counts["vn"]
+        for original in materials:
+            material_map[(original, obj_file.stem)] = f"{obj_file.stem}_{original}"
+
+    # Pass 2: stream the OBJ files into the output
+    with open(output_obj, "w") as out:
+        out.write(f"mtllib {Path(output_mtl).name}\n")
+        for obj_file, (v_off, vt_off, vn_off) in zip(obj_files, offsets):
+            base_name = obj_file.stem
+            out.write(f"o {base_name}\n")
+            faces = []
+            with open(obj_file, "r") as f:
+                for line in f:
+                    if line.startswith("f "):
+                        faces.append(line)
+                        if len(faces) >= FACE_BATCH:
+                            out.write(shift_face_lines(faces, v_off, vt_off, vn_off))
+                            faces = []
+                        continue
+                    if faces:
+                        out.write(shift_face_lines(faces, v_off, vt_off, vn_off))
+                        faces = []
+                    if line.startswith("usemtl"):
+                        out.write(f"usemtl {material_map[(line.strip().split()[1], base_name)]}\n")
+                    elif line.startswith("mtllib") or line.startswith("o "):
+                        continue  # skip
+                    else:
+                        out.write(line)
+            if faces:
+                out.write(shift_face_lines(faces, v_off, vt_off, vn_off))
+
+    # Merge all MTL files, keeping only materials referenced by the OBJs
+    written = set()
+    with open(output_mtl, "w") as out:
+        for mtl_file in mtl_files:
+            source_name = mtl_file.stem
+            keep = False
+            with open(mtl_file, "r") as f:
+                for line in f:
+                    if line.startswith("newmtl "):
+                        new_name = material_map.get((line.strip().split()[1], source_name))
+                        keep = new_name is not None and new_name not in written
+                        if keep:
+                            written.add(new_name)
+                            out.write(f"newmtl {new_name}\n")
+                    elif keep:
+                        out.write(line)
+
+    print(f"✅ Merge Done:\nOBJ: {output_obj}\nMTL: {output_mtl}")
+
+def parse_obj_geometry(obj_path, chunk_lines=CHUNK_LINES):
+    """
+    Read the vertices and faces of one OBJ for merging.
+
+    Returns (vertex_text, vertex_count, flat_indices, face_sizes). Vertex lines are kept
+    verbatim; faces keep only their vertex index, made 1-based absolute within the file.
+    The file is read `chunk_lines` lines at a time and each chunk's face lines are parsed
+    into integer arrays with one parse_face_lines call.
+    """
+    vertex_lines = []
+    flat_blocks, size_blocks = [], []
+    with open(obj_path, "r") as f:
+        while True:
+            lines = list(islice(f, chunk_lines))
+            if not lines:
+                break
+            kind = np.array([line[:2] for line in lines])
+            is_vertex = kind == "v "
+            face_lines = np.flatnonzero(kind == "f ")
+            if len(face_lines):
+                flat, sizes = parse_face_lines([lines[i] for i in face_lines.tolist()])
+                # Relative indices count back from the vertices read before their face line
+                vertices_before = len(vertex_lines) + np.cumsum(is_vertex)[face_lines]
+                flat_blocks.append(np.where(flat < 0, np.repeat(vertices_before, sizes) + 1 + flat, flat))
+                size_blocks.append(sizes)
+            vertex_lines.extend(lines[i] for i in np.flatnonzero(is_vertex).tolist())
+    if vertex_lines and not vertex_lines[-1].endswith("\n"):
+        vertex_lines[-1] += "\n"
+
+    def concat(blocks):
+        return np.concatenate(blocks) if blocks else np.empty(0, dtype=np.int64)
+
+    return "".join(vertex_lines), len(vertex_lines), concat(flat_blocks), concat(size_blocks)
+
+def merge_obj_files(obj_paths, output_path, processes=None):
+    """
+    Merge N OBJ files into one, streaming each file's vertices and then its faces.
+
+    Files are parsed in parallel; each file's faces become an integer array, shifted by
+    the file's vertex offset in one NumPy add and written with bulk formatting right
+    after its vertices instead of being kept until every file has been read.
+    Returns the number of vertices and faces written.
+    """
+    obj_paths = list(obj_paths)
+    if processes is None:
+        processes = max(1, cpu_count() - 1)
+
+    v_offset = face_count = 0
+    with open(output_path, "w") as out:
+        def write(vertex_text, vertex_count, flat, sizes):
+            nonlocal v_offset, face_count
+            out.write(vertex_text)
+            out.write(format_faces(flat, sizes, offset=v_offset))
+            v_offset += vertex_count
+            face_count += len(sizes)
+
+        if processes > 1 and len(obj_paths) >= PARALLEL_MIN_FILES:
+            with Pool(processes=min(processes, len(obj_paths))) as pool:
+                for result in pool.imap(parse_obj_geometry, obj_paths, chunksize=4):
+                    write(*result)
+        else:
+            for path in obj_paths:
+                write(*parse_obj_geometry(path))
+
+    return v_offset, face_count
\ No newline at end of file
@@ -0,0 +1,230 @@
+from itertools import islice
+
+import numpy as np
+
+CHUNK_LINES = 1_000_000
+
+def format_vertices(vertices, precision=6, prefix="v"):
+    """
+    Format an (N, 3) array as OBJ vertex lines in one string operation.
+
+    A single repeated format string is applied to the flattened array, which is
+    much faster than writing one f-string per vertex. With precision=None each
+    coordinate is written as its shortest round-trip repr, like str(float).
+    `precision` may also be given per axis, e.g. (None, None, 6).
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    if len(vertices) == 0:
+        return ""
+    if precision is None or np.isscalar(precision):
+        precision = (precision,) * 3
+    row = prefix + "".join(" %r" if p is None else f" %.{p}f" for p in precision) + "\n"
+    return (row * len(vertices)) % tuple(vertices.ravel().tolist())
+
+def format_faces(flat_indices, face_sizes, offset=1, prefix="f"):
+    """
+    Format faces stored as a flat index array plus per-face sizes as OBJ face lines.
+
+    Indices are written with `offset` added (1 for 0-based input). Consecutive faces
+    with the same vertex count are formatted together, so triangle and quad meshes
+    are written in a handful of string operations while the face order is kept.
+    """
+    flat_indices = np.asarray(flat_indices, dtype=np.int64) + offset
+    return _format_face_runs(flat_indices.tolist(), face_sizes, prefix, "%d")
+
+def _format_face_runs(values, face_sizes, prefix, spec, width=1):
+    # `values` holds `width` entries per face corner, formatted by `spec` as one reference
+    face_sizes = np.asarray(face_sizes, dtype=np.int64)
+    if len(face_sizes) == 0:
+        return ""
+
+    # Boundaries of runs of equally sized faces
+    change = np.flatnonzero(np.diff(face_sizes)) + 1
+    run_starts = np.concatenate(([0], change))
+    run_ends = np.concatenate((change, [len(face_sizes)]))
+    vertex_starts = np.concatenate(([0], np.cumsum(face_sizes))) * width
+
+    parts = []
+    for start, end in zip(run_starts, run_ends):
+        size = int(face_sizes[start])
+        block = values[vertex_starts[start]:vertex_starts[end]]
+        row = prefix + f" {spec}" * size + "\n"
+        parts.append((row * (end - start)) % tuple(block))
+    return "".join(parts)
+
+def _shift_indices(indices, offset):
+    # Relative (negative) indices stay valid as long as lines keep their original order
+    return np.where(indices > 0, indices + offset, indices)
+
+def _face_refs(lines):
+    """Split face lines into their vertex references ("v", "v/vt", ...) and per-face sizes."""
+    tokens = " ".join(lines).split()
+    starts = [i for i, token in enumerate(tokens) if token == "f"]
+    face_sizes = np.diff(np.append(starts, len(tokens))).astype(np.int64) - 1
+    return [token for token in tokens if token != "f"], face_sizes
+
+def _uniform_face_indices(refs):
+    """
+    Parse face references that all share the layout of the first one.
+
+    Returns (values, present, spec): a (references, kinds) int64 array of the indices the
+    layout has, which of v/vt/vn it has and its format spec (e.g. "%d//%d"). Returns None
+    when the references mix layouts.
+    """
+    present = [part != "" for part in refs[0].split("/")]
+    spec = "/".join("%d" if p else "" for p in present)
+    text = " ".join(refs)
+    numbers = text.replace("/", " ").split()
+    if len(numbers) != sum(present) * len(refs):
+        return None
+    values = np.array(numbers, dtype=np.int64).reshape(len(refs), -1)
+    # An equal count of numbers is not enough: the layout matches only if the text round-trips
+    if " ".join([spec] * len(refs)) % tuple(values.ravel().tolist()) != text:
+        return None
+    return values, present, spec
+
+def shift_face_lines(lines, v_offset, vt_offset=0, vn_offset=0):
+    """
+    Rewrite a batch of OBJ face lines with their v/vt/vn indices shifted by the given offsets.
+
+    When every reference has the layout of the first one ("v", "v/vt", "v//vn" or
+    "v/vt/vn"), all indices are parsed into one (references, kinds) integer array, shifted
+    per column and written back in bulk. Batches that mix layouts are shifted per reference.
+    """
+    refs, face_sizes = _face_refs(lines)
+    if not refs:
+        return ""
+
+    parsed = _uniform_face_indices(refs)
+    if parsed is not None:
+        values, present, spec = parsed
+        offsets = [offset for offset, p in zip((v_offset, vt_offset, vn_offset), present) if p]
+        for column, offset in enumerate(offsets):
+            values[:, column] = _shift_indices(values[:, column], offset)
+        return _format_face_runs(values.ravel().tolist(), face_sizes, "f", spec, len(offsets))
+
+    shifted = []
+    for ref in refs:
+        parts = ref.split("/")
+        for k, offset in enumerate((v_offset, vt_offset, vn_offset)[:len(parts)]):
+            if parts[k] and int(parts[k]) > 0:
+                parts[k] = str(int(parts[k]) + offset)
+        shifted.append("/".join(parts))
+    return _format_face_runs(shifted, face_sizes, "f", "%s")
+
+def parse_vertex_lines(lines):
+    """Parse a list of 'v x y z' lines into an (N, 3) float array in one call."""
+    values = np.array(" ".join(line[1:] for line in lines).split(), dtype=np.float64)
+    if len(values) == 3 * len(lines):
+        return values.reshape(-1, 3)
+    # Vertices with extra components (w, vertex colors): keep x, y, z only
+    return np.array([line.split()[1:4] for line in lines], dtype=np.float64)
+
+FACE_BYTES = b"0123456789-/f \t\r\n"  # everything the bulk face parser reads
+
+def _face_vertex_indices(data):
+    """Vertex indices of face lines given as bytes: "/vt/vn" suffixes are blanked out, then one NumPy parse."""
+    codes = np.frombuffer(data, dtype=np.uint8)
+    slash = np.flatnonzero(codes == ord("/"))
+    if len(slash):
+        space = np.flatnonzero(codes <= ord(" "))
+        end = space[np.searchsorted(space, slash)]
+        first = np.concatenate(([True], end[1:] != end[:-1]))
+        # +1 at the first slash of a reference, -1 at the whitespace that ends it
+        delta = np.zeros(len(codes) + 1, dtype=np.int8)
+        delta[slash[first]] = 1
+        delta[end[first]] = -1
+        codes = codes.copy()
+        codes[np.cumsum(delta[:-1], dtype=np.int8).view(bool)] = ord(" ")
+        data = codes.tobytes()
+    return np.fromstring(data.replace(b"f", b" "), dtype=np.int64, sep=" ")
+
+def parse_face_lines(lines):
+    """
+    Parse a batch of OBJ face lines into (flat_indices, face_sizes) arrays of vertex indices.
+
+    Indices are returned as written: 1-based, negative for relative references. Texture
+    and normal references are dropped. The whole batch is parsed as one byte string
+    (_face_vertex_indices); anything it does not read, such as comments or malformed
+    references, is parsed reference by reference instead.
+    """
+    if not lines:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    data = "".join(lines).encode() + b"\n"
+    if any(gap in data for gap in (b"\t", b"  ", b" \n", b" \r")):
+        face_sizes = np.array([len(line.split()) - 1 for line in lines], dtype=np.int64)
+    else:
+        # Single spaces only: a face has as many references as spaces
+        face_sizes = np.array([line.count(" ") for line in lines], dtype=np.int64)
+    if not data.translate(None, FACE_BYTES):
+        flat = _face_vertex_indices(data)
+        if len(flat) == face_sizes.sum():
+            return flat, face_sizes
+
+    refs, face_sizes = _face_refs(lines)
+    return np.array([ref.split("/", 1)[0] for ref in refs], dtype=np.int64), face_sizes
+
+def read_obj_arrays(obj_path, chunk_lines=CHUNK_LINES):
+    """
+    Read the vertices, faces and groups of an OBJ into NumPy arrays.
+
+    Returns (vertices, flat_indices, face_sizes, face_group, groups): the (N, 3) vertices,
+    the faces as 0-based flat indices plus per-face sizes, and for every face the index
+    of its group in `groups`, the "g" names in order of first use (faces before the first
+    "g" line belong to a group named None). The file is read `chunk_lines` lines at a
+    time and each chunk's vertex and face lines are parsed with one call each.
+    """
+    groups = {}
+    current = -1
+    vertex_count = 0
+    vertex_blocks, flat_blocks, size_blocks, group_blocks = [], [], [], []
+    with open(obj_path, "r") as f:
+        while True:
+            lines = list(islice(f, chunk_lines))
+            if not lines:
+                break
+            kind = np.array([line[:2] for line in lines])
+            vertex_lines = np.flatnonzero(kind == "v ")
+            face_lines = np.flatnonzero(kind == "f ")
+            group_lines = np.flatnonzero(kind == "g ")
+
+            # Group of every line: forward-fill the group ids set by "g" lines
+            if current < 0 and len(face_lines) and (len(group_lines) == 0 or face_lines[0] < group_lines[0]):
+                current = groups.setdefault(None, len(groups))
+            marks = np.full(len(lines), -1, dtype=np.int64)
+            marks[0] = current
+            for i in group_lines.tolist():
+                name = lines[i].split()
+                marks[i] = groups.setdefault(name[1] if len(name) > 1 else None, len(groups))
+            last_mark = np.maximum.accumulate(np.where(marks >= 0, np.arange(len(lines)), 0))
+            line_group = marks[last_mark]
+            current = int(line_group[-1])
+
+            if len(face_lines):
+                flat, sizes = parse_face_lines([lines[i] for i in face_lines.tolist()])
+                # Relative indices count back from the vertices read before their face line
+                vertices_before = vertex_count + np.cumsum(kind == "v ")[face_lines]
+                flat = np.where(flat < 0, np.repeat(vertices_before, sizes) + flat, flat - 1)
+                flat_blocks.append(flat)
+                size_blocks.append(sizes)
+                group_blocks.append(line_group[face_lines])
+            if len(vertex_lines):
+                vertex_blocks.append(parse_vertex_lines([lines[i] for i in vertex_lines.tolist()]))
+                vertex_count += len(vertex_lines)
+
+    def concat(blocks, empty):
+        return np.concatenate(blocks) if blocks else empty
+
+    return (
+        concat(vertex_blocks, np.empty((0, 3))),
+        concat(flat_blocks, np.empty(0, dtype=np.int64)),
+        concat(size_blocks, np.empty(0, dtype=np.int64)),
+        concat(group_blocks, np.empty(0, dtype=np.int64)),
+        list(groups),
+    )
+
+def flatten_faces(faces):
+    """Convert a list of index lists into (flat_indices, face_sizes) int arrays."""
+    face_sizes = np.fromiter((len(face) for face in faces), dtype=np.int64, count=len(faces))
+    flat_indices = np.fromiter((i for face in faces for i in face), dtype=np.int64, count=int(face_sizes.sum()))
+    return flat_indices, face_sizes
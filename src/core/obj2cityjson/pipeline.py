@@ -0,0 +1,233 @@
+import os
+import tempfile
+import numpy as np
+from tqdm import tqdm
+
+from .separator import separate_buildings, building_meshes
+from .color import CATEGORIES, categorize_faces, write_categorized_obj, write_mtl
+from .objio import format_vertices, format_faces
+from .tojson import add_building
+from .cityjsonio import CityJSONStreamWriter, CITYJSON_VERSION
+
+SPILL_BYTES = 1 << 30  # keep up to 1 GiB of building meshes in RAM
+SURFACE_TYPES = [category.capitalize() + "Surface" for category in CATEGORIES]
+
+_stage_queue = None  # set in pool workers by init_stage_queue
+
+class SpillBuffer:
+    """
+    Append-only 1-D array that lives in memory until spill() is called.
+
+    After spilling, everything appended so far and later goes to a raw scratch file,
+    which finalize() maps back with np.memmap.
+    """
+
+    def __init__(self, dtype, path):
+        self.dtype = np.dtype(dtype)
+        self.path = path
+        self.size = 0
+        self._chunks = []
+        self._file = None
+        self.spilled = False
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def append(self, values):
+        values = np.ascontiguousarray(values, dtype=self.dtype).ravel()
+        start = self.size
+        if self._file is not None:
+            self._file.write(values.tobytes())
+        else:
+            self._chunks.append(values)
+        self.size += len(values)
+        return start
+
+    def spill(self):
+        if self.spilled:
+            return
+        self._file = open(self.path, "wb")
+        for chunk in self._chunks:
+            self._file.write(chunk.tobytes())
+        self._chunks = []
+        self.spilled = True
+
+    def finalize(self):
+        if self.spilled:
+            self._file.close()
+            self._file = None
+            if self.size == 0:
+                return np.empty(0, dtype=self.dtype)
+            return np.memmap(self.path, dtype=self.dtype, mode="r", shape=(self.size,))
+        return np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype=self.dtype)
+
+class BuildingStore:
+    """
+    Per-building meshes of a split scene, packed into four flat arrays.
+
+    Each building keeps its vertices (already lifted to the base height), its faces as
+    local flat indices plus face sizes, and the surface category of every face. When
+    the packed arrays outgrow `spill_bytes` they move to memory-mapped scratch files
+    in `scratch_dir`, so the pipeline's memory stays bounded for very large scenes.
+    """
+
+    def __init__(self, scratch_dir, spill_bytes=SPILL_BYTES):
+        self.spill_bytes = spill_bytes
+        self._vertices = SpillBuffer(np.float64, os.path.join(scratch_dir, "vertices.bin"))
+        self._indices = SpillBuffer(np.int32, os.path.join(scratch_dir, "indices.bin"))
+        self._sizes = SpillBuffer(np.int32, os.path.join(scratch_dir, "sizes.bin"))
+        self._categories = SpillBuffer(np.int8, os.path.join(scratch_dir, "categories.bin"))
+        self.keys = []
+        self._records = []
+        self.vertices = self.indices = self.sizes = self.categories = None
+
+    @property
+    def spilled(self):
+        return self._vertices.spilled
+
+    def buffers(self):
+        return (self._vertices, self._indices, self._sizes, self._categories)
+
+    def add(self, key, vertices, flat, sizes, categories):
+        record = (
+            self._vertices.append(vertices) // 3, len(vertices),
+            self._indices.append(flat), len(flat),
+            self._sizes.append(sizes), len(sizes),
+        )
+        self._categories.append(categories)
+        self.keys.append(key)
+        self._records.append(record)
+
+        if not self.spilled and sum(b.nbytes for b in self.buffers()) > self.spill_bytes:
+            for buffer in self.buffers():
+                buffer.spill()
+
+    def finalize(self):
+        self.vertices, self.indices, self.sizes, self.categories = (b.finalize() for b in self.buffers())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def mesh(self, i):
+        """Return (vertices, flat, sizes, categories) of the i-th building."""
+        v_start, v_count, i_start, i_count, f_start, f_count = self._records[i]
+        vertices = np.asarray(self.vertices[3 * v_start:3 * (v_start + v_count)]).reshape(-1, 3)
+        flat = np.asarray(self.indices[i_start:i_start + i_count], dtype=np.int64)
+        sizes = np.asarray(self.sizes[f_start:f_start + f_count], dtype=np.int64)
+        categories = np.asarray(self.categories[f_start:f_start + f_count])
+        return vertices, flat, sizes, categories
+
+def group_by_category(flat, sizes, categories):
+    """Reorder faces so they are grouped ground, wall, roof, keeping their order within each group."""
+    order = np.argsort(categories, kind="stable")
+    starts = np.cumsum(sizes) - sizes
+    new_sizes = sizes[order]
+    new_starts = np.cumsum(new_sizes) - new_sizes
+    gather = np.repeat(starts[order] - new_starts, new_sizes) + np.arange(new_sizes.sum())
+    return flat[gather], new_sizes, categories[order]
+
+def write_merged_obj(store, order, output_obj, output_mtl, colors):
+    """Write every building as one object of a merged OBJ, with per-building materials."""
+    v_offset = 0
+    with open(output_obj, "w") as obj, open(output_mtl, "w") as mtl:
+        obj.write(f"mtllib {os.path.basename(output_mtl)}\n")
+        for i in tqdm(order, desc="Merging OBJ"):
+            key = store.keys[i]
+            vertices, flat, sizes, categories = store.mesh(i)
+            face_ids = np.repeat(np.arange(len(sizes)), sizes)
+
+            parts = [f"o {key}\n", format_vertices(vertices)]
+            for code, material in enumerate(CATEGORIES):
+                selected = categories == code
+                parts.append(f"usemtl {key}_{material}\n")
+                parts.append(format_faces(flat[selected[face_ids]], sizes[selected], offset=v_offset + 1))
+            obj.write("".join(parts))
+            v_offset += len(vertices)
+
+            for material, rgb in colors.items():
+                mtl.write(f"newmtl {key}_{material}\n")
+                mtl.write(f"Kd {rgb[0]:.2f} {rgb[1]:.2f} {rgb[2]:.2f}\n\n")
+
+def write_cityjson(store, order, output_path, epsg):
+    with CityJSONStreamWriter(output_path, epsg) as writer:
+        for i in tqdm(order, desc="Converting to CityJSON"):
+            vertices, flat, sizes, categories = store.mesh(i)
+            flat, sizes, categories = group_by_category(flat, sizes, categories)
+            surfaces = [SURFACE_TYPES[c] for c in categories.tolist()]
+            add_building(writer, store.keys[i], vertices, flat, sizes, surfaces)
+
+def write_colored_folder(store, output_folder, colors):
+    """Write one colored OBJ/MTL pair per building, as coloring_obj would."""
+    os.makedirs(output_folder, exist_ok=True)
+    for i, key in enumerate(tqdm(store.keys, desc="Writing colored OBJ")):
+        vertices, flat, sizes, categories = store.mesh(i)
+        mtl_filename = f"{key}.mtl"
+        write_mtl(os.path.join(output_folder, mtl_filename), colors)
+        # Same 6 decimals the split OBJ files carried into coloring_obj
+        write_categorized_obj(
+            os.path.join(output_folder, f"{key}.obj"), np.round(vertices, 6), flat, sizes, categories, mtl_filename
+        )
+
+def run_fused_pipeline(obj_path, geojson_path, origin_utm, colors, uuid_prefix=None, user=None,
+                       output_geojson=None, output_obj=None, output_mtl=None, output_cityjson=None, epsg=None,
+                       colored_dir=None, spill_bytes=SPILL_BYTES, on_stage=print):
+    """
+    Split, categorize, merge and convert a scene without intermediate OBJ folders.
+
+    Buildings are separated by footprint and categorized straight into a BuildingStore;
+    only the requested outputs are written: the GeoJSON with UUIDs, the merged OBJ/MTL,
+    the CityJSON file and, for the CityGML converter, the per-building colored folder.
+    Buildings are numbered and ordered exactly like the split → coloring_obj →
+    merge_obj_mtl / obj_folder_to_cityjson chain. `on_stage` is called with a message at
+    the start of every stage (and may raise to cancel).
+    Returns the number of buildings.
+    """
+    with tempfile.TemporaryDirectory(prefix="pipeline_") as scratch_dir:
+        on_stage("📄 Read OBJ and split by GeoJSON")
+        utm_vertices, uuid_faces = separate_buildings(obj_path, geojson_path, origin_utm, uuid_prefix, user, output_geojson)
+
+        on_stage("🎨 Categorizing surfaces")
+        # coloring_obj numbers the split files 1..n in file name order
+        uuids = sorted((u for u, (_, sizes) in uuid_faces.items() if len(sizes)), key=lambda u: f"{u}.obj")
+        store = BuildingStore(scratch_dir, spill_bytes)
+        meshes = building_meshes(utm_vertices, uuid_faces, origin_utm[2], uuids)
+        for index, (_, vertex_ids, local_faces, face_sizes, delta_z) in enumerate(tqdm(meshes, total=len(uuids), desc="Categorizing"), start=1):
+            vertices = utm_vertices[vertex_ids]
+            vertices[:, 2] += delta_z
+            categories = categorize_faces(vertices, local_faces, face_sizes, vertices[:, 2].min())
+            store.add(str(index), vertices, local_faces, face_sizes, categories)
+        del utm_vertices, uuid_faces
+        store.finalize()
+        if store.spilled:
+            print(f"💽 Building meshes spilled to memory-mapped scratch files in {scratch_dir}")
+
+        # The folder based stages read the colored files back in file name order
+        order = sorted(range(len(store)), key=lambda i: f"{store.keys[i]}.obj")
+
+        if output_obj:
+            on_stage("✅ Writing merged OBJ")
+            write_merged_obj(store, order, output_obj, output_mtl, colors)
+            print(f"✅ Merge Done:\nOBJ: {output_obj}\nMTL: {output_mtl}")
+
+        if output_cityjson:
+            on_stage("🏙️ Start converting to CityJSON")
+            write_cityjson(store, order, output_cityjson, epsg)
+            print(f"✅ Saved (v{CITYJSON_VERSION}): {output_cityjson}")
+
+        if colored_dir:
+            on_stage("🎨 Writing colored OBJ per building")
+            write_colored_folder(store, colored_dir, colors)
+
+        count = len(store)
+        del store
+    return count
+
+def init_stage_queue(queue):
+    """Pool initializer: stage messages of run_fused_pipeline_queued go to `queue`."""
+    global _stage_queue
+    _stage_queue = queue
+
+def run_fused_pipeline_queued(kwargs):
+    """Pool task running run_fused_pipeline(**kwargs), so a GUI can terminate it mid-stage."""
+    return run_fused_pipeline(**kwargs, on_stage=_stage_queue.put)
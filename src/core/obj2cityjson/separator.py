@@ -1,44 +1,156 @@
 import os
-import uuid
+import json
+import tempfile
 import numpy as np
 import geopandas as gpd
-from shapely.geometry import Point
+import shapely
+from shapely.geometry import mapping
+from shapely.strtree import STRtree
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
 from datetime import datetime
 
-def parse_obj_with_group(obj_path):
-    vertices = []
-    group_faces = {}
-    current_group = None
-
-    with open(obj_path, 'r') as f:
-        for line in f:
-            if line.startswith('v '):
-                parts = list(map(float, line.strip().split()[1:4]))
-                vertices.append(parts)
-            elif line.startswith('g '):
-                current_group = line.strip().split()[1]
-                if current_group not in group_faces:
-                    group_faces[current_group] = []
-            elif line.startswith('f '):
-                face = [int(part.split('/')[0]) - 1 for part in line.strip().split()[1:]]
-                group_faces[current_group].append(face)
-    return np.array(vertices), group_faces
+from .objio import format_vertices, format_faces, read_obj_arrays
+from .compat import SHAPELY_2
+
+if not SHAPELY_2:
+    from shapely import vectorized as shapely_vectorized
+
+def group_representative_points(vertices, flat, face_sizes, face_group, n_groups):
+    """
+    Compute one XY representative point per group, vectorized over all faces.
+
+    Faces are 0-based flat indices plus per-face sizes, face_group holds each face's group.
+    Every face is fan-triangulated and projected onto the XY plane; the point is the
+    area-weighted centroid of those triangles, i.e. the centroid of the group's
+    footprint (walls project to zero area and drop out). Groups without any projected
+    area fall back to the mean of their face vertices.
+    Returns (points, has_faces), one row per group.
+    """
+    if len(flat) == 0:
+        return np.empty((n_groups, 2)), np.zeros(n_groups, dtype=bool)
+
+    face_start = np.concatenate(([0], np.cumsum(face_sizes)[:-1]))
+    xy = vertices[:, :2]
+
+    # Fan triangulation (v0, vk, vk+1) of every face with at least 3 vertices
+    n_tri = np.maximum(face_sizes - 2, 0)
+    tri_face = np.repeat(np.arange(len(face_sizes)), n_tri)
+    tri_k = np.arange(n_tri.sum()) - np.repeat(np.cumsum(n_tri) - n_tri, n_tri)
+    a = xy[flat[face_start[tri_face]]]
+    b = xy[flat[face_start[tri_face] + 1 + tri_k]]
+    c = xy[flat[face_start[tri_face] + 2 + tri_k]]
+    # Signed fan areas sum to the face's polygon area, so concave faces come out right;
+    # only the per-face total is made positive (faces may wind either way)
+    area = 0.5 * ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+    centroid = (a + b + c) / 3.0
+    n_faces = len(face_sizes)
+    face_area = np.bincount(tri_face, weights=area, minlength=n_faces)
+    face_mx = np.bincount(tri_face, weights=area * centroid[:, 0], minlength=n_faces)
+    face_my = np.bincount(tri_face, weights=area * centroid[:, 1], minlength=n_faces)
+    # |A| * (moment / A) = sign(A) * moment: each face weighted by its absolute area
+    sign = np.sign(face_area)
+
+    area_sum = np.bincount(face_group, weights=np.abs(face_area), minlength=n_groups)
+    cx = np.bincount(face_group, weights=sign * face_mx, minlength=n_groups)
+    cy = np.bincount(face_group, weights=sign * face_my, minlength=n_groups)
+
+    # Fallback: plain mean of the face vertices
+    vert_group = np.repeat(face_group, face_sizes)
+    count = np.bincount(vert_group, minlength=n_groups)
+    mx = np.bincount(vert_group, weights=xy[flat, 0], minlength=n_groups)
+    my = np.bincount(vert_group, weights=xy[flat, 1], minlength=n_groups)
+
+    has_area = area_sum > 1e-12
+    has_faces = count > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        points = np.where(
+            has_area[:, None],
+            np.column_stack((cx, cy)) / area_sum[:, None],
+            np.column_stack((mx, my)) / count[:, None]
+        )
+    return points, has_faces
+
+def query_containing(polygons, points):
+    """
+    Bulk point-in-polygon query over all points at once.
+
+    Returns two aligned index arrays (point_idx, polygon_idx) for every point that
+    lies inside a polygon. Shapely 2.x queries its STRtree with a predicate. On
+    Shapely 1.8 the geopandas spatial index does it: with rtree, the bounding-box
+    candidates of all points come from one intersection_v call and each footprint
+    tests all of its candidate points at once with shapely.vectorized.contains
+    (rtree's query_bulk loops in Python per point); with pygeos, one query_bulk.
+    """
+    if SHAPELY_2:
+        tree = STRtree(polygons)
+        point_idx, polygon_idx = tree.query(shapely.points(points), predicate="within")
+        return point_idx, polygon_idx
+
+    polygons = list(polygons)
+    xy = np.ascontiguousarray(points, dtype=np.float64)
+    sindex = gpd.GeoSeries(polygons).sindex
+    if not hasattr(sindex, "intersection_v"):
+        # pygeos backend: query_bulk is already vectorized
+        point_idx, polygon_idx = sindex.query_bulk(gpd.GeoSeries(gpd.points_from_xy(xy[:, 0], xy[:, 1])), predicate="within")
+        return point_idx.astype(np.int64), polygon_idx.astype(np.int64)
+    polygon_idx, counts = sindex.intersection_v(xy, xy)
+    polygon_idx = polygon_idx.astype(np.int64)
+    point_idx = np.repeat(np.arange(len(xy), dtype=np.int64), counts.astype(np.int64))
+
+    order = np.argsort(polygon_idx, kind="stable")
+    point_idx, polygon_idx = point_idx[order], polygon_idx[order]
+    bounds = np.flatnonzero(np.diff(polygon_idx)) + 1
+    inside = np.zeros(len(point_idx), dtype=bool)
+    for start, end in zip(np.concatenate(([0], bounds)).tolist(), np.concatenate((bounds, [len(point_idx)])).tolist()):
+        candidates = point_idx[start:end]
+        inside[start:end] = shapely_vectorized.contains(polygons[polygon_idx[start]], xy[candidates, 0], xy[candidates, 1])
+    return point_idx[inside], polygon_idx[inside]
+
+def assign_groups_to_footprints(vertices, flat, face_sizes, face_group, n_groups, gdf):
+    """
+    Match every OBJ group to the footprint containing its representative point.
+
+    All points are resolved in one spatial-index query. When footprints overlap, the first
+    matching row wins. Returns the footprint row of every group, -1 where none matched.
+    """
+    group_row = np.full(n_groups, -1, dtype=np.int64)
+    points, has_faces = group_representative_points(vertices, flat, face_sizes, face_group, n_groups)
+    if not has_faces.any() or gdf.empty:
+        return group_row
+
+    group_ids = np.flatnonzero(has_faces)
+    point_idx, polygon_idx = query_containing(list(gdf.geometry), points[has_faces])
+
+    # Keep the lowest footprint row per group, like the original first-match loop
+    order = np.lexsort((polygon_idx, point_idx))
+    point_idx, polygon_idx = point_idx[order], polygon_idx[order]
+    first = np.ones(len(point_idx), dtype=bool)
+    first[1:] = point_idx[1:] != point_idx[:-1]
+
+    group_row[group_ids[point_idx[first]]] = polygon_idx[first]
+    return group_row
+
+_shared_vertices = None
+
+def init_save_worker(vertices_path):
+    """Pool initializer: map the shared vertex buffer once per worker process."""
+    global _shared_vertices
+    _shared_vertices = np.load(vertices_path, mmap_mode="r")
 
 def save_obj_worker(args):
-    uuid, faces, original_vertices, index_map, output_dir, delta_z = args
+    uuid, vertex_ids, local_faces, face_sizes, output_dir, delta_z = args
     obj_filename = f"{uuid}.obj"
     obj_path = os.path.join(output_dir, obj_filename)
 
+    group_vertices = np.array(_shared_vertices[vertex_ids], dtype=np.float64)
+    group_vertices[:, 2] += delta_z
+
     with open(obj_path, 'w') as f:
         f.write(f"g {uuid}\n")
-        for i in index_map:
-            v = original_vertices[i]
-            f.write(f"v {v[0]} {v[1]} {v[2] + delta_z:.6f}\n")
-        for face in faces:
-            mapped = [str(index_map[idx] + 1) for idx in face]
-            f.write(f"f {' '.join(mapped)}\n")
+        # x and y as read (shortest repr), z shifted by delta_z to 6 decimals
+        f.write(format_vertices(group_vertices, precision=(None, None, 6)))
+        f.write(format_faces(local_faces, face_sizes))
 
 def increment_string(s):
     s = list(s)
@@ -51,22 +163,89 @@ def increment_string(s):
         i -= 1
     return 'A' + ''.join(s)
 
-def generate_auto_uuid(prefix, date_str, code_prefix, number, user):
-    random_part = uuid.uuid4().hex[:7].upper()
-    return f"{prefix}_{date_str}-{code_prefix}-{number:05d}-{user}-{random_part}"
+def generate_auto_uuids(count, prefix, date_str, user, code_prefix="AAAA", start_number=1):
+    """
+    Generate `count` sequential auto UUIDs in one pass.
 
-def split_obj_by_geojson(obj_path, geojson_path, output_dir, origin_utm, uuid_prefix='Bontang', user='Digital Twin UGM', output_geojson_path=None):
+    UUIDs look like {prefix}_{date}-{code}-{number:05d}-{user}-{7 random hex chars}.
+    Numbers run 1..99999 and then roll over into the next code (AAAA -> AAAB ...).
+    The random suffixes are drawn in bulk.
+    """
+    if count <= 0:
+        return []
+
+    seq = np.arange(start_number - 1, start_number - 1 + count)
+    code_index = seq // 99999
+    numbers = seq % 99999 + 1
+
+    codes = {}
+    code = code_prefix
+    for i in range(int(code_index[-1]) + 1):
+        codes[i] = code
+        code = increment_string(code)
+
+    random_parts = np.random.default_rng().integers(0, 16 ** 7, size=count)
+    return [
+        f"{prefix}_{date_str}-{codes[c]}-{n:05d}-{user}-{r:07X}"
+        for c, n, r in zip(code_index.tolist(), numbers.tolist(), random_parts.tolist())
+    ]
+
+def write_geojson(gdf, path):
+    """
+    Write a GeoDataFrame as GeoJSON quickly.
+
+    Uses pyogrio when it is installed; otherwise features are streamed straight to
+    the file as JSON instead of going through Fiona record by record.
+    """
+    try:
+        import pyogrio  # noqa: F401
+        gdf.to_file(path, driver="GeoJSON", engine="pyogrio")
+        return
+    except ImportError:
+        pass
+
+    # Properties are serialized by pandas in one call, geometries in bulk where Shapely allows it
+    properties = json.loads(
+        gdf.drop(columns=gdf.geometry.name).to_json(orient="records", date_format="iso", default_handler=str)
+    )
+    if SHAPELY_2:
+        geometries = shapely.to_geojson(gdf.geometry.values.data)
+    else:
+        geometries = [json.dumps(mapping(geom)) if geom is not None else None for geom in gdf.geometry]
+
+    # Same header as GDAL's GeoJSON driver: the layer name, and the crs as a URN (CRS84 for WGS 84)
+    epsg = gdf.crs.to_epsg() if gdf.crs is not None else None
+    crs_name = "urn:ogc:def:crs:OGC:1.3:CRS84" if epsg == 4326 else f"urn:ogc:def:crs:EPSG::{epsg}"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'{{"type": "FeatureCollection", "name": {json.dumps(os.path.splitext(os.path.basename(path))[0])}')
+        if epsg is not None:
+            f.write(f', "crs": {{"type": "name", "properties": {{"name": "{crs_name}"}}}}')
+        f.write(', "features": [\n')
+        f.write(",\n".join(
+            f'{{"type": "Feature", "properties": {json.dumps(props)}, "geometry": {geom or "null"}}}'
+            for props, geom in zip(properties, geometries)
+        ))
+        f.write("\n]}\n")
+
+def separate_buildings(obj_path, geojson_path, origin_utm, uuid_prefix='Bontang', user='Digital Twin UGM', output_geojson_path=None):
+    """
+    Read the OBJ and the footprints and assign every OBJ group to a footprint UUID.
+
+    Missing UUIDs are generated (and the GeoJSON written when a path is given).
+    Returns (utm_vertices, uuid_faces) where uuid_faces maps each UUID, in GeoJSON
+    order, to the faces of the groups that fell inside its footprint as (flat, face_sizes)
+    arrays: 0-based indices into utm_vertices, group by group in order of first use and
+    in file order within a group. The arrays are views into one buffer for all buildings.
+    """
     if uuid_prefix is None:
         obj_name = os.path.basename(obj_path)
         obj_stem = os.path.splitext(obj_name)[0]
         uuid_prefix = str(obj_stem)
     if user is None:
         user = 'Digital_Twin_UGM'
-    
-    os.makedirs(output_dir, exist_ok=True)
 
     print("📦 Reading OBJ...")
-    vertices, group_faces = parse_obj_with_group(obj_path)
+    vertices, flat, face_sizes, face_group, groups = read_obj_arrays(obj_path)
 
     utm_vertices = vertices.copy()
     utm_vertices[:, 0] += origin_utm[0]
@@ -75,69 +254,82 @@ def split_obj_by_geojson(obj_path, geojson_path, output_dir, origin_utm, uuid_pr
     print("🌍 Write GeoJSON...")
     gdf = gpd.read_file(geojson_path)
 
-    auto_uuid_number = 1
-    auto_uuid_code = "AAAA"
     date_str = datetime.today().strftime("%d%m%Y")  # Format: 23052025
 
     if "UUID" not in gdf.columns:
         print("⚠️  'UUID' Column is not found, created automatically...")
         gdf["UUID"] = None
 
-    for idx in gdf.index:
-        if gdf.at[idx, "UUID"] is None:
-            uuid_val = generate_auto_uuid(uuid_prefix, date_str, auto_uuid_code, auto_uuid_number, user)
-            gdf.at[idx, "UUID"] = uuid_val
-            auto_uuid_number += 1
-            if auto_uuid_number > 99999:
-                auto_uuid_code = increment_string(auto_uuid_code)
-                auto_uuid_number = 1
+    missing = gdf["UUID"].isna().to_numpy()
+    if missing.any():
+        gdf["UUID"] = gdf["UUID"].astype(object)
+        gdf.loc[missing, "UUID"] = generate_auto_uuids(int(missing.sum()), uuid_prefix, date_str, user)
 
     if output_geojson_path:
-        gdf.to_file(output_geojson_path, driver="GeoJSON")
+        write_geojson(gdf, output_geojson_path)
         print(f"📝 GeoJSON with UUID saved to: {output_geojson_path}")
 
-    uuid_faces = {}
-    uuid_indices = {}
+    print("🔍 Grouping with UUID GeoJSON...")
+    group_row = assign_groups_to_footprints(utm_vertices, flat, face_sizes, face_group, len(groups), gdf)
 
-    for idx, row in gdf.iterrows():
-        uuid_val = row["UUID"]
-        uuid_faces[uuid_val] = []
-        uuid_indices[uuid_val] = set()
+    # Rows sharing a UUID share one entry, like the UUID-keyed dict of the original loop;
+    # the trailing -1 is picked by group_row == -1, i.e. groups without a footprint
+    uuids = list(dict.fromkeys(gdf["UUID"]))
+    uuid_index = {uuid_val: i for i, uuid_val in enumerate(uuids)}
+    row_key = np.array([uuid_index[uuid_val] for uuid_val in gdf["UUID"]] + [-1], dtype=np.int64)
+    face_key = row_key[group_row][face_group]
 
-    print("🔍 Grouping with UUID GeoJSON...")
-    for group_name, faces in tqdm(group_faces.items(), desc="Memetakan grup"):
-        if not faces:
-            continue
-        sample_face = faces[0]
-        face_vertices = [utm_vertices[idx] for idx in sample_face]
-        center = np.mean(face_vertices, axis=0)
-        point = Point(center[0], center[1])
-
-        matched_uuid = None
-        for idx, row in gdf.iterrows():
-            if row['geometry'].contains(point):
-                matched_uuid = row['UUID']
-                break
-
-        if matched_uuid in uuid_faces:
-            uuid_faces[matched_uuid].extend(faces)
-            for face in faces:
-                uuid_indices[matched_uuid].update(face)
+    # One stable sort brings every building's faces together, ordered by group and file position
+    matched = np.flatnonzero(face_key >= 0)
+    order = matched[np.lexsort((face_group[matched], face_key[matched]))]
+    face_start = np.cumsum(face_sizes) - face_sizes
+    sorted_sizes = face_sizes[order]
+    sorted_start = np.cumsum(sorted_sizes) - sorted_sizes
+    sorted_flat = flat[np.repeat(face_start[order] - sorted_start, sorted_sizes) + np.arange(sorted_sizes.sum())]
+    del flat, face_group
 
-    print("💾 Saving OBJ after separation (multiprocessing)...")
-    tasks = []
-    for uuid_val in uuid_faces:
-        if uuid_faces[uuid_val]:
-            indices = sorted(uuid_indices[uuid_val])
-            index_map = {old: new for new, old in enumerate(indices)}
+    face_bounds = np.searchsorted(face_key[order], np.arange(len(uuids) + 1))
+    index_bounds = np.concatenate(([0], np.cumsum(sorted_sizes)))[face_bounds]
+    uuid_faces = {
+        uuid_val: (sorted_flat[index_bounds[k]:index_bounds[k + 1]], sorted_sizes[face_bounds[k]:face_bounds[k + 1]])
+        for k, uuid_val in enumerate(uuids)
+    }
+    return utm_vertices, uuid_faces
+
+def building_meshes(utm_vertices, uuid_faces, base_z, uuids=None):
+    """
+    Yield (uuid, vertex_ids, local_faces, face_sizes, delta_z) for every building with faces.
+
+    vertex_ids index the building's vertices in utm_vertices, local_faces/face_sizes are
+    its faces re-indexed onto those vertices (flat, 0-based), and delta_z lifts the
+    building so its lowest vertex sits at base_z.
+    """
+    for uuid_val in (uuid_faces if uuids is None else uuids):
+        flat, face_sizes = uuid_faces[uuid_val]
+        if len(face_sizes):
+            vertex_ids, local_faces = np.unique(flat, return_inverse=True)
+            z_min_local = utm_vertices[vertex_ids, 2].min()
+            delta_z = base_z - z_min_local
+
+            yield uuid_val, vertex_ids, local_faces.astype(np.int32), face_sizes.astype(np.int32), delta_z
 
-            group_vertices = utm_vertices[indices]
-            z_min_local = group_vertices[:, 2].min()
-            delta_z = origin_utm[2] - z_min_local
+def split_obj_by_geojson(obj_path, geojson_path, output_dir, origin_utm, uuid_prefix='Bontang', user='Digital Twin UGM', output_geojson_path=None):
+    os.makedirs(output_dir, exist_ok=True)
+
+    utm_vertices, uuid_faces = separate_buildings(obj_path, geojson_path, origin_utm, uuid_prefix, user, output_geojson_path)
+
+    print("💾 Saving OBJ after separation (multiprocessing)...")
+    # Workers read vertices from a memory-mapped .npy instead of receiving a pickled copy per task
+    with tempfile.TemporaryDirectory(prefix="separator_") as scratch_dir:
+        vertices_path = os.path.join(scratch_dir, "vertices.npy")
+        np.save(vertices_path, utm_vertices)
 
-            tasks.append((uuid_val, uuid_faces[uuid_val], utm_vertices, index_map, output_dir, delta_z))
+        tasks = [
+            (uuid_val, vertex_ids, local_faces, face_sizes, output_dir, delta_z)
+            for uuid_val, vertex_ids, local_faces, face_sizes, delta_z in building_meshes(utm_vertices, uuid_faces, origin_utm[2])
+        ]
 
-    with Pool(processes=max(1, cpu_count() - 1)) as pool:
-        list(tqdm(pool.imap_unordered(save_obj_worker, tasks), total=len(tasks), desc="Menyimpan hasil"))
+        with Pool(processes=max(1, cpu_count() - 1), initializer=init_save_worker, initargs=(vertices_path,)) as pool:
+            list(tqdm(pool.imap_unordered(save_obj_worker, tasks, chunksize=16), total=len(tasks), desc="Menyimpan hasil"))
 
     print("✅ DONE. All files saved to:", output_dir)
\ No newline at end of file
@@ -1,8 +1,9 @@
 import os
-import json
+import numpy as np
 from tqdm import tqdm
-import subprocess
-import tempfile
+
+from .cityjsonio import CityJSONStreamWriter, CITYJSON_VERSION
+from .objio import flatten_faces
 
 COLORS = {
     "ground": (0.36, 0.25, 0.20),
@@ -51,40 +52,61 @@ def parse_obj(obj_path):
                 face_mtls.append(current_mtl)
     return vertices, faces, face_mtls, mtl_data
 
-def create_cityjson(epsg):
-    return {
-        "type": "CityJSON",
-        "version": "1.0",
-        "metadata": {
-            "referenceSystem": f"urn:ogc:def:crs:EPSG::{epsg}",
-            "geographicalExtent": [0, 0, 0, 0, 0, 0]
-        },
-        "CityObjects": {},
-        "vertices": []
-    }
+def compact_flat_faces(writer, vertices, flat, sizes):
+    """
+    Quantize a building's vertices to the writer's grid and store each distinct one once.
+
+    Only vertices referenced by a face are kept, duplicates (within the output precision)
+    are merged with np.unique, and the face indices are remapped through the inverse index.
+    Consecutive repeated indices created by the merge are dropped, as are faces left with
+    fewer than 3 vertices. Returns (rings, kept) where kept is a boolean mask over the faces.
+    """
+    flat = np.asarray(flat, dtype=np.int64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    if len(flat) == 0:
+        return [], np.zeros(len(sizes), dtype=bool)
+
+    used, local = np.unique(flat, return_inverse=True)
+    quantized = writer.quantize(np.asarray(vertices, dtype=np.float64)[used])
+    unique_vertices, inverse = np.unique(quantized, axis=0, return_inverse=True)
+    offset = writer.add_quantized_vertices(unique_vertices)
+    flat = inverse.ravel()[local] + offset
 
-def calculate_extent(vertices):
-    if not vertices:
-        return [0]*6
-    xs, ys, zs = zip(*vertices)
-    return [min(xs), min(ys), min(zs), max(xs), max(ys), max(zs)]
+    # Drop an index equal to its predecessor in the ring (the first vertex wraps to the last)
+    face_ids = np.repeat(np.arange(len(sizes)), sizes)
+    starts = np.cumsum(sizes) - sizes
+    prev = np.arange(len(flat)) - 1
+    prev[starts] = starts + sizes - 1
+    keep_index = flat != flat[prev]
+    new_sizes = np.bincount(face_ids[keep_index], minlength=len(sizes))
+    kept = new_sizes >= 3
 
-def add_to_cityjson(cityjson, building_id, vertices, faces, face_mtls, mtl_data):
-    offset = len(cityjson["vertices"])
-    cityjson["vertices"].extend(vertices)
+    flat = flat[keep_index & kept[face_ids]].tolist()
+    rings, pos = [], 0
+    for size in new_sizes[kept].tolist():
+        rings.append(flat[pos:pos + size])
+        pos += size
+    return rings, kept
+
+def add_to_cityjson(writer, building_id, vertices, faces, face_mtls, mtl_data):
+    surfaces = [classify_surface(mtl_data.get(mtl, COLORS["wall"])).capitalize() + "Surface" for mtl in face_mtls]
+    flat, sizes = flatten_faces(faces)
+    add_building(writer, building_id, vertices, flat, sizes, surfaces)
+
+def add_building(writer, building_id, vertices, flat, sizes, surfaces):
+    """Write one Building with an LoD2 Solid; `surfaces` holds the semantic surface type of each face."""
+    rings, kept = compact_flat_faces(writer, vertices, flat, sizes)
 
     boundaries, semantics_vals, sem_types = [], [], {}
 
-    for face, mtl in zip(faces, face_mtls):
-        kd = mtl_data.get(mtl, COLORS["wall"])
-        sem = classify_surface(kd).capitalize() + "Surface"
+    for ring, sem in zip(rings, (t for t, k in zip(surfaces, kept) if k)):
         sem_id = sem_types.setdefault(sem, len(sem_types))
-        boundaries.append([[offset + v for v in face]])
+        boundaries.append([ring])
         semantics_vals.append(sem_id)
 
     geometry = {
         "type": "Solid",
-        "lod": 2,
+        "lod": "2",
         "boundaries": [boundaries],
         "semantics": {
             "surfaces": [{"type": t} for t in sem_types],
@@ -92,38 +114,19 @@ def add_to_cityjson(cityjson, building_id, vertices, faces, face_mtls, mtl_data)
         }
     }
 
-    cityjson["CityObjects"][building_id] = {
+    writer.add_city_object(building_id, {
         "type": "Building",
         "geometry": [geometry]
-    }
+    })
 
 def obj_folder_to_cityjson(folder, output_path, epsg):
-    cityjson = create_cityjson(epsg)
     obj_files = sorted([f for f in os.listdir(folder) if f.endswith('.obj')])
-    with tqdm(total=len(obj_files), desc="Converting .obj") as pbar:
-        for fname in obj_files:
-            fpath = os.path.join(folder, fname)
-            obj_id = os.path.splitext(fname)[0]
-            vertices, faces, face_mtls, mtl_data = parse_obj(fpath)
-            add_to_cityjson(cityjson, obj_id, vertices, faces, face_mtls, mtl_data)
-            pbar.update(1)
-
-    cityjson["metadata"]["geographicalExtent"] = calculate_extent(cityjson["vertices"])
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as tmpfile:
-        temp_v1_path = tmpfile.name
-        with open(temp_v1_path, 'w') as f:
-            json.dump(cityjson, f, indent=2)
-    print(f"📝 CityJSON v1.0 saved to: {temp_v1_path}")
-    cmd = ["cjio", temp_v1_path, "upgrade", "save", output_path]
-    try:
-        result = subprocess.run(cmd, check=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        print(result.stdout)
-        print(f"✅ Saved (v2.0): {output_path}")
-    except subprocess.CalledProcessError as e:
-        print("❌ CJIO upgrade failed")
-        print("STDOUT:", e.stdout)
-        print("STDERR:", e.stderr)
-    except Exception as ex:
-        print("❌ Unexpected error during CJIO execution")
-        print(str(ex))
\ No newline at end of file
+    with CityJSONStreamWriter(output_path, epsg) as writer:
+        with tqdm(total=len(obj_files), desc="Converting .obj") as pbar:
+            for fname in obj_files:
+                fpath = os.path.join(folder, fname)
+                obj_id = os.path.splitext(fname)[0]
+                vertices, faces, face_mtls, mtl_data = parse_obj(fpath)
+                add_to_cityjson(writer, obj_id, vertices, faces, face_mtls, mtl_data)
+                pbar.update(1)
+    print(f"✅ Saved (v{CITYJSON_VERSION}): {output_path}")
\ No newline at end of file
@@ -2,12 +2,19 @@ import subprocess as sp
 import time
 import os
 import sys
-from tqdm import tqdm
+import shutil
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from .findFile import find_complete_sets, read_and_convert_txt
 from .cacheHandling import delete_directories, delete_files
+from .gotools import resolve_tool
+from .goworker import start_pools
+from .lod2dispatch import convert_sharded
+
+GO_TOOLS = ("objseparator", "translate", "obj2lod2gml")
 
 
 
@@ -31,9 +38,28 @@ class OutputCapture:
         self.log_handle.close()
 
 class RunObj2GML:
-    def __init__(self, files_dir: str, progress_callback=None):
+    def __init__(self, files_dir: str, progress_callback=None, workers: int = 1, native_translate: bool = True,
+                 gml_shards: int = None):
+        """
+        workers: number of warm Go worker processes per tool (go/worker.go -serve mode),
+        and the number of file sets processed concurrently. 0 forks one Go process per
+        step, as before.
+        native_translate: translate the separated buildings in place with NumPy
+        (transformobj.translate_obj_dir) instead of copying them through translate.go.
+        gml_shards: concurrent obj2lod2gml runs in total, over size-balanced shards of
+        the buildings of a file set (lod2dispatch.py); defaults to the CPU count. With
+        workers > 1 they are split between the concurrent file sets.
+        """
         self.files_dir = files_dir
         self.progress_callback = progress_callback
+        self.workers = workers
+        self.native_translate = native_translate
+        # Shards per file set, so that `workers` concurrent sets stay within the total
+        self.gml_shards = max(1, (gml_shards or os.cpu_count() or 1) // max(1, workers))
+        self.tools_dir = "src/core"
+        self.go_dir = "go"
+        self.go_pools = None
+        self._progress_lock = threading.Lock()  # the tqdm bar is shared by concurrent file sets
 
     def log_with_timestamp(self, message, is_display: bool = False):
         """Print message with timestamp"""
@@ -73,14 +99,203 @@ class RunObj2GML:
             self.log_with_timestamp(f"ERROR running command: {str(e)}")
             return -1
 
+    def get_go_cmd(self, script_name, *args):
+        """Command running a Go tool: prebuilt .exe on Windows, else a cached build (see gotools.py)."""
+        return [*resolve_tool(script_name, self.go_dir, log=self.log_with_timestamp), *args]
+
+    def run_go_tool(self, script_name, args, description=""):
+        """Run a Go tool on a warm worker when available, else as its own process."""
+        if self.go_pools is None:
+            return self.run_subprocess_with_capture(self.get_go_cmd(script_name, *args), description)
+
+        self.log_with_timestamp(f"Starting: {description}")
+        self.log_with_timestamp(f"Worker request: {script_name} {' '.join(args)}")
+        try:
+            response = self.go_pools[script_name].call(*args)
+        except Exception as e:
+            self.log_with_timestamp(f"ERROR running worker request: {str(e)}")
+            return -1
+
+        if response.get("output"):
+            self.log_with_timestamp(f"Command output: {response['output']}")
+            print(response["output"])
+        if response.get("error"):
+            self.log_with_timestamp(f"Worker error: {response['error']}")
+        self.log_with_timestamp(f"Command completed with return code: {response['code']} ({response['seconds']:.2f} s)")
+        if response["code"] != 0:
+            self.log_with_timestamp(f"WARNING: Command failed with return code {response['code']}")
+        return response["code"]
+
+    def translate_in_place(self, obj_dir, translate_dir, offset):
+        """Translate the separated OBJs in obj_dir in place, then move the directory to translate_dir."""
+        from .transformobj import translate_obj_dir
+        self.log_with_timestamp("Starting: Object translation to UTM coordinates (in place)")
+        start = time.time()
+        try:
+            # objseparator writes %.6f and obj2lod2gml reads back %f, so 6 decimals lose nothing
+            translated, failed = translate_obj_dir(obj_dir, None, offset, precision=6)
+        except ValueError as e:
+            self.log_with_timestamp(f"WARNING: Object translation skipped: {e}")
+            return 1
+
+        for path, error in failed.items():
+            self.log_with_timestamp(f"Error processing {os.path.basename(path)}: {error}")
+            # Not translated: drop it so it does not reach translated/ in local coordinates,
+            # the same as translate.go, which writes no output for a failed file
+            if os.path.exists(path):
+                os.remove(path)
+        if failed:
+            self.log_with_timestamp(f"WARNING: {len(failed)} OBJ files failed to translate and were left out", is_display=True)
+        if os.path.isdir(translate_dir):
+            delete_directories([translate_dir])
+        os.replace(obj_dir, translate_dir)
+        self.log_with_timestamp(
+            f"Successfully translated {len(translated)} from {len(translated) + len(failed)} obj files "
+            f"in {time.time() - start:.2f} s, output: {translate_dir}"
+        )
+        return 1 if failed else 0
+
+    def copy_buildings_csv(self, translate_dir, root_dir, folder_name):
+        """Copy this set's buildings_data.csv (written by attribute_gen) to <root_dir>/<folder_name>.csv."""
+        source = os.path.join(translate_dir, "buildings_data.csv")
+        target = os.path.join(root_dir, f"{folder_name}.csv")
+        if not os.path.exists(source):
+            self.log_with_timestamp(f"WARNING: {source} not found, no attribute CSV for {folder_name}")
+            return 1
+        shutil.copy2(source, target)
+        self.log_with_timestamp(f"Attribute CSV: {target}")
+        return 0
+
+    def update_progress(self, pbar, description, advance=0):
+        with self._progress_lock:
+            if advance:
+                pbar.update(advance)
+            pbar.set_description(description)
+
+    def convert_to_gml(self, translate_dir, gml_dir):
+        """Run obj2lod2gml over size-balanced shards of translate_dir; failed shards are logged, not fatal."""
+        self.log_with_timestamp(f"Starting: OBJ to CityGML LOD2 conversion ({self.gml_shards} shards)")
+        pool = self.go_pools["obj2lod2gml"] if self.go_pools else None
+        start = time.time()
+        results = convert_sharded(translate_dir, gml_dir, self.gml_shards, pool=pool, log=self.log_with_timestamp)
+        for r in results:
+            if r["output"]:
+                self.log_with_timestamp(f"Shard {r['shard'] + 1} output: {r['output']}")
+
+        failed = sum(len(r["failed"]) for r in results)
+        total = sum(r["files"] for r in results)
+        self.log_with_timestamp(f"Converted {total - failed} from {total} OBJ files in {time.time() - start:.2f} s")
+        if failed:
+            self.log_with_timestamp(f"WARNING: {failed} OBJ files were not converted", is_display=True)
+        return 1 if failed else 0
+
+    def process_file_set(self, i, total, file_data, root_dir, pbar):
+        tools_dir = self.tools_dir
+        self.log_with_timestamp(f"--- Processing file set {i+1}/{total} ---", is_display=True)
+
+        obj = file_data[0]
+        coord = read_and_convert_txt(file_data[1])
+        bo = file_data[2]
+
+        root_path = Path(root_dir)
+        obj_path = Path(obj)
+
+        rel_path = obj_path.relative_to(root_path)
+        # Correctly handle case where files are in root specific (avoid collision with filename)
+        folder_name_raw = rel_path.parts[0]
+        folder_name = os.path.splitext(folder_name_raw)[0]
+
+        self.log_with_timestamp(f"Processing folder: {folder_name}")
+        self.log_with_timestamp(f"OBJ file: {obj}")
+        self.log_with_timestamp(f"Coordinates: {coord}")
+        self.log_with_timestamp(f"BO file: {bo}")
+
+        output_path = f"{root_dir}/{folder_name}.gml".replace('OBJ', 'CityGML')
+        os.makedirs(f"{root_dir}".replace('OBJ', 'CityGML'), exist_ok=True)
+        self.log_with_timestamp(f"Output path: {output_path}")
+
+        # Update progress bar description (this shows in terminal)
+        self.update_progress(pbar, f"Processing {folder_name}")
+
+        # define temporary directory
+        obj_dir = f"{root_dir}/{folder_name}/obj"
+        translate_dir = f"{root_dir}/{folder_name}/translated"
+        gml_dir = f"{root_dir}/{folder_name}/citygml"
+
+        # Step 1: Pemisahan Bangunan
+        self.log_with_timestamp("STEP 1/6: Building separation", is_display=True)
+        self.run_go_tool("objseparator", [
+            f"-cx={coord[0]}", f"-cy={coord[1]}",
+            f"{obj}",
+            f"{bo}",
+            obj_dir
+        ], "Building separation")
+
+        # Step 2: Translasi Objek Menuju Koordinat UTM
+        self.log_with_timestamp("STEP 2/6: Object translation", is_display=True)
+        if self.native_translate:
+            self.translate_in_place(obj_dir, translate_dir, (coord[0], coord[1], 0.0))
+        else:
+            self.run_go_tool("translate", [
+                f"-input={obj_dir}",
+                f"-output={translate_dir}",
+                f"-tx={coord[0]}",
+                f"-ty={coord[1]}",
+                "-tz=0"
+            ], "Object translation to UTM coordinates")
+
+        # Step 3: Generate MTL
+        self.log_with_timestamp("STEP 3/6: MTL generation", is_display=True)
+        self.run_subprocess_with_capture([
+            "python", f"{tools_dir}/semantic_mapping.py",
+            "--obj-dir", translate_dir,
+            "--geojson", f"{bo}"
+        ], "MTL generation")
+
+        # Step 4: Generate attribute
+        self.log_with_timestamp("STEP 4/6: Generate Attribute", is_display=True)
+        self.run_subprocess_with_capture([
+            "python", f"{tools_dir}/attribute_gen.py",
+            "--geojson", "src/config/Kelurahan DKI.geojson",
+            "--obj_dir", translate_dir,
+            "--output", translate_dir
+        ])
+
+        # Only this set's CSV: copyNrename.py walks every folder of root_dir and would race
+        # with the file sets running concurrently
+        self.copy_buildings_csv(translate_dir, root_dir, folder_name)
+
+        # Step 5: Convert OBJ ke CityGML lod2
+        self.log_with_timestamp("STEP 5/6: OBJ to CityGML conversion", is_display=True)
+        self.convert_to_gml(translate_dir, gml_dir)
+
+        # Step 6: Merge keseluruhan CityGMl lod2 file menjadi 1 file
+        self.log_with_timestamp("STEP 6/6: CityGML file merging", is_display=True)
+        self.run_subprocess_with_capture([
+            "python", f"{tools_dir}/lod2merge.py",
+            gml_dir,
+            f"{output_path}",
+            "--name", f"{folder_name}"
+        ], "CityGML file merging")
+
+        # Final cleanup
+        self.log_with_timestamp("Final cleanup")
+        delete_dir = [obj_dir, translate_dir, gml_dir]
+        self.log_with_timestamp(f"Deleting temporary directories: {delete_dir}")
+        delete_directories(delete_dir)
+
+        self.log_with_timestamp(f"Completed processing {folder_name}")
+        self.log_with_timestamp(f"Output file : {output_path}", is_display=True)
+
+        # Update progress bar (this shows in terminal)
+        self.update_progress(pbar, f"Completed all processing", advance=1)
+
     def run(self):
         start = time.time()
 
         print(f"\n  Program is running... Please wait ")
         
         root_dir = self.files_dir
-        tools_dir = "src/core"
-        go_dir = "go"
 
         try:
             # Set up log file path
@@ -90,6 +305,7 @@ class RunObj2GML:
             file_set = find_complete_sets(root_dir)
             
             # Create progress bar OUTSIDE the output capture context
+            from tqdm import tqdm
             pbar = tqdm(total=len(file_set), desc="Processing files", unit="file", 
                         position=0, leave=True, file=sys.__stdout__)
             
@@ -103,122 +319,30 @@ class RunObj2GML:
                 if not file_set:
                      self.log_with_timestamp("No file sets found to process.", is_display=True)
                      return
-                
-                for i, file_data in enumerate(file_set):
-                    self.log_with_timestamp(f"--- Processing file set {i+1}/{len(file_set)} ---", is_display=True)
-                    
-                    obj = file_data[0]
-                    coord = read_and_convert_txt(file_data[1])
-                    bo = file_data[2]
-
-                    root_path = Path(root_dir)
-                    obj_path = Path(obj)
-
-                    rel_path = obj_path.relative_to(root_path)
-                    # Correctly handle case where files are in root specific (avoid collision with filename)
-                    folder_name_raw = rel_path.parts[0]
-                    folder_name = os.path.splitext(folder_name_raw)[0]
-                    
-                    self.log_with_timestamp(f"Processing folder: {folder_name}")
-                    self.log_with_timestamp(f"OBJ file: {obj}")
-                    self.log_with_timestamp(f"Coordinates: {coord}")
-                    self.log_with_timestamp(f"BO file: {bo}")
-
-                    output_path = f"{root_dir}/{folder_name}.gml".replace('OBJ', 'CityGML')
-                    os.makedirs(f"{root_dir}".replace('OBJ', 'CityGML'), exist_ok=True)
-                    self.log_with_timestamp(f"Output path: {output_path}")
-
-                    # Update progress bar description (this shows in terminal)
-                    pbar.set_description(f"Processing {folder_name}")
-
-                    # define temporary directory
-                    obj_dir = f"{root_dir}/{folder_name}/obj"
-                    translate_dir = f"{root_dir}/{folder_name}/translated"
-                    gml_dir = f"{root_dir}/{folder_name}/citygml"
-                    
-                    # Helper to get command (exe or go run)
-                    def get_go_cmd(script_name, *args):
-                        # On Windows, prefer .exe if it exists
-                        if os.name == 'nt':
-                            exe_path = os.path.join(go_dir, f"{script_name}.exe")
-                            if os.path.exists(exe_path):
-                                return [exe_path, *args]
-                        
-                        # On Linux (Docker) or if exe missing, use go run
-                        # Note: 'go' must be in PATH. In Docker it is.
-                        return ["go", "run", f"{go_dir}/{script_name}.go", *args]
-
-                    # Step 1: Pemisahan Bangunan
-                    self.log_with_timestamp("STEP 1/6: Building separation", is_display=True)
-                    self.run_subprocess_with_capture(
-                        get_go_cmd("objseparator", 
-                        f"-cx={coord[0]}", f"-cy={coord[1]}",
-                        f"{obj}", 
-                        f"{bo}",
-                        obj_dir
-                    ), "Building separation")
-
-                    # Step 2: Translasi Objek Menuju Koordinat UTM
-                    self.log_with_timestamp("STEP 2/6: Object translation", is_display=True)
-                    self.run_subprocess_with_capture(
-                        get_go_cmd("translate", 
-                        f"-input={obj_dir}", 
-                        f"-output={translate_dir}", 
-                        f"-tx={coord[0]}", 
-                        f"-ty={coord[1]}",
-                        "-tz=0"
-                    ), "Object translation to UTM coordinates")
-
-                    # Step 3: Generate MTL
-                    self.log_with_timestamp("STEP 3/6: MTL generation", is_display=True)
-                    self.run_subprocess_with_capture([
-                        "python", f"{tools_dir}/semantic_mapping.py",
-                        "--obj-dir", translate_dir,
-                        "--geojson", f"{bo}"
-                    ], "MTL generation")
-
-                    # Step 4: Generate attribute
-                    self.log_with_timestamp("STEP 4/6: Generate Attribute", is_display=True)
-                    self.run_subprocess_with_capture([
-                        "python", f"{tools_dir}/attribute_gen.py",
-                        "--geojson", "src/config/Kelurahan DKI.geojson",
-                        "--obj_dir", translate_dir,
-                        "--output", translate_dir
-                    ])
-
-                    self.run_subprocess_with_capture([
-                        "python", f"{tools_dir}/copyNrename.py", "--root_dir", root_dir
-                    ])
-
-                    # Step 5: Convert OBJ ke CityGML lod2
-                    self.log_with_timestamp("STEP 5/6: OBJ to CityGML conversion", is_display=True)
-                    self.run_subprocess_with_capture(
-                         get_go_cmd("obj2lod2gml",
-                        "-input", translate_dir,
-                        "-output", gml_dir
-                    ), "OBJ to CityGML LOD2 conversion")
-
-                    # Step 6: Merge keseluruhan CityGMl lod2 file menjadi 1 file
-                    self.log_with_timestamp("STEP 6/6: CityGML file merging", is_display=True)
-                    self.run_subprocess_with_capture([
-                        "python", f"{tools_dir}/lod2merge.py",
-                        gml_dir,
-                        f"{output_path}",
-                        "--name", f"{folder_name}"
-                    ], "CityGML file merging")
-
-                    # Final cleanup
-                    self.log_with_timestamp("Final cleanup")
-                    delete_dir = [obj_dir, translate_dir, gml_dir]
-                    self.log_with_timestamp(f"Deleting temporary directories: {delete_dir}")
-                    delete_directories(delete_dir)
-                    
-                    self.log_with_timestamp(f"Completed processing {folder_name}")
-                    self.log_with_timestamp(f"Output file : {output_path}", is_display=True)
-                    
-                    # Update progress bar (this shows in terminal)
-                    pbar.update(1)
-                    pbar.set_description(f"Completed all processing")
+
+                # Keep the Go tools warm for all file sets, spread over `workers` threads
+                if self.workers > 0:
+                    tools = [t for t in GO_TOOLS if not (self.native_translate and t == "translate")]
+                    # One obj2lod2gml worker per shard of each concurrent file set
+                    sizes = {"obj2lod2gml": self.workers * self.gml_shards}
+                    self.go_pools = start_pools(tools, self.workers, log=self.log_with_timestamp, sizes=sizes)
+                try:
+                    if self.workers > 1:
+                        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                            futures = [
+                                executor.submit(self.process_file_set, i, len(file_set), file_data, root_dir, pbar)
+                                for i, file_data in enumerate(file_set)
+                            ]
+                            for future in futures:
+                                future.result()
+                    else:
+                        for i, file_data in enumerate(file_set):
+                            self.process_file_set(i, len(file_set), file_data, root_dir, pbar)
+                finally:
+                    if self.go_pools:
+                        for pool in self.go_pools.values():
+                            pool.close()
+                    self.go_pools = None
 
                 end = time.time() - start
                 self.log_with_timestamp("=== PROCESSING COMPLETED ===", is_display=True)
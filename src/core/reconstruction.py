@@ -2,7 +2,7 @@ import os
 import subprocess
 import shutil
 import logging
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -12,9 +12,11 @@ class ReconstructionManager:
     Manages the 3D Reconstruction process using Geoflow.
     """
 
-    def __init__(self, config_dir: str = "src/config"):
-        self.config_dir = config_dir
+    def __init__(self, config_dir: str = "src/config", progress_callback: Optional[Callable[[str], None]] = None):
         self.config_dir = config_dir
+        self.progress_callback = progress_callback
+        self._process: Optional[subprocess.Popen] = None
+        self._cancelled = False
         # Try to find geof
         env_path = os.getenv("GEOF_PATH")
         if env_path and shutil.which(env_path):
@@ -102,35 +104,82 @@ class ReconstructionManager:
         # Phase 1: Reconstruct_ (underscore version)
         # Note: The original code ran `reconstruct_.json` first, then `reconstruct.json`.
         # I will preserve this behavior.
-        
+        self._cancelled = False
+
         logger.info("Starting Phase 1: Pre-calculation...")
+        self._emit("Starting Phase 1: Pre-calculation...")
         cmd1 = self.build_command("reconstruct_.json", footprint, pointcloud, output_dir, advanced_params)
-        
-        try:
-            logger.debug(f"Executing: {' '.join(cmd1)}")
-            result1 = subprocess.run(cmd1, cwd=os.getcwd(), capture_output=True, text=True)
-            if result1.returncode != 0:
-                logger.error(f"Phase 1 failed: {result1.stderr}")
-                return False
-            logger.info(result1.stdout)
-        except Exception as e:
-            logger.exception("Exception during Phase 1")
+        if not self._run_phase(cmd1, "Phase 1"):
             return False
 
         # Phase 2: Reconstruct (main version)
         logger.info("Starting Phase 2: Main Reconstruction...")
+        self._emit("Starting Phase 2: Main Reconstruction...")
         cmd2 = self.build_command("reconstruct.json", footprint, pointcloud, output_dir, advanced_params)
-        
+        if not self._run_phase(cmd2, "Phase 2"):
+            return False
+
+        logger.info("Reconstruction completed successfully.")
+        return True
+
+    def cancel(self):
+        """Requests cancellation and terminates the running geof process, if any."""
+        self._cancelled = True
+        process = self._process
+        if process is not None and process.poll() is None:
+            logger.info("Cancelling reconstruction...")
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def _emit(self, message: str):
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def _run_phase(self, cmd: List[str], phase_name: str) -> bool:
+        """Runs one geof phase, streaming its combined stdout/stderr line by line."""
+        if self._cancelled:
+            logger.warning(f"{phase_name} skipped: reconstruction was cancelled.")
+            return False
+
         try:
-            logger.debug(f"Executing: {' '.join(cmd2)}")
-            result2 = subprocess.run(cmd2, cwd=os.getcwd(), capture_output=True, text=True)
-            if result2.returncode != 0:
-                logger.error(f"Phase 2 failed: {result2.stderr}")
-                return False
-            logger.info(result2.stdout)
+            logger.debug(f"Executing: {' '.join(cmd)}")
+            self._process = subprocess.Popen(
+                cmd,
+                cwd=os.getcwd(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
+            )
+            # cancel() may have run between the check above and Popen, before there was a process to stop
+            if self._cancelled:
+                self._process.terminate()
+            for line in self._process.stdout:
+                line = line.rstrip()
+                if line:
+                    logger.info(line)
+                    self._emit(line)
+            returncode = self._process.wait()
         except Exception as e:
-            logger.exception("Exception during Phase 2")
+            logger.exception(f"Exception during {phase_name}")
+            self._emit(f"Exception during {phase_name}: {e}")
+            return False
+        finally:
+            self._process = None
+
+        if self._cancelled:
+            logger.warning(f"{phase_name} cancelled.")
+            self._emit(f"{phase_name} cancelled.")
+            return False
+        if returncode != 0:
+            logger.error(f"{phase_name} failed with return code {returncode}")
+            self._emit(f"{phase_name} failed with return code {returncode}")
             return False
-            
-        logger.info("Reconstruction completed successfully.")
         return True
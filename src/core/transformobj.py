@@ -1,28 +1,218 @@
-import numpy as np
-from pyproj import Transformer
 import os
+import sys
+import time
+import argparse
+import tempfile
+from glob import glob
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .obj2cityjson.objio import CHUNK_LINES, format_vertices, parse_vertex_lines
+
+def translation(offset):
+    """Vertex transform adding a constant (dx, dy, dz) offset."""
+    offset = np.asarray(offset, dtype=np.float64)
+    return lambda block: block + offset
+
+def affine(matrix, offset=(0.0, 0.0, 0.0)):
+    """Vertex transform computing matrix @ v + offset for every vertex."""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    offset = np.asarray(offset, dtype=np.float64)
+    return lambda block: block @ matrix.T + offset
+
+def pyproj_transform(transformer):
+    """Vertex transform applying a pyproj Transformer to the whole block at once."""
+    def apply(block):
+        x, y, z = transformer.transform(block[:, 0], block[:, 1], block[:, 2])
+        return np.column_stack((x, y, z))
+    return apply
+
+def rewrite_obj(input_obj, output_obj, vertex_fn, precision=6, mtllib=None, chunk_lines=CHUNK_LINES):
+    """
+    Stream an OBJ, replacing the vertex lines with vertex_fn(block, first_index).
+
+    The file is read `chunk_lines` lines at a time. The vertex lines of a chunk are
+    parsed into one array, handed to vertex_fn together with the index of their first
+    vertex, and written back with the bulk vertex formatter. All other lines are copied
+    verbatim, except "mtllib" which is replaced when `mtllib` is given. Memory stays
+    bounded by the chunk size, so multi-GB OBJs can be processed.
+    Returns the number of vertices written.
+    """
+    vertex_count = 0
+    with open(input_obj, "r") as infile, open(output_obj, "w") as outfile:
+        while True:
+            lines = list(islice(infile, chunk_lines))
+            if not lines:
+                break
+
+            is_vertex = np.fromiter((line.startswith("v ") for line in lines), dtype=bool, count=len(lines))
+            if mtllib is not None:
+                for i, line in enumerate(lines):
+                    if line.startswith("mtllib"):
+                        lines[i] = f"mtllib {mtllib}\n"
+
+            if not is_vertex.any():
+                outfile.write("".join(lines))
+                continue
+
+            vertex_lines = [line for line, v in zip(lines, is_vertex) if v]
+            block = vertex_fn(parse_vertex_lines(vertex_lines), vertex_count)
+
+            # Write alternating runs of vertex and non-vertex lines in their original order
+            change = np.flatnonzero(np.diff(is_vertex)) + 1
+            run_starts = np.concatenate(([0], change))
+            run_ends = np.concatenate((change, [len(lines)]))
+            v_pos = 0
+            for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+                if is_vertex[start]:
+                    count = end - start
+                    outfile.write(format_vertices(block[v_pos:v_pos + count], precision=precision))
+                    v_pos += count
+                else:
+                    outfile.write("".join(lines[start:end]))
+            vertex_count += v_pos
+    return vertex_count
+
+def transform_obj(input_obj, output_obj, transform, precision=6, mtllib=None, chunk_lines=CHUNK_LINES):
+    """Apply a vertex transform (see translation, affine, pyproj_transform) to every vertex of an OBJ."""
+    return rewrite_obj(input_obj, output_obj, lambda block, start: transform(block), precision, mtllib, chunk_lines)
+
+def replace_obj_vertices(input_obj, output_obj, vertices, precision=6, mtllib=None, chunk_lines=CHUNK_LINES):
+    """Write an OBJ whose vertices are replaced, in order, by the rows of `vertices`."""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    return rewrite_obj(
+        input_obj, output_obj, lambda block, start: vertices[start:start + len(block)], precision, mtllib, chunk_lines
+    )
+
+def reproject_obj(input_obj, output_obj, source_crs, target_crs, precision=None, mtllib=None, chunk_lines=CHUNK_LINES):
+    """Reproject every vertex of an OBJ between two CRS (x/y order, lon/lat for geographic CRS)."""
+    from .crstransform import get_transformer
+    transformer = get_transformer(source_crs, target_crs)
+    return transform_obj(input_obj, output_obj, pyproj_transform(transformer), precision, mtllib, chunk_lines)
+
+def obj_files(input_path):
+    """The OBJs selected by `input_path`: every *.obj of a directory, or a single .obj file."""
+    if os.path.isdir(input_path):
+        return sorted(glob(os.path.join(input_path, "*.obj")))
+    if input_path.lower().endswith(".obj") and os.path.isfile(input_path):
+        return [input_path]
+    raise ValueError(f"Input must be an OBJ file or a directory containing OBJ files: {input_path}")
+
+def translate_obj_dir(input_path, output_dir=None, offset=(0.0, 0.0, 0.0), precision=None, workers=4):
+    """
+    Add `offset` to every vertex of every OBJ in `input_path` (the Python version of go/translate.go).
+
+    Vertex blocks go through one NumPy add per chunk and all other lines are copied
+    unchanged (see rewrite_obj). With output_dir=None the files are translated in
+    place: each one is written to a temporary file next to it and moved over the
+    original, so no second copy of the directory is made. Files are processed by
+    `workers` threads; file I/O and the NumPy work release the GIL.
+    Returns (translated_paths, {failed_path: error}).
+    """
+    files = obj_files(input_path)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    transform = translation(offset)
+
+    def translate_one(path):
+        if output_dir is None:
+            temp = f"{path}.{os.getpid()}.tmp"
+            try:
+                transform_obj(path, temp, transform, precision)
+                os.replace(temp, path)
+            finally:
+                if os.path.exists(temp):
+                    os.remove(temp)
+            return path
+        target = os.path.join(output_dir, os.path.basename(path))
+        transform_obj(path, target, transform, precision)
+        return target
+
+    translated, failed = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(translate_one, path): path for path in files}
+        for future, path in futures.items():
+            try:
+                translated.append(future.result())
+            except Exception as e:  # one bad file must not abort the rest of the set
+                failed[path] = str(e)
+    return translated, failed
 
 def transform_obj_coordinates(input_obj, output_obj, local_reference, utm_reference):
     # Calculate translation vector
     translation_vector = np.array(utm_reference) - np.array(local_reference)
+    transform_obj(input_obj, output_obj, translation(translation_vector), precision=None)
+    print(f"Transformed OBJ file saved to: {output_obj}")
 
-    # Open input and output files
+def _transform_obj_per_line(input_obj, output_obj, translation_vector):
+    """Line-by-line reference implementation, kept for the benchmark."""
     with open(input_obj, 'r') as infile, open(output_obj, 'w') as outfile:
         for line in infile:
-            if line.startswith('v '):  # Only process vertex lines
+            if line.startswith('v '):
                 parts = line.split()
-                x_local, y_local, z_local = map(float, parts[1:4])
-                
-                # Apply translation
-                x_utm = x_local + translation_vector[0]
-                y_utm = y_local + translation_vector[1]
-                z_utm = z_local + translation_vector[2]
-                
-                # Write transformed vertex
-                outfile.write(f"v {x_utm} {y_utm} {z_utm}\n")
+                x, y, z = map(float, parts[1:4])
+                outfile.write(f"v {x + translation_vector[0]} {y + translation_vector[1]} {z + translation_vector[2]}\n")
             else:
-                # Copy other lines directly
                 outfile.write(line)
-    print(f"Transformed OBJ file saved to: {output_obj}")
 
-transform_obj_coordinates("leger/coba.obj", "leger/coba_translated.obj", (0,0,0), (428501.44556600949727, 9137577.566948587074876, 100.559806823730469))
\ No newline at end of file
+def benchmark(input_obj, offset=(428501.44556600949727, 9137577.566948587074876, 100.559806823730469)):
+    """Time the per-line rewrite against the chunked engine on one OBJ and check they agree."""
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "per_line.obj")
+        new_path = os.path.join(tmp, "engine.obj")
+
+        start = time.perf_counter()
+        _transform_obj_per_line(input_obj, old_path, np.asarray(offset))
+        per_line = time.perf_counter() - start
+
+        start = time.perf_counter()
+        transform_obj(input_obj, new_path, translation(offset), precision=None)
+        engine = time.perf_counter() - start
+
+        with open(old_path) as a, open(new_path) as b:
+            identical = a.read() == b.read()
+
+    size_mb = os.path.getsize(input_obj) / 1e6
+    print(f"{input_obj} ({size_mb:.1f} MB)")
+    print(f"  per-line : {per_line:.2f} s")
+    print(f"  engine   : {engine:.2f} s ({per_line / engine:.1f}x)")
+    print(f"  identical output: {identical}")
+    return per_line, engine, identical
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Translate or reproject an OBJ (or a directory of OBJs), or benchmark the OBJ transform engine.")
+    parser.add_argument("input_obj")
+    parser.add_argument("output_obj", nargs="?")
+    parser.add_argument("--offset", nargs=3, type=float, metavar=("DX", "DY", "DZ"), default=(0.0, 0.0, 0.0))
+    parser.add_argument("--from-crs", help="reproject from this CRS, e.g. EPSG:4326 (requires --to-crs)")
+    parser.add_argument("--to-crs", help="reproject to this CRS, e.g. EPSG:32748")
+    parser.add_argument("--benchmark", action="store_true", help="compare against the per-line implementation")
+    parser.add_argument("--in-place", action="store_true", help="translate a directory of OBJs in place")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.input_obj, args.offset)
+        return 0
+    if os.path.isdir(args.input_obj):
+        if not (args.output_obj or args.in_place):
+            parser.error("a directory needs an output directory or --in-place")
+        translated, failed = translate_obj_dir(args.input_obj, args.output_obj, args.offset)
+        print(f"Successfully translated {len(translated)} from {len(translated) + len(failed)} obj files")
+        for path, error in failed.items():
+            print(f"Failed to translate {path}: {error}")
+        return 1 if failed else 0
+    if not args.output_obj:
+        parser.error("output_obj is required unless --benchmark is given")
+    if args.from_crs or args.to_crs:
+        if not (args.from_crs and args.to_crs):
+            parser.error("--from-crs and --to-crs must be given together")
+        count = reproject_obj(args.input_obj, args.output_obj, args.from_crs, args.to_crs)
+        print(f"Reprojected {count} vertices from {args.from_crs} to {args.to_crs}: {args.output_obj}")
+        return 0
+    transform_obj_coordinates(args.input_obj, args.output_obj, (0, 0, 0), args.offset)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
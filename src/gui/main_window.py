@@ -1,16 +1,23 @@
 import sys
+import importlib
+import traceback
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget,
     QVBoxLayout, QLabel, QHBoxLayout, QStackedLayout, QScrollArea
 )
 from PyQt5.QtGui import QIcon, QPixmap
-from PyQt5.QtCore import Qt, QSize
-from src.gui.tabs.tab1_reconstruct import ReconstructTab
-# from src.gui.tabs.tab2_editvisualize import VisualizeTab
-from src.gui.tabs.tab3_translateobj import OBJTranslatorGUI
-from src.gui.tabs.tab4_gorunner import GoRunner
-from src.gui.tabs.tab5_mergecityjson import MergeCityJSON
-from src.gui.tabs.tab6_obj2gml import Obj2GML
+from PyQt5.QtCore import Qt, QSize, QThread, pyqtSignal
+
+# (module, widget class, tab title). Tab modules pull in geopandas, matplotlib, scipy...,
+# so they are only imported when their tab is first shown or prewarmed.
+TABS = [
+    ("src.gui.tabs.tab1_reconstruct", "ReconstructTab", "3D Reconstruction"),
+    # ("src.gui.tabs.tab2_editvisualize", "VisualizeTab", "3D Visualize"),
+    ("src.gui.tabs.tab3_translateobj", "OBJTranslatorGUI", "OBJ Tools"),
+    ("src.gui.tabs.tab4_gorunner", "GoRunner", "OBJ to 3D City"),
+    ("src.gui.tabs.tab5_mergecityjson", "MergeCityJSON", "Merge CityJSON"),
+    ("src.gui.tabs.tab6_obj2gml", "Obj2GML", "OBJ to GML"),
+]
 
 class LockedTabWrapper(QWidget):
     def __init__(self, tab_widget: QWidget):
@@ -43,6 +50,54 @@ class ScrollableTabWrapper(QWidget):
         scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
 
+class LazyTab(QWidget):
+    """Placeholder that imports its tab module and builds the tab widget on the first load()."""
+
+    def __init__(self, module_name, class_name):
+        super().__init__()
+        self.module_name = module_name
+        self.class_name = class_name
+        self.widget = None
+
+        self.placeholder = QLabel("Loading...")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.stack = QStackedLayout(self)
+        self.stack.addWidget(self.placeholder)
+
+    def load(self):
+        if self.widget is not None:
+            return
+        try:
+            module = importlib.import_module(self.module_name)
+            self.widget = ScrollableTabWrapper(getattr(module, self.class_name)())
+        except Exception as e:
+            traceback.print_exc()
+            self.placeholder.setText(f"❌ Failed to load tab: {e}")
+            return
+        self.stack.addWidget(self.widget)
+        self.stack.setCurrentWidget(self.widget)
+
+class TabPrewarmWorker(QThread):
+    """Imports tab modules in the background; emits each module name once it is imported."""
+    progress = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool)
+
+    def __init__(self, module_names):
+        super().__init__()
+        self.module_names = module_names
+
+    def run(self):
+        success = True
+        for name in self.module_names:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                # The tab reports the error itself when it is opened
+                print(f"⚠️  Prewarming {name} failed: {e}")
+                success = False
+            self.progress.emit(name)
+        self.finished_signal.emit(success)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -56,12 +111,9 @@ class MainWindow(QMainWindow):
 
         # Tab widget
         self.tabs = QTabWidget()
-        self.tabs.addTab(ScrollableTabWrapper(ReconstructTab()), "3D Reconstruction")
-        # self.tabs.addTab(ScrollableTabWrapper(VisualizeTab()), "3D Visualize")
-        self.tabs.addTab(ScrollableTabWrapper(OBJTranslatorGUI()), "OBJ Tools")
-        self.tabs.addTab(ScrollableTabWrapper(GoRunner()), "OBJ to 3D City")
-        self.tabs.addTab(ScrollableTabWrapper(MergeCityJSON()), "Merge CityJSON")
-        self.tabs.addTab(ScrollableTabWrapper(Obj2GML()), "OBJ to GML")
+        for module_name, class_name, title in TABS:
+            self.tabs.addTab(LazyTab(module_name, class_name), title)
+        self.tabs.currentChanged.connect(self.load_tab)
         central_layout.addWidget(self.tabs)
 
         # Footer
@@ -82,6 +134,26 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(central_widget)
 
+        # Import the active tab first, then the others, off the GUI thread
+        current = self.tabs.currentWidget()
+        modules = [current.module_name] + [m for m, _, _ in TABS if m != current.module_name]
+        self.prewarm_worker = TabPrewarmWorker(modules)
+        self.prewarm_worker.progress.connect(self.on_module_prewarmed)
+        self.prewarm_worker.start()
+
+    def load_tab(self, index):
+        tab = self.tabs.widget(index)
+        if isinstance(tab, LazyTab):
+            tab.load()
+
+    def on_module_prewarmed(self, module_name):
+        if self.tabs.currentWidget().module_name == module_name:
+            self.load_tab(self.tabs.currentIndex())
+
+    def closeEvent(self, event):
+        self.prewarm_worker.wait()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
@@ -0,0 +1,198 @@
+import numpy as np
+import shapely
+from scipy.spatial import cKDTree
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+
+from src.core.obj2cityjson.objio import flatten_faces
+from src.core.obj2cityjson.compat import SHAPELY_2
+
+MAX_SEGMENTS = 200_000
+SEGMENTS_PER_PATH = 10_000
+
+def face_edges(faces, vertex_count):
+    """Unique undirected edges (E, 2) of all faces, closing edge included."""
+    flat, sizes = flatten_faces(faces)
+    if len(flat) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    starts = np.cumsum(sizes) - sizes
+    following = np.arange(len(flat)) + 1
+    following[starts + sizes - 1] = starts
+    edges = np.column_stack((flat, flat[following]))
+
+    valid = np.repeat(sizes >= 2, sizes) & (edges >= 0).all(axis=1) & (edges < vertex_count).all(axis=1)
+    edges = np.sort(edges[valid], axis=1)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    return np.unique(edges, axis=0)
+
+def pixel_keys(xy, x0, y0, pixel, grid):
+    """Integer key of the screen pixel each point falls in (points off screen are clipped to the border)."""
+    ix = np.clip(np.floor((xy[..., 0] - x0) / pixel), -1, grid).astype(np.int64) + 1
+    iy = np.clip(np.floor((xy[..., 1] - y0) / pixel), -1, grid).astype(np.int64) + 1
+    return ix * (grid + 2) + iy
+
+def pack_segments(segments, per_path=SEGMENTS_PER_PATH):
+    """
+    Join (N, 2, 2) segments into a few NaN-separated polylines.
+
+    matplotlib builds one Path object per entry of a LineCollection, which dominates
+    the cost for large N; NaN rows break the line, so packing thousands of segments
+    into each entry draws the same picture with a handful of paths.
+    """
+    if len(segments) == 0:
+        return []
+    gaps = np.full((len(segments), 1, 2), np.nan)
+    polyline = np.concatenate((segments, gaps), axis=1).reshape(-1, 2)
+    step = 3 * per_path
+    return [polyline[i:i + step] for i in range(0, len(polyline), step)]
+
+class WireframePreview:
+    """
+    2D wireframe of a mesh drawn as one LineCollection plus one marker artist.
+
+    refresh() re-decimates the edges to the current view: only edges overlapping the
+    view are kept, and edges whose endpoints land on the same pair of screen pixels are
+    drawn once. Zooming in therefore refines the drawing progressively, while a whole
+    district stays a bounded number of segments. Call refresh() before redrawing
+    after the view limits change.
+    """
+
+    def __init__(self, ax, vertices, edges, color="k", linewidth=0.8, marker="bo", markersize=3, max_segments=MAX_SEGMENTS):
+        self.ax = ax
+        self.xy = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)[:, :2]
+        self.segments = self.xy[edges]  # (E, 2, 2)
+        self.max_segments = max_segments
+        self.collection = LineCollection([], colors=color, linewidths=linewidth)
+        ax.add_collection(self.collection)
+        (self.markers,) = ax.plot([], [], marker, markersize=markersize)
+
+    def fit_view(self, margin=0.05):
+        if len(self.xy) == 0:
+            return
+        low = self.xy.min(axis=0)
+        high = self.xy.max(axis=0)
+        pad = np.maximum((high - low) * margin, 1e-9)
+        self.ax.set_xlim(low[0] - pad[0], high[0] + pad[0])
+        self.ax.set_ylim(low[1] - pad[1], high[1] + pad[1])
+
+    def refresh(self):
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        bbox = self.ax.bbox
+        grid = int(max(bbox.width, bbox.height, 1))
+        pixel = max((x1 - x0) / max(bbox.width, 1), (y1 - y0) / max(bbox.height, 1), 1e-12)
+
+        # Edges overlapping the view
+        seg_min = self.segments.min(axis=1)
+        seg_max = self.segments.max(axis=1)
+        visible = (seg_max[:, 0] >= x0) & (seg_min[:, 0] <= x1) & (seg_max[:, 1] >= y0) & (seg_min[:, 1] <= y1)
+        segments = self.segments[visible]
+
+        # One edge per pair of screen pixels; coarsen further if the view is still too dense
+        while len(segments):
+            keys = pixel_keys(segments, x0, y0, pixel, grid)
+            keys.sort(axis=1)
+            pair_keys = np.where(keys[:, 0] != keys[:, 1], keys[:, 0] * (grid + 2) ** 2 + keys[:, 1], -1)
+            unique, first = np.unique(pair_keys, return_index=True)
+            first = first[unique >= 0]
+            if len(first) <= self.max_segments:
+                segments = segments[first]
+                break
+            pixel *= 2
+            grid = grid // 2 + 1
+        self.collection.set_segments(pack_segments(segments))
+
+        # One marker per screen pixel
+        in_view = (self.xy[:, 0] >= x0) & (self.xy[:, 0] <= x1) & (self.xy[:, 1] >= y0) & (self.xy[:, 1] <= y1)
+        points = self.xy[in_view]
+        if len(points):
+            _, first = np.unique(pixel_keys(points, x0, y0, pixel, grid), return_index=True)
+            points = points[first]
+        self.markers.set_data(points[:, 0], points[:, 1])
+
+class VertexPicker:
+    """Nearest-vertex lookups on the XY plane through a cKDTree built once per vertex array."""
+
+    def __init__(self, vertices):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.tree = cKDTree(self.vertices[:, :2]) if len(self.vertices) else None
+
+    def nearest(self, x, y):
+        """Index of the vertex closest to (x, y), or None when there are no vertices."""
+        if self.tree is None:
+            return None
+        _, index = self.tree.query((x, y))
+        return int(index)
+
+    def within(self, x, y, radius):
+        """Indices of all vertices within `radius` of (x, y)."""
+        if self.tree is None:
+            return np.empty(0, dtype=np.int64)
+        return np.asarray(self.tree.query_ball_point((x, y), radius), dtype=np.int64)
+
+def polygon_rings(geometries):
+    """
+    Coordinates of every Polygon / MultiPolygon ring in `geometries`.
+
+    Returns (xy, sizes, exterior): all ring coordinates as one (N, 2) array, the number
+    of coordinates of each ring, and whether each ring is an exterior ring.
+    """
+    geometries = [g for g in geometries if g is not None and g.geom_type in ("Polygon", "MultiPolygon")]
+    if SHAPELY_2:
+        polygons = shapely.get_parts(np.asarray(geometries, dtype=object))
+        interior_counts = shapely.get_num_interior_rings(polygons)
+        rings = [shapely.get_exterior_ring(polygons)]
+        for k in range(1, int(interior_counts.max(initial=0)) + 1):
+            rings.append(shapely.get_interior_ring(polygons[interior_counts >= k], k - 1))
+        exterior = np.repeat([True, False], [len(rings[0]), sum(len(r) for r in rings[1:])])
+        rings = np.concatenate(rings)
+        xy, index = shapely.get_coordinates(rings, return_index=True)
+        sizes = np.bincount(index, minlength=len(rings))
+        return xy, sizes, exterior
+
+    arrays, exterior = [], []
+    for geom in geometries:
+        for polygon in (geom.geoms if geom.geom_type == "MultiPolygon" else [geom]):
+            if polygon.is_empty:
+                continue
+            arrays.append(np.asarray(polygon.exterior.coords))
+            exterior.append(True)
+            for ring in polygon.interiors:
+                arrays.append(np.asarray(ring.coords))
+                exterior.append(False)
+    if not arrays:
+        return np.empty((0, 2)), np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+    sizes = np.array([len(a) for a in arrays], dtype=np.int64)
+    xy = np.concatenate([a[:, :2] for a in arrays])
+    return xy, sizes, np.array(exterior, dtype=bool)
+
+def rings_path(xy, sizes):
+    """One compound Path drawing every ring, so a whole layer is a single patch."""
+    codes = np.full(len(xy), Path.LINETO, dtype=Path.code_type)
+    codes[np.cumsum(sizes)[sizes > 0] - sizes[sizes > 0]] = Path.MOVETO
+    return Path(xy, codes)
+
+class FootprintView:
+    """
+    Footprint outlines drawn as one PatchCollection and their exterior vertices as one scatter.
+
+    `picker` is a VertexPicker over the same exterior vertices the markers show, so a
+    click resolves to a drawn vertex without scanning the whole layer.
+    """
+
+    def __init__(self, ax, geometries, edgecolor="black", marker_color="red", markersize=2):
+        xy, sizes, exterior = polygon_rings(geometries)
+        self.rings = PatchCollection([PathPatch(rings_path(xy, sizes))], facecolor="none", edgecolor=edgecolor)
+        ax.add_collection(self.rings)
+
+        self.vertices = xy[np.repeat(exterior, sizes)]
+        self.markers = ax.scatter(self.vertices[:, 0], self.vertices[:, 1], s=markersize ** 2, c=marker_color)
+        self.picker = VertexPicker(self.vertices)
+
+        ax.set_aspect("equal")
+        ax.autoscale_view()
+
+    def __len__(self):
+        return len(self.vertices)
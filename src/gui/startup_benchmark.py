@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from src.utils.importbudget import ROOT, import_profile
+
+def top_level_imports(rows, limit=15):
+    """Heaviest modules (by cumulative time) among the depth 0 and 1 imports."""
+    return sorted((r for r in rows if r[2] <= 1), key=lambda r: r[1], reverse=True)[:limit]
+
+def _first_paint_child():
+    """Child process: build the main window and report when it first paints."""
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+    from PyQt5.QtWidgets import QApplication
+    from src.gui.main_window import MainWindow
+
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    timings = {}
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and "first_paint" not in timings:
+                timings["first_paint"] = time.time()
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+    window.show()
+    QTimer.singleShot(30000, app.quit)
+    app.exec_()
+    timings.setdefault("first_paint", None)
+    print(json.dumps(timings))
+
+def time_to_first_paint(python=sys.executable, env=None):
+    """Seconds from launching a fresh interpreter to the first paint of the main window."""
+    env = dict(os.environ if env is None else env)
+    start = time.time()
+    result = subprocess.run(
+        [python, "-m", "src.gui.startup_benchmark", "--child"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup child failed:\n{result.stderr[-2000:]}")
+    first_paint = json.loads(result.stdout.strip().splitlines()[-1])["first_paint"]
+    if first_paint is None:
+        raise RuntimeError("The main window never painted")
+    return first_paint - start
+
+def benchmark(repeat=3, top=15, offscreen=False):
+    """Print the import-time profile of the main window module and the time to first paint."""
+    env = dict(os.environ)
+    if offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    rows = import_profile("import src.gui.main_window", env=env)
+    total_ms = sum(r[1] for r in rows if r[2] == 0) / 1000
+    print(f"import src.gui.main_window: {total_ms:.0f} ms")
+    for self_us, cumulative_us, depth, name in top_level_imports(rows, top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {'  ' * depth}{name}")
+
+    paints = [time_to_first_paint(env=env) for _ in range(repeat)]
+    print(f"time to first paint: best {min(paints):.2f} s, runs {', '.join(f'{p:.2f}' for p in paints)}")
+    return total_ms, min(paints)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure GUI startup: import-time profile and time to first paint.")
+    parser.add_argument("--repeat", type=int, default=3, help="number of first-paint runs (best is reported)")
+    parser.add_argument("--top", type=int, default=15, help="number of heaviest imports to list")
+    parser.add_argument("--offscreen", action="store_true", help="use the offscreen Qt platform (headless machines)")
+    parser.add_argument("--budget", type=float, help="fail when the best time to first paint exceeds this many seconds")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _first_paint_child()
+        return 0
+
+    _, first_paint = benchmark(args.repeat, args.top, args.offscreen)
+    if args.budget is not None and first_paint > args.budget:
+        print(f"❌ Startup over budget: {first_paint:.2f} s > {args.budget:.2f} s")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,9 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
 import numpy as np
 
+from src.core.transformobj import transform_obj, translation
+from src.gui.plotting import WireframePreview, VertexPicker, face_edges
+
 class OBJ2LocalTranslatorGUI(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -57,6 +60,8 @@ class OBJ2LocalTranslatorGUI(QWidget):
         self.vertices = []      # [(x, y, z)]
         self.faces = []         # [[v1, v2, v3, ...]]
         self.picked_point = None
+        self.preview = None
+        self.picker = None
 
         # Events
         self.canvas.mpl_connect("button_press_event", self.on_click)
@@ -89,6 +94,7 @@ class OBJ2LocalTranslatorGUI(QWidget):
 
         ax.set_xlim([xdata - x_left * scale_factor, xdata + x_right * scale_factor])
         ax.set_ylim([ydata - y_bottom * scale_factor, ydata + y_top * scale_factor])
+        self.refresh_preview()
         self.canvas.draw_idle()
     
     def enable_panning(self):
@@ -114,6 +120,7 @@ class OBJ2LocalTranslatorGUI(QWidget):
             ylim = self.ax.get_ylim()
             self.ax.set_xlim(xlim[0] - dx, xlim[1] - dx)
             self.ax.set_ylim(ylim[0] - dy, ylim[1] - dy)
+            self.refresh_preview()
             self.canvas.draw()
             self._press_event = event
 
@@ -151,48 +158,45 @@ class OBJ2LocalTranslatorGUI(QWidget):
         self.ax.clear()
         coords = np.array(self.vertices)
 
-        # Plot edges from faces
-        for face in self.faces:
-            if len(face) < 2:
-                continue
-            face_coords = np.array([self.vertices[i] for i in face])
-            x, y = face_coords[:, 0], face_coords[:, 1]
-            self.ax.plot(np.append(x, x[0]), np.append(y, y[0]), 'k-', linewidth=0.8)
-
-        # Plot vertices
-        self.ax.plot(coords[:, 0], coords[:, 1], 'bo', markersize=3)
+        # All edges in one LineCollection, decimated to the current view
+        self.preview = WireframePreview(self.ax, coords, face_edges(self.faces, len(coords)))
+        self.picker = VertexPicker(coords)
+        self.preview.fit_view()
+        self.preview.refresh()
         self.ax.set_title("")
         self.ax.axis("off")  # ✅ Remove ticks, grid, axes
         self.ax.set_navigate(True)  # ✅ Allow scroll zoom & pan
         self.canvas.draw()
 
+    def refresh_preview(self):
+        if self.preview is not None:
+            self.preview.refresh()
+
     def on_click(self, event):
-        if not self.vertices or event.xdata is None or event.ydata is None:
+        if not self.vertices or self.picker is None or event.xdata is None or event.ydata is None:
             return
 
-        coords = np.array(self.vertices)
+        coords = self.picker.vertices
         xy = coords[:, :2]
-        z = coords[:, 2]
-
-        click_point = np.array([event.xdata, event.ydata])
-        distances = np.linalg.norm(xy - click_point, axis=1)
 
         # Find candidates within radius
         threshold = 5
-        close_indices = np.where(distances < threshold)[0]
+        close_indices = self.picker.within(event.xdata, event.ydata, threshold)
 
         if close_indices.size == 0:
             return
 
+        distances = np.linalg.norm(xy[close_indices] - (event.xdata, event.ydata), axis=1)
+
         # Further filter to points below click (in Z)
         z_click = coords[close_indices, 2]
-        below_indices = close_indices[z_click < np.min(z_click) + 0.01]  # or stricter
+        below = z_click < np.min(z_click) + 0.01  # or stricter
 
         # If some are below, pick closest among them
-        if len(below_indices) > 0:
-            chosen_index = below_indices[np.argmin(distances[below_indices])]
+        if below.any():
+            chosen_index = close_indices[below][np.argmin(distances[below])]
         else:
-            chosen_index = close_indices[np.argmin(distances[close_indices])]
+            chosen_index = close_indices[np.argmin(distances)]
 
         self.picked_point = self.vertices[chosen_index]
         self.status_label.setText(f"Picked point: {self.picked_point}")
@@ -235,19 +239,8 @@ class OBJ2LocalTranslatorGUI(QWidget):
         new_obj_path = os.path.join(self.output_dir, base_name + ".obj")
         new_mtl_name = base_name + ".mtl"
 
-        with open(self.obj_file_path, 'r') as infile, open(new_obj_path, 'w') as outfile:
-            for line in infile:
-                if line.startswith("v "):
-                    parts = line.strip().split()
-                    x, y, z = map(float, parts[1:])
-                    x -= self.picked_point[0]
-                    y -= self.picked_point[1]
-                    z -= self.picked_point[2]
-                    outfile.write(f"v {x:.6f} {y:.6f} {z:.6f}\n")
-                elif line.startswith("mtllib"):
-                    outfile.write(f"mtllib {new_mtl_name}\n")
-                else:
-                    outfile.write(line)
+        offset = -np.asarray(self.picked_point[:3], dtype=np.float64)
+        transform_obj(self.obj_file_path, new_obj_path, translation(offset), precision=6, mtllib=new_mtl_name)
 
         if self.mtl_file_path and os.path.exists(self.mtl_file_path):
             new_mtl_path = os.path.join(self.output_dir, new_mtl_name)
@@ -18,100 +18,81 @@ import shapely.ops
 from shapely.geometry import shape, Point, Polygon
 import geopandas as gpd
 
-def transform_obj_coordinates(input_obj, output_obj, local_reference, utm_reference):
-    translation_vector = np.array(utm_reference) - np.array(local_reference)
-    with open(input_obj, 'r') as infile, open(output_obj, 'w') as outfile:
-        for line in infile:
-            if line.startswith('v '):
-                parts = line.split()
-                x_local, y_local, z_local = map(float, parts[1:4])
-                x_utm = x_local + translation_vector[0]         # Easting
-                y_utm = y_local + translation_vector[1]         # Northing
-                z_utm = z_local + translation_vector[2]         # Elevation
-                outfile.write(f"v {x_utm} {y_utm} {z_utm}\n")
-            else:
-                outfile.write(line)
+from scipy.spatial import cKDTree
+
+from src.core.transformobj import transform_obj_coordinates, parse_vertex_lines
+from src.core.obj2cityjson.objio import format_vertices
+from src.core.obj2cityjson.compat import SHAPELY_2
+from src.gui.plotting import FootprintView
 
 def update_obj_group_names_by_geojson(obj_path, geojson_path, output_obj_path ):
+    """
+    Rename every OBJ group to the fid of the GeoJSON footprint whose centroid is nearest.
+
+    Group centroids (mean of the group's face vertices) are computed for all groups at
+    once from one parsed index array, and matched to the footprint centroids with a
+    single cKDTree query. Groups without valid face vertices are dropped.
+    """
     with open(geojson_path) as f:
         geojson = json.load(f)
 
-    geojson_centroids = []
-    for feature in geojson['features']:
-        geom = shape(feature['geometry'])
-        fid = str(feature['properties']['fid'])
-        geojson_centroids.append((geom.centroid, fid))
-
-    with open(obj_path) as f:
-        lines = f.readlines()
+    fids = [str(feature['properties']['fid']) for feature in geojson['features']]
+    footprints = [shape(feature['geometry']) for feature in geojson['features']]
+    if SHAPELY_2:
+        footprint_xy = shapely.get_coordinates(shapely.centroid(footprints))
+    else:
+        footprint_xy = [geom.centroid.coords[0][:2] for geom in footprints]
 
+    vertex_lines = []
     groups = []
     current_group = None
-    vertices = []
-    v_list = []
-
-    for line in lines:
-        if line.startswith('v '):
-            # Vertex line
-            parts = line.strip().split()
-            v = list(map(float, parts[1:4]))
-            v_list.append(v)
-        elif line.startswith('g '):
-            # New group starts
-            if current_group:
+
+    with open(obj_path) as f:
+        for line in f:
+            if line.startswith('v '):
+                vertex_lines.append(line)
+            elif line.startswith('g '):
+                # New group starts
+                current_group = {'name': line.strip().split()[1], 'lines': [], 'faces': []}
                 groups.append(current_group)
-            current_group = {'name': line.strip().split()[1], 'lines': [line], 'faces': []}
-        elif line.startswith('f ') and current_group:
-            current_group['lines'].append(line)
-            current_group['faces'].append(line)
-        elif current_group:
-            current_group['lines'].append(line)
-
-    if current_group:
-        groups.append(current_group)
-
-    def compute_group_centroid(group, vertices):
-        face_vertices = []
-        for face_line in group['faces']:
-            face_indices = [int(part.split('/')[0]) - 1 for part in face_line.strip().split()[1:]]
-            for idx in face_indices:
-                if 0 <= idx < len(vertices):
-                    face_vertices.append(vertices[idx])
-        if face_vertices:
-            coords = np.array(face_vertices)
-            centroid = coords.mean(axis=0)
-            return Point(centroid)
-        return None
-
-    group_centroids = []
+            elif current_group:
+                current_group['lines'].append(line)
+                if line.startswith('f '):
+                    current_group['faces'].append(line[2:])
+
+    vertices = parse_vertex_lines(vertex_lines) if vertex_lines else np.empty((0, 3))
+
+    # Vertex index of every face corner, tagged with its group, parsed group by group
+    tokens, group_sizes = [], []
     for group in groups:
-        centroid = compute_group_centroid(group, v_list)
-        if centroid:
-            group_centroids.append((group, centroid))
-
-    def find_closest_fid(point, geojson_centroids):
-        min_dist = float('inf')
-        closest_fid = None
-        for gj_centroid, fid in geojson_centroids:
-            dist = point.distance(gj_centroid)
-            if dist < min_dist:
-                min_dist = dist
-                closest_fid = fid
-        return closest_fid
-
-    updated_lines = []
-    v_index = 0
-    for group, centroid in group_centroids:
-        new_name = find_closest_fid(centroid, geojson_centroids)
-        updated_lines.append(f"g {new_name}\n")
-        for line in group['lines'][1:]:  # Skip original g line
-            updated_lines.append(line)
+        group_tokens = " ".join(group['faces']).split()
+        if any('/' in token for token in group_tokens):
+            group_tokens = [token.split('/')[0] for token in group_tokens]
+        tokens.extend(group_tokens)
+        group_sizes.append(len(group_tokens))
+    face_indices = np.array(tokens, dtype=np.int64) - 1 if tokens else np.empty(0, dtype=np.int64)
+    face_groups = np.repeat(np.arange(len(groups)), group_sizes)
+
+    # Mean of the face vertices of every group, in bulk
+    valid = (face_indices >= 0) & (face_indices < len(vertices))
+    face_indices, face_groups = face_indices[valid], face_groups[valid]
+    counts = np.bincount(face_groups, minlength=len(groups))
+    sum_x = np.bincount(face_groups, weights=vertices[face_indices, 0], minlength=len(groups))
+    sum_y = np.bincount(face_groups, weights=vertices[face_indices, 1], minlength=len(groups))
+    has_centroid = counts > 0
+    group_xy = np.column_stack((sum_x, sum_y))[has_centroid] / counts[has_centroid, None]
+
+    if fids and len(group_xy):
+        _, nearest = cKDTree(np.asarray(footprint_xy)).query(group_xy)
+        new_names = [fids[i] for i in nearest.tolist()]
+    else:
+        new_names = [None] * len(group_xy)
 
     with open(output_obj_path, 'w') as f:
-        for v in v_list:
-            f.write(f"v {v[0]} {v[1]} {v[2]}\n")
-        for line in updated_lines:
-            f.write(line)
+        f.write(format_vertices(vertices, precision=None))
+        for group, new_name in zip((g for g, ok in zip(groups, has_centroid) if ok), new_names):
+            f.write(f"g {new_name}\n")
+            f.writelines(group['lines'])
 
 class OBJ2UTMTranslatorGUI(QWidget):
     def __init__(self):
@@ -120,7 +101,7 @@ class OBJ2UTMTranslatorGUI(QWidget):
         self.obj_file = ""
         self.geojson_file = ""
         self.utm_reference = None
-        self.coordinates = []
+        self.footprints = None
         self.selected_marker = None
         self.init_ui()
 
@@ -192,6 +173,7 @@ class OBJ2UTMTranslatorGUI(QWidget):
         self.figure, self.ax = plt.subplots(figsize=(10, 6))
         self.canvas = FigureCanvas(self.figure)
         self.canvas.mpl_connect("scroll_event", self.on_scroll)
+        self.canvas.mpl_connect("button_press_event", self.select_vertex)
         self.canvas.setMinimumHeight(500)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         canvas_layout.addWidget(self.canvas)
@@ -261,23 +243,13 @@ class OBJ2UTMTranslatorGUI(QWidget):
 
     def display_geojson(self):
         self.ax.clear()
+        self.footprints = None
+        self.selected_marker = None
         if not self.geojson_file:
             self.log("❌ No BO file loaded.")
             return
         gdf = gpd.read_file(self.geojson_file)
-        gdf.plot(ax=self.ax, edgecolor='black', facecolor='none')
-        self.coordinates.clear()
-
-        for geom in gdf.geometry:
-            if geom.geom_type == 'Polygon':
-                for x, y in geom.exterior.coords:
-                    self.ax.plot(x, y, 'ro', markersize=2)
-                    self.coordinates.append((x, y))
-            elif geom.geom_type == 'MultiPolygon':
-                for poly in geom.geoms:
-                    for x, y in poly.exterior.coords:
-                        self.ax.plot(x, y, 'ro', markersize=2)
-                        self.coordinates.append((x, y))
+        self.footprints = FootprintView(self.ax, gdf.geometry)
 
         self.figure.tight_layout() 
 
@@ -288,21 +260,22 @@ class OBJ2UTMTranslatorGUI(QWidget):
         self.ax.axis('off')
 
         self.canvas.draw()
-        self.canvas.mpl_connect("button_press_event", self.select_vertex)
-        self.log(f"Plotted {len(self.coordinates)} vertices.")
+        self.log(f"Plotted {len(self.footprints)} vertices.")
 
     def select_vertex(self, event):
         if event.button != 1 or event.xdata is None or event.ydata is None:
             return
-        x_clicked, y_clicked = event.xdata, event.ydata
-        closest = min(self.coordinates, key=lambda p: (p[0] - x_clicked) ** 2 + (p[1] - y_clicked) ** 2)
+        if self.footprints is None or len(self.footprints) == 0:
+            return
+        closest = self.footprints.vertices[self.footprints.picker.nearest(event.xdata, event.ydata)].tolist()
         self.utm_reference = [closest[0], closest[1], 0.0]
 
         if self.selected_marker:
             self.selected_marker.remove()
         self.selected_marker = self.ax.plot(closest[0], closest[1], 'go', markersize=10, label="Selected")[0]
-        self.ax.legend()
-        self.canvas.draw()
+        # A fixed corner: loc="best" scans every plotted vertex on each click
+        self.ax.legend(loc="upper right")
+        self.canvas.draw_idle()
 
         self.log(f"Selected vertex: X={closest[0]:.2f}, Y={closest[1]:.2f}")
 
@@ -8,8 +8,37 @@ from PyQt5.QtGui import QFont
 import numpy as np
 import geopandas as gpd
 from shapely.geometry import Point
-from collections import defaultdict
-from pyproj import Transformer
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from src.core.transformobj import replace_obj_vertices
+from src.core.crstransform import WGS84, transform_points
+from src.core.obj2cityjson.objio import flatten_faces
+
+def ground_components(coords, faces):
+    """
+    Drop every connected part of a mesh so its lowest vertex sits at the global minimum Z.
+
+    Vertices are connected through consecutive face indices; the components come from
+    scipy's connected_components on the sparse edge graph, and the per-component
+    minimum Z and the shift are computed with array operations.
+    """
+    coords = np.array(coords, dtype=np.float64)
+    num_vertices = len(coords)
+    if num_vertices == 0:
+        return coords
+
+    flat, sizes = flatten_faces(faces)
+    face_ids = np.repeat(np.arange(len(sizes)), sizes)
+    same_face = face_ids[:-1] == face_ids[1:]
+    src, dst = flat[:-1][same_face], flat[1:][same_face]
+    graph = coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(num_vertices, num_vertices))
+    _, labels = connected_components(graph, directed=False)
+
+    component_min_z = np.full(labels.max() + 1, np.inf)
+    np.minimum.at(component_min_z, labels, coords[:, 2])
+    coords[:, 2] -= component_min_z[labels] - component_min_z.min()
+    return coords
 
 class OBJ2WGSTranslatorGUI(QWidget):
     def _bold_label(self, text):
@@ -127,8 +156,7 @@ class OBJ2WGSTranslatorGUI(QWidget):
             lat = float(lat_str)
             lon = float(lon_str)
 
-            transformer = Transformer.from_crs("EPSG:4326", f"EPSG:{epsg}", always_xy=True)
-            x_utm, y_utm = transformer.transform(lon, lat)
+            x_utm, y_utm = transform_points((lon, lat), WGS84, epsg)
             return x_utm, y_utm
         except Exception as e:
             self.log_window.appendPlainText(f"[Error] Invalid WGS84 input: {e}")
@@ -144,47 +172,8 @@ class OBJ2WGSTranslatorGUI(QWidget):
             self.log("ERROR: Missing required input.")
             return
 
-        def find_connected_components(faces, num_vertices):
-            parent = list(range(num_vertices))
-
-            def find(u):
-                while parent[u] != u:
-                    parent[u] = parent[parent[u]]
-                    u = parent[u]
-                return u
-
-            def union(u, v):
-                pu, pv = find(u), find(v)
-                if pu != pv:
-                    parent[pu] = pv
-
-            for face in faces:
-                for i in range(1, len(face)):
-                    union(face[i - 1], face[i])
-
-            components = defaultdict(list)
-            for v in range(num_vertices):
-                root = find(v)
-                components[root].append(v)
-
-            return list(components.values())
-        
-        coords = np.array(self.vertices)  # (N, 3)
-        components = find_connected_components(self.faces, len(coords))
-
-        # Find the global minimum Z across all components
-        component_min_z = []
-        for comp in components:
-            min_z = coords[comp, 2].min()
-            component_min_z.append(min_z)
-
-        global_min_z = min(component_min_z)
-
-        # Shift each component so its base aligns to global_min_z
-        local_coords = coords.copy()
-        for comp, min_z in zip(components, component_min_z):
-            offset = min_z - global_min_z
-            local_coords[comp, 2] -= offset
+        # Shift each connected component so its base aligns to the global minimum Z
+        local_coords = ground_components(self.vertices, self.faces)
 
         # --- Step: Translate to local origin using UTM reference ---
         x_utm, y_utm = self.get_utm_reference()
@@ -201,20 +190,7 @@ class OBJ2WGSTranslatorGUI(QWidget):
         new_obj_path = os.path.join(self.output_dir, base_name + ".obj")
         new_mtl_name = base_name + ".mtl"
 
-        with open(self.obj_file_path, 'r') as infile, open(new_obj_path, 'w') as outfile:
-            vertex_index = 0
-            mtl_written = False
-
-            for line in infile:
-                if line.startswith("mtllib"):
-                    outfile.write(f"mtllib {new_mtl_name}\n")
-                    mtl_written = True
-                elif line.startswith("v "):
-                    x, y, z = local_coords[vertex_index]
-                    outfile.write(f"v {x:.6f} {y:.6f} {z:.6f}\n")
-                    vertex_index += 1
-                else:
-                    outfile.write(line)
+        replace_obj_vertices(self.obj_file_path, new_obj_path, local_coords, precision=6, mtllib=new_mtl_name)
 
         # --- Step 5: Copy MTL ---
         if self.mtl_file_path and os.path.exists(self.mtl_file_path):
@@ -1,20 +1,42 @@
 import sys
 import os
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QLabel, QPushButton,
+    QApplication, QWidget, QLabel, QPushButton, QListWidget, QAbstractItemView,
     QLineEdit, QTextEdit, QFileDialog, QVBoxLayout, QHBoxLayout
 )
 from PyQt5.QtGui import QFont
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from src.core.obj2cityjson.mergeobj import merge_obj_files
+
+class OBJMergeWorker(QThread):
+    progress = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool)
+
+    def __init__(self, obj_paths, output_path):
+        super().__init__()
+        self.obj_paths = obj_paths
+        self.output_path = output_path
+
+    def run(self):
+        try:
+            vertex_count, face_count = merge_obj_files(self.obj_paths, self.output_path)
+            self.progress.emit(f"Merged {len(self.obj_paths)} files: {vertex_count} vertices, {face_count} faces")
+            self.finished_signal.emit(True)
+        except Exception as e:
+            self.progress.emit(f"Error: {str(e)}")
+            self.finished_signal.emit(False)
 
 class OBJMerger(QWidget):
     def __init__(self):
         super().__init__()
 
-        self.obj1_path = QLineEdit()
-        self.obj2_path = QLineEdit()
+        self.obj_list = QListWidget()
+        self.obj_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.output_path = QLineEdit()
         self.log_console = QTextEdit()
         self.log_console.setReadOnly(True)
+        self.worker = None
 
         self.init_ui()
 
@@ -28,24 +50,18 @@ class OBJMerger(QWidget):
     def init_ui(self):
         layout = QVBoxLayout()
 
-        # Input OBJ 1
-        layout.addWidget(self._bold_label("Input OBJ 1"))
+        # Input OBJs
+        layout.addWidget(self._bold_label("Input OBJ Files"))
+        layout.addWidget(self.obj_list)
         row1 = QHBoxLayout()
-        row1.addWidget(self.obj1_path)
-        btn1 = QPushButton("Browse")
-        btn1.clicked.connect(self.browse_obj1)
-        row1.addWidget(btn1)
+        btn_add = QPushButton("Add Files")
+        btn_add.clicked.connect(self.browse_objs)
+        row1.addWidget(btn_add)
+        btn_remove = QPushButton("Remove Selected")
+        btn_remove.clicked.connect(self.remove_selected)
+        row1.addWidget(btn_remove)
         layout.addLayout(row1)
 
-        # Input OBJ 2
-        layout.addWidget(self._bold_label("Input OBJ 2"))
-        row2 = QHBoxLayout()
-        row2.addWidget(self.obj2_path)
-        btn2 = QPushButton("Browse")
-        btn2.clicked.connect(self.browse_obj2)
-        row2.addWidget(btn2)
-        layout.addLayout(row2)
-
         # Output path
         layout.addWidget(self._bold_label("Select Output Directory and Filename"))
         row3 = QHBoxLayout()
@@ -68,15 +84,19 @@ class OBJMerger(QWidget):
 
         self.setLayout(layout)
 
-    def browse_obj1(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select OBJ 1", "", "OBJ Files (*.obj)")
-        if path:
-            self.obj1_path.setText(path)
+    def obj_paths(self):
+        return [self.obj_list.item(i).text() for i in range(self.obj_list.count())]
 
-    def browse_obj2(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select OBJ 2", "", "OBJ Files (*.obj)")
-        if path:
-            self.obj2_path.setText(path)
+    def browse_objs(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Select OBJ Files", "", "OBJ Files (*.obj)")
+        existing = set(self.obj_paths())
+        for path in paths:
+            if path not in existing:
+                self.obj_list.addItem(path)
+
+    def remove_selected(self):
+        for item in self.obj_list.selectedItems():
+            self.obj_list.takeItem(self.obj_list.row(item))
 
     def browse_output(self):
         path, _ = QFileDialog.getSaveFileName(self, "Select Output OBJ File", "", "OBJ Files (*.obj)")
@@ -84,49 +104,20 @@ class OBJMerger(QWidget):
             self.output_path.setText(path)
 
     def merge_objs(self):
-        path1 = self.obj1_path.text()
-        path2 = self.obj2_path.text()
+        paths = self.obj_paths()
         output_path = self.output_path.text()
 
-        if not path1 or not path2 or not output_path:
-            self.log_console.append("Please select both OBJ files and output path.")
+        if len(paths) < 2 or not output_path:
+            self.log_console.append("Please select at least two OBJ files and output path.")
             return
 
-        try:
-            with open(path1, "r") as f1, open(path2, "r") as f2:
-                lines1 = f1.readlines()
-                lines2 = f2.readlines()
-
-            vertices = []
-            faces = []
-            vertex_offset = 0
-
-            # Read OBJ 1
-            for line in lines1:
-                if line.startswith("v "):
-                    vertices.append(line)
-                elif line.startswith("f "):
-                    faces.append(line)
-
-            vertex_offset = len(vertices)
-
-            # Read OBJ 2 and adjust face indices
-            for line in lines2:
-                if line.startswith("v "):
-                    vertices.append(line)
-                elif line.startswith("f "):
-                    parts = line.strip().split()
-                    new_face = "f " + " ".join(
-                        str(int(p.split("/")[0]) + vertex_offset) for p in parts[1:]
-                    )
-                    faces.append(new_face + "\n")
-
-            # Write merged OBJ
-            with open(output_path, "w") as fout:
-                fout.writelines(vertices)
-                fout.writelines(faces)
-
-            self.log_console.append(f"Successfully merged and saved to {output_path}")
+        self.merge_btn.setEnabled(False)
+        self.worker = OBJMergeWorker(paths, output_path)
+        self.worker.progress.connect(self.log_console.append)
+        self.worker.finished_signal.connect(self.on_merge_finished)
+        self.worker.start()
 
-        except Exception as e:
-            self.log_console.append(f"Error: {str(e)}")
\ No newline at end of file
+    def on_merge_finished(self, success):
+        self.merge_btn.setEnabled(True)
+        if success:
+            self.log_console.append(f"Successfully merged and saved to {self.output_path.text()}")
\ No newline at end of file
@@ -2,13 +2,42 @@ from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QFileDialog, QVBoxLayout, QHBoxLayout, QMessageBox,
     QLineEdit, QTextEdit, QSlider, QSpinBox, QDoubleSpinBox, QGroupBox, QSizePolicy
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 import os
-import subprocess
+from collections import deque
+
+from src.core.reconstruction import ReconstructionManager
+
+class ReconstructionWorker(QThread):
+    progress = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool)
+
+    def __init__(self, footprint, pointcloud, output_dir, advanced_params):
+        super().__init__()
+        self.footprint = footprint
+        self.pointcloud = pointcloud
+        self.output_dir = output_dir
+        self.advanced_params = advanced_params
+        self.manager = ReconstructionManager(progress_callback=self.progress.emit)
+
+    def run(self):
+        try:
+            success = self.manager.run_reconstruction(
+                self.footprint, self.pointcloud, self.output_dir, self.advanced_params
+            )
+            self.finished_signal.emit(success)
+        except Exception as e:
+            self.progress.emit(f"❌ Exception:\n{e}")
+            self.finished_signal.emit(False)
+
+    def cancel(self):
+        self.manager.cancel()
 
 class ReconstructTab(QWidget):
     def __init__(self):
         super().__init__()
+        self.worker = None
+        self.job_queue = deque()
         # UI components
         layout = QVBoxLayout()
 
@@ -77,9 +106,14 @@ class ReconstructTab(QWidget):
         self.btn_process.setStyleSheet("font-weight: bold; font-size: 20px; padding: 10px;")
         self.btn_process.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)  # Make button fill the width
         
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.setStyleSheet("font-size: 20px; padding: 10px;")
+        self.btn_cancel.setEnabled(False)
+
         # Add button to a horizontal layout to make it stretch
         button_layout = QHBoxLayout()
         button_layout.addWidget(self.btn_process)
+        button_layout.addWidget(self.btn_cancel)
         button_layout.setStretch(0, 1)
 
         layout.addLayout(button_layout)
@@ -96,6 +130,7 @@ class ReconstructTab(QWidget):
         self.btn_browse_pointcloud.clicked.connect(self.browse_pointcloud)
         self.btn_browse_output.clicked.connect(self.browse_output_folder)
         self.btn_process.clicked.connect(self.run_geoflow)
+        self.btn_cancel.clicked.connect(self.cancel_geoflow)
 
     def _bold_label(self, text):
         label = QLabel(f"<b>{text}</b>")
@@ -173,9 +208,6 @@ class ReconstructTab(QWidget):
         out_dir = self.output_folder.text()
 
         self.log_console.append(f"📂 Current working dir: {os.getcwd()}")
-        
-        from src.core.reconstruction import ReconstructionManager
-        manager = ReconstructionManager()
 
         advanced_params = {}
         for k, widget in self.advanced_inputs.items():
@@ -184,19 +216,54 @@ class ReconstructTab(QWidget):
                 val = val / 2.0
             advanced_params[k] = val
 
+        # Jobs run one after another on a worker thread so the UI stays responsive
+        self.job_queue.append((fp, pc, out_dir, advanced_params))
+        if self.worker is not None:
+            self.log_console.append(f"⏳ Reconstruction queued ({len(self.job_queue)} waiting).")
+            return
+        self._start_next_job()
+
+    def _start_next_job(self):
+        if not self.job_queue:
+            self.worker = None
+            self.btn_cancel.setEnabled(False)
+            return
+
+        fp, pc, out_dir, advanced_params = self.job_queue.popleft()
         self.log_console.append("🚀 Starting Reconstruction (via Core Manager)...")
-        # Note: We are running this on the main thread which might freeze UI. 
-        # For now, to match legacy behavior (which froze UI but printed logs sometimes?), we keep it simple.
-        # But legacy used subprocess which blocked? No, subprocess.run blocks.
-        # So this will also block.
-        
-        try:
-            success = manager.run_reconstruction(fp, pc, out_dir, advanced_params)
-            if success:
-                self.log_console.append("✅ 3D Reconstruction completed successfully.")
-                QMessageBox.information(self, "Process Complete", "The 3D model has been reconstructed successfully.")
-            else:
-                self.log_console.append("❌ Reconstruction failed. Check logs.")
-                QMessageBox.warning(self, "Process Failed", "The 3D model failed to generate.")
-        except Exception as e:
-            self.log_console.append(f"❌ Exception:\n{e}")
+        self.log_console.append(f"📁 Output directory: {out_dir}")
+
+        self.worker = ReconstructionWorker(fp, pc, out_dir, advanced_params)
+        self.worker.progress.connect(self.log_console.append)
+        self.worker.finished_signal.connect(self.on_reconstruction_finished)
+        self.btn_cancel.setEnabled(True)
+        self.worker.start()
+
+    def cancel_geoflow(self):
+        if self.worker is None:
+            return
+        if self.job_queue:
+            self.log_console.append(f"🗑️ Removed {len(self.job_queue)} queued reconstruction(s).")
+            self.job_queue.clear()
+        self.log_console.append("🛑 Cancelling reconstruction...")
+        self.btn_cancel.setEnabled(False)
+        self.worker.cancel()
+
+    def on_reconstruction_finished(self, success):
+        cancelled = self.worker.manager.cancelled
+        self.worker.wait()
+
+        if cancelled:
+            self.log_console.append("🛑 Reconstruction cancelled.")
+        elif success:
+            self.log_console.append("✅ 3D Reconstruction completed successfully.")
+        else:
+            self.log_console.append("❌ Reconstruction failed. Check logs.")
+
+        self._start_next_job()
+        if cancelled or self.worker is not None:
+            return
+        if success:
+            QMessageBox.information(self, "Process Complete", "The 3D model has been reconstructed successfully.")
+        else:
+            QMessageBox.warning(self, "Process Failed", "The 3D model failed to generate.")
@@ -7,7 +7,6 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
-from src.core.semantic_mapping import *
 
 class SemanticTab(QWidget):
     def __init__(self):
@@ -90,6 +89,7 @@ class SemanticTab(QWidget):
             sys.stdout = QTextStream()
 
             if os.path.isdir(obj_input):
+                from src.core.semantic_mapping import BuildingColorizer
                 colorizer = BuildingColorizer(obj_input, geojson_path)
                 colorizer.process_all_buildings()
             else:
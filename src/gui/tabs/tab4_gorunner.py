@@ -1,22 +1,24 @@
 import os
 import sys
+import queue
 import subprocess
+import multiprocessing
 import geopandas as gpd
 import matplotlib.pyplot as plt
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QLineEdit, QVBoxLayout,
     QHBoxLayout, QFileDialog, QComboBox, QPlainTextEdit, QSizePolicy, QMessageBox,
-    QGridLayout, QCheckBox
+    QGridLayout, QCheckBox, QProgressBar
 )
 from PyQt5.QtGui import QFont
+from PyQt5.QtCore import QThread, pyqtSignal
+from collections import deque
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
-from src.core.obj2cityjson.separator import split_obj_by_geojson
-from src.core.obj2cityjson.color import coloring_obj
-from src.core.obj2cityjson.tojson import obj_folder_to_cityjson
-from src.core.obj2cityjson.mergeobj import merge_obj_mtl
+from src.core.obj2cityjson.pipeline import init_stage_queue, run_fused_pipeline_queued
 from src.core.obj2cityjson.json2gml import json2gml
+from src.gui.plotting import FootprintView
 import shutil
 
 COLORS = {
@@ -25,12 +27,164 @@ COLORS = {
     "roof": (1.00, 0.00, 0.00)
 }
 
+class PipelineCancelled(Exception):
+    pass
+
+class GoRunnerWorker(QThread):
+    progress = pyqtSignal(str)
+    step_progress = pyqtSignal(int, int)
+    finished_signal = pyqtSignal(bool)
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self._process = None
+        self._pool = None
+        self._cancelled = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        self._cancelled = True
+        pool = self._pool
+        if pool is not None:
+            pool.terminate()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def check_cancelled(self):
+        if self._cancelled:
+            raise PipelineCancelled()
+
+    def step(self, index, total, message):
+        self.check_cancelled()
+        self.step_progress.emit(index, total)
+        self.progress.emit(message)
+
+    def run_subprocess(self, cmd):
+        """Runs a command, streaming its output and keeping a handle so cancel() can kill it."""
+        self.check_cancelled()
+        self._process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        try:
+            for line in self._process.stdout:
+                if line.strip():
+                    self.progress.emit(line.rstrip())
+            returncode = self._process.wait()
+        finally:
+            self._process = None
+        self.check_cancelled()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
+
+    def run(self):
+        job = self.job
+        try:
+            self.run_pipeline(**job)
+            self.finished_signal.emit(True)
+        except PipelineCancelled:
+            self.progress.emit("🛑 Process cancelled.")
+            self.finished_signal.emit(False)
+        except subprocess.CalledProcessError as e:
+            self.progress.emit(f"❌ Error occurred: {e}")
+            self.finished_signal.emit(False)
+        except Exception as e:
+            self.progress.emit(f"❌ Exception:\n{e}")
+            self.finished_signal.emit(False)
+        finally:
+            if os.path.exists(job["outputtemp_obj_color"]):
+                shutil.rmtree(job["outputtemp_obj_color"])
+
+    def split_color_merge(self, obj_path, geojson_path, origin_utm, prefix, user, epsg, output_geojson, output_merge_obj,
+                          output_mtl, output_cityjson, colored_dir, total):
+        """Split, color, merge and (optionally) convert to CityJSON in memory, writing only the final outputs."""
+        stage = iter(range(1, total + 1))
+
+        def on_stage(message):
+            self.step(next(stage), total, message)
+
+        self.progress.emit(f"➡️  run_fused_pipeline({obj_path}, {geojson_path}, {origin_utm}, {prefix}, {user}, {output_geojson})")
+        kwargs = dict(
+            obj_path=obj_path, geojson_path=geojson_path, origin_utm=origin_utm, colors=COLORS,
+            uuid_prefix=prefix, user=user, output_geojson=output_geojson, output_obj=output_merge_obj,
+            output_mtl=output_mtl, output_cityjson=output_cityjson, epsg=epsg, colored_dir=colored_dir
+        )
+        # The stages run in a pool process so that cancel() can terminate them mid-stage
+        context = multiprocessing.get_context("spawn")
+        stages = context.Queue()
+        self._pool = context.Pool(1, initializer=init_stage_queue, initargs=(stages,))
+        try:
+            self.check_cancelled()
+            result = self._pool.apply_async(run_fused_pipeline_queued, (kwargs,))
+            while not result.ready():
+                self.check_cancelled()
+                try:
+                    on_stage(stages.get(timeout=0.2))
+                except queue.Empty:
+                    pass
+            while True:
+                try:
+                    on_stage(stages.get_nowait())
+                except queue.Empty:
+                    break
+            count = result.get()
+        finally:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self.progress.emit(f"✅ OBJ Merge done ({count} buildings), output saved to: {output_merge_obj}")
+        if output_cityjson:
+            self.progress.emit(f"✅ Convert to CityJSON done, output saved to: {output_cityjson}")
+
+    def run_pipeline(self, obj_path, geojson_path, tx, ty, origin_utm, prefix, user, epsg, obj_checked, cityjson_checked,
+                     citygml_checked, output_geojson, output_merge_obj, output_mtl, output_path,
+                     outputtemp_obj_color):
+        self.progress.emit("Starting process...")
+        self.progress.emit(f"Using coordinates: X={tx}, Y={ty}")
+
+        # === OBJ (and optionally CityJSON) without CityGML ===
+        if obj_checked and not citygml_checked:
+            total = 4 if cityjson_checked else 3
+            self.split_color_merge(obj_path, geojson_path, origin_utm, prefix, user, epsg, output_geojson,
+                                   output_merge_obj, output_mtl, output_path if cityjson_checked else None, None, total)
+
+        # === Only CityGML selected ===
+        elif citygml_checked and not obj_checked and not cityjson_checked:
+            self.step(1, 1, "🔁 Start converting to CityGML")
+            self.run_subprocess(
+                ["python", "function/obj2gml/obj2gmlrunner.py", obj_path, geojson_path, str(tx), str(ty), prefix or "", user or "", str(epsg)]
+            )
+
+        # === Both OBJ and CityGML selected ===
+        elif obj_checked and citygml_checked:
+            # The CityGML converter reads the per-building colored OBJ folder
+            total = 6 if cityjson_checked else 5
+            self.split_color_merge(obj_path, geojson_path, origin_utm, prefix, user, epsg, output_geojson,
+                                   output_merge_obj, output_mtl, output_path if cityjson_checked else None,
+                                   outputtemp_obj_color, total - 1)
+
+            self.step(total, total, "🔁 Start converting to CityGML")
+            self.run_subprocess(
+                ["python", "function/obj2gml/obj2gmlrunner2.py", outputtemp_obj_color, output_geojson, prefix or "", user or "", str(epsg), obj_path]
+            )
+
+        self.step_progress.emit(1, 1)
+        self.progress.emit("✅ Process completed.")
+
 class GoRunner(QWidget):
     def __init__(self):
         super().__init__()
+        self.worker = None
+        self.job_queue = deque()
         self.obj_file = None
         self.geojson_file = None
-        self.coordinates = []
+        self.footprints = None
         self.selected_marker = None
         self.utm_reference = None
         self._press_event = None
@@ -98,6 +252,7 @@ class GoRunner(QWidget):
         self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvas(self.figure)
         self.canvas.mpl_connect("scroll_event", self.on_scroll)
+        self.canvas.mpl_connect("button_press_event", self.select_vertex)
         self.canvas.setMinimumHeight(500)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         canvas_layout.addWidget(self.canvas)
@@ -142,12 +297,24 @@ class GoRunner(QWidget):
         row_output.addWidget(self.output_citygml)
         layout.addLayout(row_output)
 
-        # Process button
+        # Process / Cancel buttons
         self.btn_process = QPushButton("Process")
         self.btn_process.setStyleSheet("font-weight: bold; padding: 8px;")
         self.btn_process.setFont(QFont("Arial", 11, QFont.Bold))
-        layout.addWidget(self.btn_process)
-        
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.setStyleSheet("padding: 8px;")
+        self.btn_cancel.setFont(QFont("Arial", 11))
+        self.btn_cancel.setEnabled(False)
+        row_buttons = QHBoxLayout()
+        row_buttons.addWidget(self.btn_process, stretch=1)
+        row_buttons.addWidget(self.btn_cancel)
+        layout.addLayout(row_buttons)
+
+        # Progress of the running file set
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
         # Log
         layout.addWidget(self._bold_label("Log Output"))
         self.log_window = QPlainTextEdit()
@@ -160,6 +327,7 @@ class GoRunner(QWidget):
         self.btn_browse_obj.clicked.connect(self.load_obj)
         self.btn_browse_geojson.clicked.connect(self.load_geojson)
         self.btn_process.clicked.connect(self.run_obj2gml)
+        self.btn_cancel.clicked.connect(self.cancel_obj2gml)
 
         self.toggle_reference_input_method(self.reference_method.currentIndex())
         self.enable_panning()
@@ -196,23 +364,13 @@ class GoRunner(QWidget):
 
     def display_geojson(self):
         self.ax.clear()
+        self.footprints = None
+        self.selected_marker = None
         if not self.geojson_file:
             self.log("❌ No BO file loaded.")
             return
         gdf = gpd.read_file(self.geojson_file)
-        gdf.plot(ax=self.ax, edgecolor='black', facecolor='none')
-        self.coordinates.clear()
-
-        for geom in gdf.geometry:
-            if geom.geom_type == 'Polygon':
-                for x, y in geom.exterior.coords:
-                    self.ax.plot(x, y, 'ro', markersize=2)
-                    self.coordinates.append((x, y))
-            elif geom.geom_type == 'MultiPolygon':
-                for poly in geom.geoms:
-                    for x, y in poly.exterior.coords:
-                        self.ax.plot(x, y, 'ro', markersize=2)
-                        self.coordinates.append((x, y))
+        self.footprints = FootprintView(self.ax, gdf.geometry)
 
         self.figure.tight_layout() 
         
@@ -223,20 +381,21 @@ class GoRunner(QWidget):
         self.ax.axis("off")
 
         self.canvas.draw()
-        self.canvas.mpl_connect("button_press_event", self.select_vertex)
 
     def select_vertex(self, event):
         if event.button != 1 or event.xdata is None or event.ydata is None:
             return
-        x_clicked, y_clicked = event.xdata, event.ydata
-        closest = min(self.coordinates, key=lambda p: (p[0] - x_clicked) ** 2 + (p[1] - y_clicked) ** 2)
+        if self.footprints is None or len(self.footprints) == 0:
+            return
+        closest = self.footprints.vertices[self.footprints.picker.nearest(event.xdata, event.ydata)].tolist()
         self.utm_reference = (closest[0], closest[1])
 
         if self.selected_marker:
             self.selected_marker.remove()
         self.selected_marker = self.ax.plot(closest[0], closest[1], 'go', markersize=10, label="Selected")[0]
-        self.ax.legend()
-        self.canvas.draw()
+        # A fixed corner: loc="best" scans every plotted vertex on each click
+        self.ax.legend(loc="upper right")
+        self.canvas.draw_idle()
 
         self.log(f"Selected vertex: X={closest[0]:.2f}, Y={closest[1]:.2f}")
 
@@ -320,7 +479,6 @@ class GoRunner(QWidget):
                 QMessageBox.warning(self, "No Vertex", "No vertex selected.")
                 return
             tx, ty = self.utm_reference
-        self.log(f"Using coordinates: X={tx}, Y={ty}")
 
         origin_utm = (
             tuple(map(float, [self.input_x.text(), self.input_y.text(), 0.001]))
@@ -338,88 +496,74 @@ class GoRunner(QWidget):
         geojson_name = os.path.basename(geojson_path)
         geojson_stem = os.path.splitext(geojson_name)[0]
 
+        obj_checked = self.output_obj.isChecked()
+        cityjson_checked = self.output_cityjson.isChecked()
+        citygml_checked = self.output_citygml.isChecked()
+
+        if not obj_checked and not cityjson_checked and not citygml_checked:
+            QMessageBox.warning(self, "No Output Selected", "Please select at least one output format (OBJ, CityJSON, CityGML).")
+            return
+
         output = os.path.dirname(obj_path)
-        output_geojson = os.path.join(output, f"{geojson_stem}_Processed.geojson")
-        output_merge_obj = os.path.join(output, f"{obj_stem}_merge.obj")
-        output_mtl = os.path.join(output, f"{obj_stem}_merge.mtl")
-        output_path = os.path.join(output, f"{obj_stem}.json")
-        output_dir_temp = os.path.join(output, "temptrash")
-        outputtemp_obj_color = os.path.join(output, "temptrash_color")
+        job = {
+            "obj_path": obj_path,
+            "geojson_path": geojson_path,
+            "tx": tx,
+            "ty": ty,
+            "origin_utm": origin_utm,
+            "prefix": prefix,
+            "user": user,
+            "epsg": epsg,
+            "obj_checked": obj_checked,
+            "cityjson_checked": cityjson_checked,
+            "citygml_checked": citygml_checked,
+            "output_geojson": os.path.join(output, f"{geojson_stem}_Processed.geojson"),
+            "output_merge_obj": os.path.join(output, f"{obj_stem}_merge.obj"),
+            "output_mtl": os.path.join(output, f"{obj_stem}_merge.mtl"),
+            "output_path": os.path.join(output, f"{obj_stem}.json"),
+            "outputtemp_obj_color": os.path.join(output, "temptrash_color"),
+        }
+
+        # File sets run one after another on a worker thread so the event loop stays free
+        self.job_queue.append(job)
+        if self.worker is not None:
+            self.log(f"⏳ Queued {obj_name} ({len(self.job_queue)} waiting).")
+            return
+        self._start_next_job()
 
-        try:
-            obj_checked = self.output_obj.isChecked()
-            cityjson_checked = self.output_cityjson.isChecked()
-            citygml_checked = self.output_citygml.isChecked()
+    def _start_next_job(self):
+        if not self.job_queue:
+            self.worker = None
+            self.btn_cancel.setEnabled(False)
+            return
 
-            if not obj_checked and not cityjson_checked and not citygml_checked:
-                QMessageBox.warning(self, "No Output Selected", "Please select at least one output format (OBJ, CityJSON, CityGML).")
-                return
+        job = self.job_queue.popleft()
+        self.log(f"🚀 Processing {job['obj_path']}")
+        self.progress_bar.setValue(0)
 
-                # === Only OBJ selected ===
-            if obj_checked and not cityjson_checked and not citygml_checked:
-                self.log("Starting process...")
-                self.log_window.appendPlainText("📄 Read OBJ")
-                self.log_window.appendPlainText("🔧 Start splitting OBJ by GeoJSON")
-                self.log_window.appendPlainText(f"➡️  split_obj_by_geojson({obj_path}, {geojson_path}, {output_dir_temp}, {origin_utm}, {prefix}, {user}, {output_geojson})")
-                split_obj_by_geojson(obj_path, geojson_path, output_dir_temp, origin_utm, prefix, user, output_geojson)
-
-                self.log_window.appendPlainText("🎨 Coloring Process")
-                self.log_window.appendPlainText(f"➡️  coloring_obj({output_dir_temp}, {outputtemp_obj_color}, COLORS)")
-                coloring_obj(output_dir_temp, outputtemp_obj_color, COLORS)
-
-                self.log_window.appendPlainText("✅ Coloring done, merging OBJ")
-                merge_obj_mtl(outputtemp_obj_color, output_merge_obj, output_mtl)
-                self.log_window.appendPlainText(f"✅ OBJ Merge done, output saved to: {output_merge_obj}")
-
-                if cityjson_checked:
-                    self.log_window.appendPlainText("🏙️ Start converting to CityJSON")
-                    obj_folder_to_cityjson(outputtemp_obj_color, output_path, epsg)
-                    self.log_window.appendPlainText(f"✅ Convert to CityJSON done, output saved to: {output_path}")
-            
-             # === Only CityGML selected ===
-            elif citygml_checked and not obj_checked and not cityjson_checked:
-                self.log("Starting process...")
-                subprocess.run(
-                    ["python", "function/obj2gml/obj2gmlrunner.py", obj_path, geojson_path, str(tx), str(ty), prefix or "", user or "", str(epsg)],
-                    check=True,
-                    text=True
-                )
-                self.log("✅ Process completed.")
-
-                # === Both OBJ and CityGML selected ===
-            elif obj_checked and citygml_checked:
-                self.log("Starting process...")
-                self.log_window.appendPlainText("📄 Read OBJ")
-                self.log_window.appendPlainText("🔧 Start splitting OBJ by GeoJSON")
-                self.log_window.appendPlainText(f"➡️  split_obj_by_geojson({obj_path}, {geojson_path}, {output_dir_temp}, {origin_utm}, {prefix}, {user}, {output_geojson})")
-                split_obj_by_geojson(obj_path, geojson_path, output_dir_temp, origin_utm, prefix, user, output_geojson)
-
-                self.log_window.appendPlainText("🎨 Coloring Process")
-                self.log_window.appendPlainText(f"➡️  coloring_obj({output_dir_temp}, {outputtemp_obj_color}, COLORS)")
-                coloring_obj(output_dir_temp, outputtemp_obj_color, COLORS)
-
-                self.log_window.appendPlainText("✅ Coloring done, merging OBJ")
-                merge_obj_mtl(outputtemp_obj_color, output_merge_obj, output_mtl)
-                self.log_window.appendPlainText(f"✅ OBJ Merge done, output saved to: {output_merge_obj}")
-
-                if cityjson_checked:
-                    self.log_window.appendPlainText("🏙️ Start converting to CityJSON")
-                    obj_folder_to_cityjson(outputtemp_obj_color, output_path, epsg)
-                    self.log_window.appendPlainText(f"✅ Convert to CityJSON done, output saved to: {output_path}")
-                
-                self.log("🔁 Start converting to CityGML")
-                subprocess.run(
-                    ["python", "function/obj2gml/obj2gmlrunner2.py", outputtemp_obj_color, output_geojson, prefix or "", user or "", str(epsg), obj_path],
-                    check=True,
-                    text=True
-                )
-                self.log("✅ Process completed.")
+        self.worker = GoRunnerWorker(job)
+        self.worker.progress.connect(self.log)
+        self.worker.step_progress.connect(self.on_step_progress)
+        self.worker.finished_signal.connect(self.on_obj2gml_finished)
+        self.btn_cancel.setEnabled(True)
+        self.worker.start()
 
-        except subprocess.CalledProcessError as e:
-            self.log(f"❌ Error occurred: {e}")
+    def on_step_progress(self, index, total):
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(index)
 
-        finally:
-            if os.path.exists(output_dir_temp):
-                shutil.rmtree(output_dir_temp)
-            if os.path.exists(outputtemp_obj_color):
-                shutil.rmtree(outputtemp_obj_color)
\ No newline at end of file
+    def cancel_obj2gml(self):
+        if self.worker is None:
+            return
+        if self.job_queue:
+            self.log(f"🗑️ Removed {len(self.job_queue)} queued file set(s).")
+            self.job_queue.clear()
+        self.log("🛑 Cancelling... the current step will stop as soon as possible.")
+        self.btn_cancel.setEnabled(False)
+        self.worker.cancel()
+
+    def on_obj2gml_finished(self, success):
+        self.worker.wait()
+        if not success and not self.worker.cancelled:
+            self.progress_bar.setValue(0)
+        self._start_next_job()
@@ -1,35 +1,68 @@
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QFileDialog, QVBoxLayout, QHBoxLayout,
-    QLineEdit, QTextEdit, QSizePolicy
+    QLineEdit, QTextEdit, QListWidget, QComboBox, QCheckBox, QAbstractItemView
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QThread, pyqtSignal
 import os
-import subprocess
+
+from src.core.obj2cityjson.mergecityjson import merge_cityjson
+
+CONFLICT_OPTIONS = [
+    ("Rename duplicates", "rename"),
+    ("Keep first", "keep_first"),
+    ("Replace with later", "replace"),
+]
+
+class MergeWorker(QThread):
+    progress = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool)
+
+    def __init__(self, input_files, output_file, on_conflict, finest_scale=False):
+        super().__init__()
+        self.input_files = input_files
+        self.output_file = output_file
+        self.on_conflict = on_conflict
+        self.finest_scale = finest_scale
+
+    def run(self):
+        try:
+            merge_cityjson(self.input_files, self.output_file, on_conflict=self.on_conflict,
+                           finest_scale=self.finest_scale, log=self.progress.emit)
+            self.finished_signal.emit(True)
+        except Exception as e:
+            self.progress.emit(f"❌ Exception occurred:\n{e}")
+            self.finished_signal.emit(False)
 
 class MergeCityJSON(QWidget):
     def __init__(self):
         super().__init__()
 
         self.setMinimumSize(800, 400)
+        self.worker = None
         layout = QVBoxLayout()
 
-        # ===== Input CityJSON File 1 =====
-        layout.addWidget(self._bold_label("Load CityJSON File 1"))
-        self.cityjson_file1 = QLineEdit()
-        btn_browse1 = QPushButton("Browse")
+        # ===== Input CityJSON Files =====
+        layout.addWidget(self._bold_label("Load CityJSON Files"))
+        self.file_list = QListWidget()
+        self.file_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        layout.addWidget(self.file_list)
+        btn_add = QPushButton("Add Files")
+        btn_remove = QPushButton("Remove Selected")
         row1 = QHBoxLayout()
-        row1.addWidget(self.cityjson_file1)
-        row1.addWidget(btn_browse1)
+        row1.addWidget(btn_add)
+        row1.addWidget(btn_remove)
         layout.addLayout(row1)
 
-        # ===== Input CityJSON File 2 =====
-        layout.addWidget(self._bold_label("Load CityJSON File 2"))
-        self.cityjson_file2 = QLineEdit()
-        btn_browse2 = QPushButton("Browse")
-        row2 = QHBoxLayout()
-        row2.addWidget(self.cityjson_file2)
-        row2.addWidget(btn_browse2)
-        layout.addLayout(row2)
+        # ===== Duplicate CityObject IDs =====
+        layout.addWidget(self._bold_label("On Duplicate CityObject ID"))
+        self.conflict_combo = QComboBox()
+        for label, _ in CONFLICT_OPTIONS:
+            self.conflict_combo.addItem(label)
+        layout.addWidget(self.conflict_combo)
+
+        # ===== Precision =====
+        self.finest_scale_check = QCheckBox("Keep the finest precision of all files (scans every file first)")
+        layout.addWidget(self.finest_scale_check)
 
         # ===== Output File Path (incl. filename) =====
         layout.addWidget(self._bold_label("Output File"))
@@ -53,8 +86,8 @@ class MergeCityJSON(QWidget):
         self.setLayout(layout)
 
         # Connections
-        btn_browse1.clicked.connect(self.browse_file1)
-        btn_browse2.clicked.connect(self.browse_file2)
+        btn_add.clicked.connect(self.browse_files)
+        btn_remove.clicked.connect(self.remove_selected)
         btn_browse_output.clicked.connect(self.browse_output)
         self.btn_merge.clicked.connect(self.merge_cityjson_files)
 
@@ -62,17 +95,20 @@ class MergeCityJSON(QWidget):
         label = QLabel(f"<b>{text}</b>")
         return label
 
-    def browse_file1(self):
-        file_name, _ = QFileDialog.getOpenFileName(self, "Select CityJSON File 1", "", "CityJSON Files (*.json)")
-        if file_name:
-            self.cityjson_file1.setText(file_name)
-            self.log_console.append(f"📁 File 1 selected: {file_name}")
+    def input_files(self):
+        return [self.file_list.item(i).text() for i in range(self.file_list.count())]
 
-    def browse_file2(self):
-        file_name, _ = QFileDialog.getOpenFileName(self, "Select CityJSON File 2", "", "CityJSON Files (*.json)")
-        if file_name:
-            self.cityjson_file2.setText(file_name)
-            self.log_console.append(f"📁 File 2 selected: {file_name}")
+    def browse_files(self):
+        file_names, _ = QFileDialog.getOpenFileNames(self, "Select CityJSON Files", "", "CityJSON Files (*.json)")
+        existing = set(self.input_files())
+        for file_name in file_names:
+            if file_name not in existing:
+                self.file_list.addItem(file_name)
+                self.log_console.append(f"📁 File selected: {file_name}")
+
+    def remove_selected(self):
+        for item in self.file_list.selectedItems():
+            self.file_list.takeItem(self.file_list.row(item))
 
     def browse_output(self):
         file_name, _ = QFileDialog.getSaveFileName(self, "Save Output File", "", "CityJSON Files (*.json)")
@@ -81,26 +117,35 @@ class MergeCityJSON(QWidget):
             self.log_console.append(f"📄 Output file selected: {file_name}")
 
     def merge_cityjson_files(self):
-        file1 = self.cityjson_file1.text()
-        file2 = self.cityjson_file2.text()
+        files = self.input_files()
         output = self.output_file.text()
 
-        if not os.path.exists(file1) or not os.path.exists(file2):
-            self.log_console.append("❌ One or both input files are invalid.")
+        if len(files) < 2:
+            self.log_console.append("❌ Select at least two CityJSON files.")
+            return
+        missing = [f for f in files if not os.path.exists(f)]
+        if missing:
+            self.log_console.append(f"❌ Input files not found: {', '.join(missing)}")
             return
         if not output:
             self.log_console.append("❌ Output file path not specified.")
             return
+        if os.path.abspath(output) in {os.path.abspath(f) for f in files}:
+            self.log_console.append("❌ Output file must not be one of the input files.")
+            return
 
-        cmd = ["cjio", file1, "merge", file2, "save", output]
-        self.log_console.append(f"🛠️ Running command: {' '.join(cmd)}")
-
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            self.log_console.append(result.stdout)
-            if result.returncode != 0:
-                self.log_console.append(f"❌ Error:\n{result.stderr}")
-            else:
-                self.log_console.append("✅ CityJSON files merged successfully.")
-        except Exception as e:
-            self.log_console.append(f"❌ Exception occurred:\n{e}")
\ No newline at end of file
+        on_conflict = CONFLICT_OPTIONS[self.conflict_combo.currentIndex()][1]
+        self.log_console.append(f"🛠️ Merging {len(files)} files into {output}")
+
+        self.btn_merge.setEnabled(False)
+        self.worker = MergeWorker(files, output, on_conflict, self.finest_scale_check.isChecked())
+        self.worker.progress.connect(self.log_console.append)
+        self.worker.finished_signal.connect(self.on_merge_finished)
+        self.worker.start()
+
+    def on_merge_finished(self, success):
+        self.btn_merge.setEnabled(True)
+        if success:
+            self.log_console.append("✅ CityJSON files merged successfully.")
+        else:
+            self.log_console.append("❌ Merge failed.")
\ No newline at end of file
@@ -0,0 +1,103 @@
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Entry point module -> import-time budget in milliseconds (measured in a fresh interpreter)
+BUDGETS_MS = {
+    "cli": 100,
+    "src.core": 50,
+    "src.core.obj2gml": 100,
+    "src.core.reconstruction": 100,
+    "src.cloud.api": 1500,
+}
+
+# Packages that only the subcommand or endpoint that needs them may import
+HEAVY_MODULES = ("geopandas", "shapely", "scipy", "matplotlib", "pyproj", "tqdm", "google.cloud")
+
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output into (self_us, cumulative_us, depth, module) rows.
+
+    Depth 0 rows are the modules imported directly by the measured statement; their
+    cumulative times add up to the total import time.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip(" ")
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, stripped.strip()))
+    return rows
+
+def import_profile(statement, python=sys.executable, env=None):
+    """Run `statement` in a fresh interpreter under -X importtime and return the parsed rows."""
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", statement],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def module_import_ms(rows, module):
+    """Cumulative import time of `module` itself, excluding interpreter start-up (site, encodings...)."""
+    return max((r[1] for r in rows if r[3] == module), default=0) / 1000
+
+def heavy_imports(rows, heavy=HEAVY_MODULES):
+    names = {r[3] for r in rows}
+    return sorted(h for h in heavy if h in names)
+
+def check_budgets(budgets=BUDGETS_MS, heavy=HEAVY_MODULES, repeat=3, python=sys.executable):
+    """
+    Import every entry point in a fresh interpreter and compare against its budget.
+
+    The best of `repeat` runs is used. An entry point fails when it is over budget or
+    when it imports one of the heavy packages; entry points whose own dependencies are
+    not installed (e.g. FastAPI outside the cloud image) are reported and skipped.
+    Returns the list of failure messages.
+    """
+    failures = []
+    for module, budget_ms in budgets.items():
+        try:
+            runs = [import_profile(f"import {module}", python) for _ in range(repeat)]
+        except RuntimeError as e:
+            if "ModuleNotFoundError" in str(e):
+                missing = str(e).strip().splitlines()[-1]
+                print(f"⏭️  {module}: skipped ({missing})")
+                continue
+            raise
+
+        best_ms = min(module_import_ms(rows, module) for rows in runs)
+        loaded = heavy_imports(runs[0], heavy)
+        status = "✅" if best_ms <= budget_ms and not loaded else "❌"
+        print(f"{status} {module}: {best_ms:.1f} ms (budget {budget_ms} ms)")
+        if best_ms > budget_ms:
+            failures.append(f"{module} took {best_ms:.1f} ms, budget is {budget_ms} ms")
+        if loaded:
+            print(f"   heavy imports: {', '.join(loaded)}")
+            failures.append(f"{module} imports {', '.join(loaded)} at import time")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import time of the CLI, API and core entry points under -X importtime.")
+    parser.add_argument("modules", nargs="*", help=f"entry points to check (default: {', '.join(BUDGETS_MS)})")
+    parser.add_argument("--budget-ms", type=float, help="override the budget of every checked module")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module; the best run is compared")
+    args = parser.parse_args(argv)
+
+    budgets = {m: BUDGETS_MS.get(m, 100) for m in args.modules} if args.modules else dict(BUDGETS_MS)
+    if args.budget_ms is not None:
+        budgets = {m: args.budget_ms for m in budgets}
+
+    failures = check_budgets(budgets, repeat=args.repeat)
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
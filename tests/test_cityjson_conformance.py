@@ -0,0 +1,109 @@
+import os
+import json
+
+import pytest
+
+from src.core.obj2cityjson.cityjsonio import (
+    SCHEMA_URL, CityJSONStreamWriter, load_schema_validator, validate_cityjson,
+)
+from src.core.obj2cityjson.mergecityjson import merge_cityjson
+from src.core.obj2cityjson.tojson import obj_folder_to_cityjson
+
+jsonschema = pytest.importorskip("jsonschema")
+
+MTL = """newmtl ground
+Kd 0.36 0.25 0.20
+newmtl wall
+Kd 1.00 1.00 1.00
+newmtl roof
+Kd 1.00 0.00 0.00
+"""
+
+def box_obj(x, y, size=10.0, height=6.0):
+    """A closed box with ground, wall and roof materials, as written by the coloring step."""
+    corners = [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+    vertices = [(cx, cy, 0.0) for cx, cy in corners] + [(cx, cy, height) for cx, cy in corners]
+    lines = ["mtllib colors.mtl"]
+    lines += [f"v {vx} {vy} {vz}" for vx, vy, vz in vertices]
+    lines += ["usemtl ground", "f 1 4 3 2", "usemtl roof", "f 5 6 7 8", "usemtl wall"]
+    lines += [f"f {i + 1} {(i + 1) % 4 + 1} {(i + 1) % 4 + 5} {i + 5}" for i in range(4)]
+    return "\n".join(lines) + "\n"
+
+@pytest.fixture(scope="module")
+def schema_validator():
+    location = os.environ.get("CITYJSON_SCHEMA_DIR", SCHEMA_URL)
+    try:
+        validator = load_schema_validator(location)
+        validator.is_valid({})
+    except (OSError, ValueError) as e:
+        pytest.skip(f"official CityJSON schema not available from {location} ({e}); set CITYJSON_SCHEMA_DIR to a local copy")
+    return validator
+
+def obj_folder(path, origins):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "colors.mtl"), "w") as f:
+        f.write(MTL)
+    for i, (x, y) in enumerate(origins):
+        with open(os.path.join(path, f"building_{i}.obj"), "w") as f:
+            f.write(box_obj(x, y))
+    return path
+
+def write_folder(tmp_path):
+    folder = obj_folder(tmp_path / "obj", [(500000.0, 9000000.0), (500020.0, 9000000.0)])
+    output = tmp_path / "folder.city.json"
+    obj_folder_to_cityjson(folder, output, 32748)
+    return output
+
+def write_stream(tmp_path):
+    output = tmp_path / "stream.city.json"
+    with CityJSONStreamWriter(output, 32748, metadata={"title": "stream"}) as writer:
+        offset = writer.add_vertices([[500000.0, 9000000.0, 0.0], [500001.0, 9000000.0, 0.0], [500000.0, 9000001.0, 0.0]])
+        writer.add_city_object("ground", {
+            "type": "GenericCityObject",
+            "geometry": [{"type": "MultiSurface", "lod": "1", "boundaries": [[[offset, offset + 1, offset + 2]]]}],
+        })
+    return output
+
+def write_merged(tmp_path):
+    first = obj_folder(tmp_path / "a", [(500000.0, 9000000.0)])
+    second = obj_folder(tmp_path / "b", [(500000.0, 9000000.0), (500040.0, 9000010.0)])
+    paths = [tmp_path / "a.city.json", tmp_path / "b.city.json"]
+    obj_folder_to_cityjson(first, paths[0], 32748)
+    obj_folder_to_cityjson(second, paths[1], 32748)
+    output = tmp_path / "merged.city.json"
+    merge_cityjson(paths, output, log=lambda *args: None)
+    return output
+
+WRITERS = [write_folder, write_stream, write_merged]
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+@pytest.mark.parametrize("write", WRITERS, ids=lambda w: w.__name__)
+def test_output_matches_official_schema(tmp_path, schema_validator, write):
+    assert validate_cityjson(load(write(tmp_path)), schema_validator) == []
+
+@pytest.mark.parametrize("write", WRITERS, ids=lambda w: w.__name__)
+def test_output_passes_structural_checks(tmp_path, write):
+    assert validate_cityjson(load(write(tmp_path))) == []
+
+def test_merged_output_keeps_every_building(tmp_path):
+    document = load(write_merged(tmp_path))
+    assert sorted(document["CityObjects"]) == ["building_0", "building_0_1", "building_1"]
+
+def test_structural_checks_catch_bad_indices(tmp_path):
+    document = load(write_stream(tmp_path))
+    document["CityObjects"]["ground"]["geometry"][0]["boundaries"] = [[[0, 1, 3]]]
+    assert validate_cityjson(document) == ["CityObjects['ground'].geometry[0]: boundary index out of range (0..2)"]
+
+def test_schema_validator_reads_referenced_files(tmp_path):
+    """load_schema_validator resolves the schema's relative $refs against the same location."""
+    (tmp_path / "cityjson.schema.json").write_text(json.dumps({
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "properties": {"CityObjects": {"$ref": "cityobjects.schema.json"}},
+    }))
+    (tmp_path / "cityobjects.schema.json").write_text(json.dumps({"type": "object"}))
+    validator = load_schema_validator(str(tmp_path))
+    assert [e.message for e in validator.iter_errors({"CityObjects": []})] == ["[] is not of type 'object'"]
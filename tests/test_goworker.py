@@ -0,0 +1,52 @@
+import pytest
+
+from src.core import gotools
+from src.core.goworker import GoWorkerPool
+
+pytestmark = pytest.mark.skipif(gotools.go_version() is None, reason="Go toolchain not installed")
+
+@pytest.fixture(scope="module")
+def translate_command(tmp_path_factory):
+    """The translate tool built once into a scratch cache."""
+    return [gotools.build_tool("translate", cache_dir=str(tmp_path_factory.mktemp("go-tools")))]
+
+def translate_args(input_dir, output_dir, tx):
+    return [f"-input={input_dir}", f"-output={output_dir}", f"-tx={tx}", "-ty=0", "-tz=0"]
+
+@pytest.fixture
+def obj_dir(tmp_path):
+    directory = tmp_path / "obj"
+    directory.mkdir()
+    (directory / "a.obj").write_text("v 1 2 3\nv 4 5 6\nv 7 8 9\nf 1 2 3\n")
+    return directory
+
+def first_vertex(path):
+    with open(path) as f:
+        return [float(v) for v in f.readline().split()[1:]]
+
+def test_round_trip(translate_command, obj_dir, tmp_path):
+    with GoWorkerPool("translate", 1, command=translate_command, log=lambda *args: None) as pool:
+        response = pool.call(*translate_args(obj_dir, tmp_path / "out", 10))
+
+    assert response["code"] == 0
+    assert response["id"] == 1
+    assert "Found 1 OBJ files to process" in response["output"]
+    assert first_vertex(tmp_path / "out" / "a.obj") == [11, 2, 3]
+
+def test_restart_after_crash(translate_command, obj_dir, tmp_path):
+    with GoWorkerPool("translate", 1, command=translate_command, log=lambda *args: None) as pool:
+        worker = pool.workers[0]
+        first_pid = worker.pid
+        assert pool.call(*translate_args(obj_dir, tmp_path / "first", 10))["code"] == 0
+
+        worker.process.kill()
+        worker.process.wait()
+        # The dead worker is restarted and the request retried on the new process
+        response = pool.call(*translate_args(obj_dir, tmp_path / "second", 20))
+        assert response["code"] == 0
+        assert worker.alive and worker.pid != first_pid
+        assert first_vertex(tmp_path / "second" / "a.obj") == [21, 2, 3]
+
+        # The restarted worker keeps serving
+        assert pool.call(*translate_args(obj_dir, tmp_path / "third", 30))["code"] == 0
+    assert first_vertex(tmp_path / "third" / "a.obj") == [31, 2, 3]
@@ -0,0 +1,13 @@
+import pytest
+
+from src.utils.importbudget import BUDGETS_MS, check_budgets
+
+# Entry points whose own dependencies are only installed in some images
+REQUIRES = {"src.cloud.api": "fastapi"}
+
+@pytest.mark.parametrize("module", list(BUDGETS_MS))
+def test_entry_point_import_budget(module):
+    """Every entry point imports within its budget and without the heavy packages."""
+    if module in REQUIRES:
+        pytest.importorskip(REQUIRES[module])
+    assert check_budgets({module: BUDGETS_MS[module]}) == []
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from src.core import lod2dispatch
+from src.core.lod2dispatch import balanced_shards, convert_sharded, failed_files
+
+STUB = '''
+import os, sys, glob, json
+LIST = {list_flag}
+args = sys.argv[1:]
+with open({calls!r}, "a") as log:
+    log.write(json.dumps(args) + "\\n")
+if args == ["-h"]:
+    print("Usage of obj2lod2gml:")
+    for flag in ["epsg", "input"] + (["list"] if LIST else []) + ["output"]:
+        print(f"  -{{flag}} string")
+    sys.exit(0)
+values = dict(zip(args[::2], args[1::2]))
+if "-list" in values:
+    if not LIST:
+        print("flag provided but not defined: -list")
+        sys.exit(2)
+    with open(values["-list"]) as f:
+        files = [line.strip() for line in f if line.strip()]
+else:
+    files = sorted(glob.glob(os.path.join(values["-input"], "*.obj")))
+for path in files:
+    name = os.path.basename(path)
+    target = os.path.join(values["-output"], os.path.splitext(name)[0] + ".gml")
+    if name.startswith("crash"):
+        sys.exit(3)
+    if name.startswith("missing"):
+        continue
+    with open(target, "w") as f:
+        f.write("<partial" if name.startswith("bad") else "<CityModel/>")
+    if name.startswith("bad"):
+        print(f"Error processing {{name}}: invalid face")
+print(f"Successfully converted {{len(files)}} files")
+'''
+
+def make_objs(directory, sizes):
+    directory.mkdir(exist_ok=True)
+    for name, size in sizes.items():
+        (directory / name).write_bytes(b"v 0 0 0\n" * size)
+    return sorted(str(directory / name) for name in sizes)
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    """Make resolve_tool return a Python stand-in for obj2lod2gml; install() returns a reader of its calls."""
+    def install(with_list=True):
+        calls = tmp_path / "calls.jsonl"
+        script = tmp_path / f"obj2lod2gml_{'new' if with_list else 'old'}.py"
+        script.write_text(STUB.format(list_flag=with_list, calls=str(calls)))
+        monkeypatch.setattr(lod2dispatch, "resolve_tool", lambda *args, **kwargs: [sys.executable, str(script)])
+
+        def read_calls():
+            with open(calls) as f:
+                return [json.loads(line) for line in f if json.loads(line) != ["-h"]]
+        return read_calls
+    return install
+
+def convert(input_dir, output_dir, shards, **kwargs):
+    return convert_sharded(str(input_dir), str(output_dir), shards, log=lambda *args: None, **kwargs)
+
+def names(paths):
+    return sorted(os.path.basename(p) for p in paths)
+
+def test_balanced_shards(tmp_path):
+    sizes = {"a.obj": 9, "b.obj": 7, "c.obj": 6, "d.obj": 5, "e.obj": 4, "f.obj": 3, "g.obj": 2}
+    files = make_objs(tmp_path / "objs", sizes)
+    groups = balanced_shards(files, 3)
+
+    assert sorted(p for group in groups for p in group) == files
+    assert all(group == sorted(group) for group in groups)
+    totals = sorted(sum(os.path.getsize(p) for p in group) for group in groups)
+    # Largest file first into the lightest shard: 9+3, 7+4+2, 6+5 lines
+    assert totals == [11 * 8, 12 * 8, 13 * 8]
+
+def test_balanced_shards_limits(tmp_path):
+    files = make_objs(tmp_path / "objs", {"a.obj": 1, "b.obj": 2})
+    assert len(balanced_shards(files, 8)) == 2
+    assert balanced_shards(files, 0) == [files]
+
+def test_failed_files(tmp_path):
+    group = make_objs(tmp_path / "objs", {"a.obj": 1, "b.obj": 1, "c.obj": 1})
+    for stem in ("a", "b"):
+        (tmp_path / f"{stem}.gml").write_text("<CityModel/>")
+    output = "Found 3 OBJ files to process\nError processing b.obj: invalid face\n"
+
+    assert names(failed_files(group, str(tmp_path), 0, output)) == ["b.obj", "c.obj"]
+    assert names(failed_files(group, str(tmp_path), 0, "")) == ["c.obj"]
+    # A crash or bad arguments: none of the outputs can be trusted
+    assert names(failed_files(group, str(tmp_path), 2, "")) == ["a.obj", "b.obj", "c.obj"]
+
+def test_convert_sharded(tmp_path, stub):
+    calls = stub()
+    sizes = {"a.obj": 5, "b.obj": 4, "bad.obj": 3, "c.obj": 3, "missing.obj": 2, "d.obj": 1}
+    make_objs(tmp_path / "objs", sizes)
+    results = convert(tmp_path / "objs", tmp_path / "gml", 3, epsg="32750")
+
+    assert len(results) == 3
+    assert sorted(r["files"] for r in results) == [2, 2, 2]
+    assert names(p for r in results for p in r["failed"]) == ["bad.obj", "missing.obj"]
+    assert all(r["code"] == 0 for r in results)
+    assert len(calls()) == 3
+    assert all(call[0] == "-list" and call[-1] == "-epsg=32750" for call in calls())
+
+def test_convert_sharded_crashed_shard(tmp_path, stub):
+    stub()
+    make_objs(tmp_path / "objs", {"a.obj": 9, "crash.obj": 1, "b.obj": 5})
+    results = convert(tmp_path / "objs", tmp_path / "gml", 2)
+
+    crashed = [r for r in results if r["code"] != 0]
+    assert len(crashed) == 1 and crashed[0]["code"] == 3
+    # b.obj's .gml was written before the crash but is reported as failed with the rest of its shard
+    assert names(crashed[0]["failed"]) == ["b.obj", "crash.obj"]
+    assert [r["failed"] for r in results if r["code"] == 0] == [[]]
+
+def test_convert_sharded_without_list_option(tmp_path, stub):
+    calls = stub(with_list=False)
+    make_objs(tmp_path / "objs", {"a.obj": 3, "bad.obj": 2, "b.obj": 1})
+    results = convert(tmp_path / "objs", tmp_path / "gml", 3)
+
+    # One -input run over the whole directory instead of failing every -list shard
+    assert calls() == [["-input", str(tmp_path / "objs"), "-output", str(tmp_path / "gml")]]
+    assert len(results) == 1 and results[0]["files"] == 3
+    assert names(results[0]["failed"]) == ["bad.obj"]
+
+def test_convert_sharded_through_pool(tmp_path, stub):
+    stub()
+    command = lod2dispatch.resolve_tool("obj2lod2gml")
+
+    class Pool:
+        calls = []
+
+        def call(self, *args):
+            self.calls.append(args)
+            result = subprocess.run([*command, *args], stdout=subprocess.PIPE, text=True)
+            return {"code": result.returncode, "output": result.stdout}
+
+    make_objs(tmp_path / "objs", {"a.obj": 2, "bad.obj": 1})
+    results = convert(tmp_path / "objs", tmp_path / "gml", 2, pool=Pool())
+    assert len(Pool.calls) == 2
+    assert names(p for r in results for p in r["failed"]) == ["bad.obj"]
+
+def test_convert_sharded_empty_directory(tmp_path, stub):
+    stub()
+    (tmp_path / "objs").mkdir()
+    assert convert(tmp_path / "objs", tmp_path / "gml", 2) == []
@@ -0,0 +1,147 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.core.obj2cityjson import mergecityjson
+from src.core.obj2cityjson.mergecityjson import VertexRegistry, merge_cityjson, read_file_transform
+
+def building(surfaces, **attributes):
+    return {
+        "type": "Building",
+        "attributes": attributes,
+        "geometry": [{"type": "MultiSurface", "lod": "2", "boundaries": [[surface] for surface in surfaces]}],
+    }
+
+def document(points, city_objects, scale, translate, reference="https://www.opengis.net/def/crs/EPSG/0/32748"):
+    """A CityJSON document of real-world `points`, quantized with the given transform."""
+    quantized = np.rint((np.asarray(points, dtype=float) - translate) / scale).astype(int)
+    return {
+        "type": "CityJSON",
+        "version": "2.0",
+        "transform": {"scale": [scale] * 3, "translate": list(translate)},
+        "metadata": {"referenceSystem": reference, "title": f"scale {scale}"},
+        "CityObjects": city_objects,
+        "vertices": quantized.tolist(),
+    }
+
+SQUARE = [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]]
+SHIFTED = [[1, 0, 0], [2, 0, 0], [2, 1, 0], [1, 1, 0]]
+
+@pytest.fixture
+def inputs(tmp_path):
+    """Two files sharing the vertices (1, 0, 0) and (1, 1, 0) and the CityObject ID "shared"."""
+    first = document(
+        [[100 + x, 200 + y, z] for x, y, z in SQUARE],
+        {"b1": building([[0, 1, 2]]), "shared": building([[0, 2, 3]], source="first")},
+        scale=0.001, translate=[100.0, 200.0, 0.0],
+    )
+    second = document(
+        [[100 + x, 200 + y, z] for x, y, z in SHIFTED],
+        {"shared": building([[0, 1, 2]], source="second"), "b2": building([[0, 2, 3]], source="second")},
+        scale=0.01, translate=[101.0, 200.0, 0.0],
+    )
+    paths = []
+    for name, doc in (("first.json", first), ("second.json", second)):
+        paths.append(tmp_path / name)
+        paths[-1].write_text(json.dumps(doc))
+    return paths
+
+def merge(paths, output, **kwargs):
+    merge_cityjson([str(p) for p in paths], str(output), log=lambda *args: None, **kwargs)
+    with open(output, encoding="utf-8") as f:
+        return json.load(f)
+
+def object_points(merged, object_id):
+    """Real-world coordinates of the first surface of a merged CityObject."""
+    transform = merged["transform"]
+    vertices = np.asarray(merged["vertices"]) * transform["scale"] + transform["translate"]
+    surface = merged["CityObjects"][object_id]["geometry"][0]["boundaries"][0][0]
+    return np.round(vertices[surface] - [100, 200, 0], 6).tolist()
+
+class RecordingWriter:
+    def __init__(self):
+        self.vertices = []
+
+    def add_quantized_vertices(self, quantized):
+        start = len(self.vertices)
+        self.vertices.extend(map(tuple, quantized.tolist()))
+        return start
+
+def test_vertex_registry_deduplicates_across_files():
+    rng = np.random.default_rng(0)
+    registry, writer, seen = VertexRegistry(), RecordingWriter(), {}
+    # Many small files force the sorted runs to be merged several times
+    for size in [5, 40, 3, 3, 17, 64, 1, 8, 8, 30]:
+        quantized = rng.integers(0, 6, size=(size, 3))
+        ids = registry.register(quantized, writer)
+        for row, index in zip(map(tuple, quantized.tolist()), ids.tolist()):
+            assert seen.setdefault(row, index) == index
+            assert writer.vertices[index] == row
+    assert len(writer.vertices) == len(seen)
+    assert all(len(keys) == len(ids) for keys, ids in registry.runs)
+
+def test_vertex_registry_empty_input():
+    assert VertexRegistry().register(np.empty((0, 3), dtype=np.int64), RecordingWriter()).tolist() == []
+
+def test_merge_deduplicates_shared_vertices(inputs, tmp_path):
+    merged = merge(inputs, tmp_path / "merged.json")
+    assert len(merged["vertices"]) == 6
+    assert object_points(merged, "b2") == [[1, 0, 0], [2, 1, 0], [1, 1, 0]]
+
+def test_rename_keeps_both_objects(inputs, tmp_path):
+    merged = merge(inputs, tmp_path / "merged.json", on_conflict="rename")
+    assert sorted(merged["CityObjects"]) == ["b1", "b2", "shared", "shared_1"]
+    assert merged["CityObjects"]["shared"]["attributes"]["source"] == "first"
+    assert merged["CityObjects"]["shared_1"]["attributes"]["source"] == "second"
+    assert object_points(merged, "shared_1") == [[1, 0, 0], [2, 0, 0], [2, 1, 0]]
+
+def test_keep_first_skips_later_duplicates(inputs, tmp_path):
+    merged = merge(inputs, tmp_path / "merged.json", on_conflict="keep_first")
+    assert sorted(merged["CityObjects"]) == ["b1", "b2", "shared"]
+    assert merged["CityObjects"]["shared"]["attributes"]["source"] == "first"
+    assert object_points(merged, "shared") == [[0, 0, 0], [1, 1, 0], [0, 1, 0]]
+
+def test_replace_keeps_later_duplicates(inputs, tmp_path):
+    merged = merge(inputs, tmp_path / "merged.json", on_conflict="replace")
+    assert sorted(merged["CityObjects"]) == ["b1", "b2", "shared"]
+    assert merged["CityObjects"]["shared"]["attributes"]["source"] == "second"
+    assert object_points(merged, "shared") == [[1, 0, 0], [2, 0, 0], [2, 1, 0]]
+    # Transform and metadata still come from the first file
+    assert merged["transform"] == {"scale": [0.001] * 3, "translate": [100.0, 200.0, 0.0]}
+    assert merged["metadata"]["title"] == "scale 0.001"
+
+def test_unknown_conflict_mode(inputs, tmp_path):
+    with pytest.raises(ValueError):
+        merge(inputs, tmp_path / "merged.json", on_conflict="overwrite")
+
+@pytest.mark.parametrize("order, kwargs, scale", [
+    ((0, 1), {}, 0.001),
+    ((1, 0), {}, 0.01),
+    ((1, 0), {"finest_scale": True}, 0.001),
+    ((1, 0), {"scale": 0.5}, 0.5),
+])
+def test_output_scale(inputs, tmp_path, order, kwargs, scale):
+    merged = merge([inputs[i] for i in order], tmp_path / "merged.json", **kwargs)
+    assert merged["transform"]["scale"] == [scale] * 3
+
+@pytest.mark.parametrize("kwargs", [{}, {"on_conflict": "replace"}, {"finest_scale": True}])
+def test_every_file_is_parsed_once(inputs, tmp_path, monkeypatch, kwargs):
+    parsed = []
+    read_document = mergecityjson.read_document
+    monkeypatch.setattr(mergecityjson, "read_document", lambda path: parsed.append(path) or read_document(path))
+    merge(inputs, tmp_path / "merged.json", **kwargs)
+    assert sorted(parsed) == sorted(str(p) for p in inputs)
+
+def test_read_file_transform(tmp_path):
+    path = tmp_path / "model.json"
+    # Our writer puts the transform after the CityObjects; an attribute of the same name is skipped
+    path.write_text(
+        '{"type":"CityJSON","CityObjects":{"a":{"attributes":{"transform":"rotate"}}},'
+        '"transform" : {"scale":[0.5,0.5,1],"translate":[1,2,3]},"vertices":[]}'
+    )
+    scale, translate = read_file_transform(path)
+    assert scale.tolist() == [0.5, 0.5, 1] and translate.tolist() == [1, 2, 3]
+
+    path.write_text('{"type":"CityJSON","CityObjects":{},"vertices":[]}')
+    assert read_file_transform(path) == (None, None)
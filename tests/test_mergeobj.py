@@ -0,0 +1,67 @@
+import pytest
+
+from src.core.obj2cityjson.mergeobj import merge_obj_files, parse_obj_geometry
+
+def make_obj(k):
+    """A small OBJ whose faces use v, v/vt, v//vn and v/vt/vn references, absolute and relative."""
+    return f"""mtllib part{k}.mtl
+o part{k}
+v {k} 0 0
+v {k + 1} 0 0
+v {k + 1} 1 0
+vt 0 0
+vt 1 0
+vt 1 1
+vn 0 0 1
+usemtl roof
+f 1/1/1 2/2/1 3/3/1
+v {k} 1 0
+f -4 -2 -1
+f 1//1 3//1 4//1
+v {k} 0 {k + 2}.5
+f -1/-1 -2/-2 -3/-3
+f 5 1 4 3
+"""
+
+def reference_merge(texts):
+    """Per-line merge: vertices as written, faces as 1-based absolute vertex indices."""
+    vertices, faces = [], []
+    for text in texts:
+        offset, count = len(vertices), 0
+        for line in text.splitlines():
+            if line.startswith("v "):
+                vertices.append(line)
+                count += 1
+            elif line.startswith("f "):
+                face = [int(p.split("/", 1)[0]) for p in line.split()[1:]]
+                face = [i if i > 0 else count + 1 + i for i in face]
+                faces.append("f " + " ".join(str(i + offset) for i in face))
+    return "\n".join(vertices + faces), len(vertices), len(faces)
+
+def merged_lines(text):
+    lines = text.splitlines()
+    return "\n".join([l for l in lines if l.startswith("v ")] + [l for l in lines if l.startswith("f ")])
+
+@pytest.mark.parametrize("chunk_lines", [1, 4, 1000])
+def test_parse_obj_geometry(tmp_path, chunk_lines):
+    path = tmp_path / "part.obj"
+    path.write_text(make_obj(0))
+    vertex_text, count, flat, sizes = parse_obj_geometry(path, chunk_lines=chunk_lines)
+
+    assert count == 5
+    assert vertex_text.count("\n") == 5
+    assert sizes.tolist() == [3, 3, 3, 3, 4]
+    assert flat.tolist() == [1, 2, 3, 1, 3, 4, 1, 3, 4, 5, 4, 3, 5, 1, 4, 3]
+
+@pytest.mark.parametrize("count, processes", [(3, 1), (9, 2)])
+def test_merge_obj_files(tmp_path, count, processes):
+    texts = [make_obj(k) for k in range(count)]
+    paths = []
+    for k, text in enumerate(texts):
+        paths.append(tmp_path / f"part{k}.obj")
+        paths[-1].write_text(text)
+    output = tmp_path / "merged.obj"
+
+    expected, vertices, faces = reference_merge(texts)
+    assert merge_obj_files(paths, output, processes=processes) == (vertices, faces)
+    assert merged_lines(output.read_text()) == expected
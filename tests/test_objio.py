@@ -0,0 +1,57 @@
+import pytest
+
+from src.core.obj2cityjson.objio import format_vertices, parse_face_lines, read_obj_arrays, shift_face_lines
+
+OBJ = """v 0 0 0
+v 1 0 0
+v 1 1 0 0.5 0.5 0.5
+f 1 2 3
+g a
+v 0 1 0
+f 1/1 -3/2 -2/3
+f 2//1 3//1 4//1
+g b
+f -1 -2 -3
+g a
+f 4 3 2 1
+"""
+
+@pytest.mark.parametrize("chunk_lines", [1, 3, 1000])
+def test_read_obj_arrays(tmp_path, chunk_lines):
+    path = tmp_path / "scene.obj"
+    path.write_text(OBJ)
+    vertices, flat, sizes, face_group, groups = read_obj_arrays(path, chunk_lines=chunk_lines)
+
+    assert vertices.tolist() == [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]]
+    assert groups == [None, "a", "b"]
+    assert sizes.tolist() == [3, 3, 3, 3, 4]
+    assert flat.tolist() == [0, 1, 2, 0, 1, 2, 1, 2, 3, 3, 2, 1, 3, 2, 1, 0]
+    assert face_group.tolist() == [0, 1, 1, 2, 1]
+
+@pytest.mark.parametrize("lines, flat, sizes", [
+    (["f 1 2 3\n", "f 4/1 5/2 6/3 7/4\n"], [1, 2, 3, 4, 5, 6, 7], [3, 4]),
+    (["f 1//2 -3/4 5/6/7\r\n", "f 8 9 10"], [1, -3, 5, 8, 9, 10], [3, 3]),
+    # Irregular whitespace is counted per line
+    (["f  1\t2 3 \n", "f 4 5 6\n"], [1, 2, 3, 4, 5, 6], [3, 3]),
+    ([], [], []),
+])
+def test_parse_face_lines(lines, flat, sizes):
+    parsed_flat, parsed_sizes = parse_face_lines(lines)
+    assert parsed_flat.tolist() == flat
+    assert parsed_sizes.tolist() == sizes
+
+def test_parse_face_lines_rejects_bad_references():
+    with pytest.raises(ValueError):
+        parse_face_lines(["f 1 2 x\n"])
+
+def test_shift_face_lines():
+    assert shift_face_lines(["f 1 2 3\n", "f 1 2 3 4\n"], 10) == "f 11 12 13\nf 11 12 13 14\n"
+    assert shift_face_lines(["f 1/2/3 2/3/4 -1/-1/-1\n"], 10, 20, 30) == "f 11/22/33 12/23/34 -1/-1/-1\n"
+    # Mixed layouts in one batch
+    assert shift_face_lines(["f 1//3 2 3/4\n"], 10, 20, 30) == "f 11//33 12 13/24\n"
+
+def test_format_vertices_precision():
+    vertices = [[0.1 + 0.2, 1e-05, 2.5], [3.0, -4.25, 1 / 3]]
+    assert format_vertices(vertices, precision=2) == "v 0.30 0.00 2.50\nv 3.00 -4.25 0.33\n"
+    assert format_vertices(vertices, precision=None) == "v 0.30000000000000004 1e-05 2.5\nv 3.0 -4.25 0.3333333333333333\n"
+    assert format_vertices(vertices, precision=(None, None, 3)) == "v 0.30000000000000004 1e-05 2.500\nv 3.0 -4.25 0.333\n"
@@ -0,0 +1,268 @@
+import sys
+import json
+
+import numpy as np
+import pytest
+
+from src.core.obj2cityjson import separator
+
+def previous_save_obj(path, uuid, faces, original_vertices, index_map, delta_z):
+    """The per-vertex writer save_obj_worker replaced, kept as the reference output."""
+    with open(path, 'w') as f:
+        f.write(f"g {uuid}\n")
+        for i in index_map:
+            v = original_vertices[i]
+            f.write(f"v {v[0]} {v[1]} {v[2] + delta_z:.6f}\n")
+        for face in faces:
+            mapped = [str(index_map[idx] + 1) for idx in face]
+            f.write(f"f {' '.join(mapped)}\n")
+
+def test_save_obj_worker_matches_previous_writer(tmp_path):
+    vertices = np.array([
+        [512345.67891234, 9123456.7, 12.3456789],
+        [1e-05, -0.0, 0.1 + 0.2],
+        [1e16, 123.0, -4.0000005],
+        [0.30000000000000004, 2.5, 7.0],
+        [-718.125, 0.1, 1234567.1234567],
+    ])
+    faces = [[4, 0, 2], [2, 0, 1, 3]]
+    vertex_ids = np.array([4, 0, 2, 1, 3])
+    index_map = {int(v): k for k, v in enumerate(vertex_ids)}
+    local = np.array([index_map[i] for face in faces for i in face])
+    sizes = np.array([len(face) for face in faces])
+
+    vertices_path = tmp_path / "vertices.npy"
+    np.save(vertices_path, vertices)
+    separator.init_save_worker(str(vertices_path))
+    separator.save_obj_worker(("B-1", vertex_ids, local, sizes, str(tmp_path), 2.75))
+    previous_save_obj(tmp_path / "previous.obj", "B-1", faces, vertices, index_map, 2.75)
+
+    assert (tmp_path / "B-1.obj").read_text() == (tmp_path / "previous.obj").read_text()
+
+# Footprints: rows 0 and 1 overlap on 5 <= x <= 10, row 2 stands apart
+FOOTPRINTS = [(0, 0, 10, 10), (5, 0, 15, 10), (20, 0, 30, 10)]
+
+SCENE = """g inside_first
+v 1 1 5
+v 3 1 5
+v 3 3 5
+v 1 3 5
+f -4 -3 -2 -1
+g overlap
+v 6 1 5
+v 8 1 5
+v 8 3 5
+v 6 3 5
+f -4 -3 -2 -1
+g inside_second
+v 11 1 5
+v 13 1 5
+v 13 3 5
+v 11 3 5
+f -4 -3 -2 -1
+g outside
+v 40 1 5
+v 42 1 5
+v 42 3 5
+f -3 -2 -1
+g weighted
+v 20 0 5
+v 30 0 5
+v 30 10 5
+v 20 10 5
+f -4 -3 -2 -1
+v 40 0 5
+v 40.1 0 5
+v 40 0.1 5
+f -3 -2 -1
+g concave
+v 21 1 8
+v 29 1 8
+v 29 3 8
+v 23 3 8
+v 23 9 8
+v 21 9 8
+f -6 -5 -4 -3 -2 -1
+f -1 -2 -3 -4 -5 -6
+g walls
+v 2 5 0
+v 4 5 0
+v 4 5 3
+v 2 5 3
+f -4 -3 -2 -1
+g no_faces
+"""
+EXPECTED_ROWS = {
+    "inside_first": 0,
+    "overlap": 0,  # inside rows 0 and 1: the first row wins
+    "inside_second": 1,
+    "outside": -1,
+    "weighted": 2,  # the vertex mean (x ~ 31.4) lies outside, the area-weighted point does not
+    "concave": 2,
+    "walls": 0,  # no projected area: the mean of its vertices (3, 5) is used
+    "no_faces": -1,
+}
+
+@pytest.fixture
+def scene(tmp_path):
+    path = tmp_path / "scene.obj"
+    path.write_text(SCENE)
+    vertices, flat, sizes, face_group, groups = separator.read_obj_arrays(path)
+    return vertices, flat, sizes, face_group, groups
+
+@pytest.fixture
+def footprints():
+    from shapely.geometry import box
+    return separator.gpd.GeoDataFrame(geometry=[box(*bounds) for bounds in FOOTPRINTS])
+
+@pytest.fixture(params=["shapely2", "sindex"])
+def backend(request, monkeypatch):
+    """Run query_containing through the Shapely 2 STRtree or the geopandas spatial index path."""
+    if request.param == "shapely2":
+        if not separator.SHAPELY_2:
+            pytest.skip("Shapely 2 is not installed")
+        return request.param
+    monkeypatch.setattr(separator, "SHAPELY_2", False)
+    if not hasattr(separator, "shapely_vectorized"):
+        monkeypatch.setattr(separator, "shapely_vectorized", pytest.importorskip("shapely.vectorized"), raising=False)
+    return request.param
+
+def test_group_representative_points(scene):
+    from shapely.geometry import Polygon
+    vertices, flat, sizes, face_group, groups = scene
+    points, has_faces = separator.group_representative_points(vertices, flat, sizes, face_group, len(groups))
+
+    assert has_faces.tolist() == [name != "no_faces" for name in groups]
+    # Groups with projected area: the area-weighted centroid of their faces
+    starts = np.concatenate(([0], np.cumsum(sizes)))
+    for g, name in enumerate(groups):
+        if name in ("walls", "no_faces"):
+            continue
+        faces = [Polygon(vertices[flat[starts[i]:starts[i + 1]], :2]) for i in np.flatnonzero(face_group == g)]
+        area = sum(face.area for face in faces)
+        expected = sum(np.array(face.centroid.coords[0]) * face.area for face in faces) / area
+        assert points[g] == pytest.approx(expected), name
+    assert points[groups.index("walls")] == pytest.approx([3, 5])
+
+def test_assign_groups_to_footprints(scene, footprints, backend):
+    vertices, flat, sizes, face_group, groups = scene
+    rows = separator.assign_groups_to_footprints(vertices, flat, sizes, face_group, len(groups), footprints)
+    assert dict(zip(groups, rows.tolist())) == EXPECTED_ROWS
+
+def test_assign_groups_without_footprints(scene, footprints):
+    vertices, flat, sizes, face_group, groups = scene
+    rows = separator.assign_groups_to_footprints(vertices, flat, sizes, face_group, len(groups), footprints.iloc[:0])
+    assert rows.tolist() == [-1] * len(groups)
+
+def test_query_containing_matches_brute_force(footprints, backend):
+    from shapely.geometry import Point
+    points = np.random.default_rng(1).uniform(-5, 35, size=(300, 2))
+    polygons = list(footprints.geometry)
+    point_idx, polygon_idx = separator.query_containing(polygons, points)
+
+    expected = {(i, j) for i, p in enumerate(points) for j, polygon in enumerate(polygons) if polygon.contains(Point(p))}
+    assert set(zip(point_idx.tolist(), polygon_idx.tolist())) == expected
+    assert len(point_idx) == len(expected)
+
+def previous_auto_numbers(count):
+    """Code and number of the first `count` auto UUIDs, as the original per-row loop assigned them."""
+    numbers, code, number = [], "AAAA", 1
+    for _ in range(count):
+        numbers.append(f"{code}-{number:05d}")
+        number += 1
+        if number > 99999:
+            code = separator.increment_string(code)
+            number = 1
+    return numbers
+
+def auto_number(uuid):
+    return "-".join(uuid.split("-")[1:3])
+
+def test_increment_string():
+    assert separator.increment_string("AAAA") == "AAAB"
+    assert separator.increment_string("AAAZ") == "AABA"
+    assert separator.increment_string("ZZZZ") == "AAAAA"
+
+def test_generate_auto_uuids_rolls_over_to_the_next_code():
+    uuids = separator.generate_auto_uuids(2 * 99999 + 5, "Kota", "01022025", "User")
+    assert [auto_number(u) for u in uuids] == previous_auto_numbers(2 * 99999 + 5)
+    assert uuids[99998].startswith("Kota_01022025-AAAA-99999-User-")
+    assert uuids[99999].startswith("Kota_01022025-AAAB-00001-User-")
+    assert all(len(u.rsplit("-", 1)[1]) == 7 for u in uuids[:1000])
+    assert len(set(uuids)) == len(uuids)
+
+def test_generate_auto_uuids_start_number():
+    uuids = separator.generate_auto_uuids(3, "P", "D", "U", code_prefix="AAAZ", start_number=99999)
+    assert [auto_number(u) for u in uuids] == ["AAAZ-99999", "AABA-00001", "AABA-00002"]
+    assert separator.generate_auto_uuids(0, "P", "D", "U") == []
+
+@pytest.mark.parametrize("uuids, kept", [
+    (["kept", None, None], 1),
+    (["kept", np.nan, np.nan], 1),
+    ([np.nan, np.nan, np.nan], 0),  # an all-empty column is read as float
+    (None, 0),  # no UUID column at all
+])
+def test_separate_buildings_fills_missing_uuids(tmp_path, monkeypatch, footprints, uuids, kept):
+    obj_path = tmp_path / "scene.obj"
+    obj_path.write_text(SCENE)
+    if uuids is not None:
+        footprints["UUID"] = uuids
+    footprints = footprints.set_crs(32748)
+    monkeypatch.setattr(separator.gpd, "read_file", lambda path: footprints.copy())
+
+    output = tmp_path / "with_uuid.geojson"
+    _, uuid_faces = separator.separate_buildings(str(obj_path), "footprints.geojson", (0.0, 0.0), "Kota", "User", str(output))
+    with open(output, encoding="utf-8") as f:
+        written = [feature["properties"]["UUID"] for feature in json.load(f)["features"]]
+    assert list(uuid_faces) == written
+    assert written[:kept] == ["kept"] * kept
+    assert [auto_number(u) for u in written[kept:]] == previous_auto_numbers(3 - kept)
+
+def uuid_frame(epsg):
+    from shapely.geometry import MultiPolygon, box
+    return separator.gpd.GeoDataFrame(
+        {
+            "UUID": ["a", None, "c"],
+            "height": [1.5, np.nan, 1e-7],
+            "levels": [1, 2, 3],
+            "name": ["x", "ü é", None],
+            "flag": [True, False, True],
+        },
+        geometry=[
+            box(512345.67891234, 9123456.123456789, 512355.1, 9123466.2),
+            None,
+            MultiPolygon([box(0, 0, 1, 1), box(2, 2, 3, 3)]),
+        ],
+        crs=epsg,
+    )
+
+def write_fallback(gdf, path, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setitem(sys.modules, "pyogrio", None)  # import pyogrio raises ImportError
+        separator.write_geojson(gdf, str(path))
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+@pytest.mark.parametrize("epsg, crs_name", [
+    (32748, "urn:ogc:def:crs:EPSG::32748"),
+    (4326, "urn:ogc:def:crs:OGC:1.3:CRS84"),
+    (None, None),
+])
+def test_write_geojson_fallback(tmp_path, monkeypatch, epsg, crs_name):
+    written = write_fallback(uuid_frame(epsg), tmp_path / "buildings.geojson", monkeypatch)
+    assert written["name"] == "buildings"
+    assert written.get("crs", {}).get("properties", {}).get("name") == crs_name
+    assert [f["properties"]["UUID"] for f in written["features"]] == ["a", None, "c"]
+    assert written["features"][1]["properties"]["height"] is None
+    assert written["features"][1]["geometry"] is None
+
+@pytest.mark.parametrize("epsg", [32748, 4326])
+def test_write_geojson_fallback_matches_pyogrio(tmp_path, monkeypatch, epsg):
+    pytest.importorskip("pyogrio")
+    gdf = uuid_frame(epsg)
+    (tmp_path / "pyogrio").mkdir()
+    (tmp_path / "fallback").mkdir()
+    separator.write_geojson(gdf, str(tmp_path / "pyogrio" / "buildings.geojson"))
+    with open(tmp_path / "pyogrio" / "buildings.geojson", encoding="utf-8") as f:
+        expected = json.load(f)
+    assert write_fallback(gdf, tmp_path / "fallback" / "buildings.geojson", monkeypatch) == expected